@@ -0,0 +1,783 @@
+#!/usr/bin/env python3
+
+"""
+⏱️ DEFECTDOJO UPLOADER BENCHMARKS
+========================================
+Description: Micro-benchmarks for the DefectDojo upload scripts
+Author: Security Team
+Version: 1.0.0
+
+Usage: python3 benchmark-uploaders.py <benchmark> [options]
+       python3 benchmark-uploaders.py --list
+
+Benchmarks run entirely locally: network-bound ones talk to an in-process
+stub DefectDojo API, parser ones use synthetic reports generated on the fly.
+"""
+
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import tracemalloc
+import threading
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+
+from defectdojo_cache import DefectDojoIDCache
+from defectdojo_client import DefectDojoSession
+from defectdojo_processes import new_process_pool
+
+
+def load_script(file_name, module_name):
+    """Import one of the hyphenated uploader scripts as a module"""
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(SCRIPT_DIR, file_name))
+    module = importlib.util.module_from_spec(spec)
+    # Registered so process-pool workers can unpickle references into it
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def timed(func, repeat):
+    """Return (best seconds per call, last result) over ``repeat`` calls"""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+class StubDefectDojoHandler(BaseHTTPRequestHandler):
+    """Minimal DefectDojo v2 API: paginated, filterable engagement search"""
+
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out as separate writes; avoid Nagle/delayed-ACK stalls
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.server.bytes_sent += len(body)
+        self.server.request_count += 1
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+        if url.path != '/api/v2/engagements/':
+            self._send_json(200, {'count': 0, 'next': None, 'previous': None, 'results': []})
+            return
+
+        results = [
+            eng for eng in self.server.engagements
+            if eng['name'] == query.get('name', eng['name'])
+            and str(eng['product']) == query.get('product', str(eng['product']))
+            and eng['target_start'].startswith(query.get('target_start', ''))
+        ]
+
+        # No limit mimics a server configured with a page size larger than the result set
+        offset = int(query.get('offset', 0))
+        limit = int(query['limit']) if 'limit' in query else len(results)
+        page = results[offset:offset + limit]
+
+        next_url = None
+        if offset + limit < len(results):
+            next_query = dict(query, offset=offset + limit, limit=limit)
+            next_url = f"http://{self.headers['Host']}{url.path}?{urlencode(next_query)}"
+
+        self._send_json(200, {'count': len(results), 'next': next_url, 'previous': None, 'results': page})
+
+
+def start_stub_server(**state):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubDefectDojoHandler)
+    server.daemon_threads = True
+    server.bytes_sent = 0
+    server.request_count = 0
+    for key, value in state.items():
+        setattr(server, key, value)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def bench_engagement_lookup(args):
+    """Client-side date scan over every engagement vs server-side filtered lookup"""
+    uploader_module = load_script('upload-reports-enhanced.py', 'upload_reports_enhanced')
+    engagement_name = 'CI/CD Pipeline - main'
+    today = datetime.now()
+
+    # Oldest first, so today's engagement is the last one a client-side scan reaches
+    engagements = [
+        {
+            'id': index + 1,
+            'name': engagement_name,
+            'product': 1,
+            'target_start': (today - timedelta(days=args.engagements - 1 - index)).strftime('%Y-%m-%d')
+        }
+        for index in range(args.engagements)
+    ]
+    server = start_stub_server(engagements=engagements)
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    uploader = uploader_module.DefectDojoUploader(
+        base_url, 'benchmark-token', 'benchmark-product',
+        engagement_name=engagement_name,
+        session=DefectDojoSession(),
+        id_cache=DefectDojoIDCache(ttl=0)
+    )
+
+    def legacy_lookup():
+        # Previous behaviour: fetch every engagement for name+product and scan dates locally
+        engagement_date = datetime.now().strftime('%Y-%m-%d')
+        search_url = f"{base_url}/api/v2/engagements/?name={engagement_name}&product=1"
+        response = uploader.session.get(search_url, headers=uploader.headers)
+        for eng in response.json().get('results', []):
+            if eng['target_start'].startswith(engagement_date):
+                return eng['id']
+        return None
+
+    def filtered_lookup():
+        for page in uploader.iter_engagement_pages(uploader.engagement_search_url(1)):
+            for eng in page:
+                if eng['target_start'].startswith(datetime.now().strftime('%Y-%m-%d')):
+                    return eng['id']
+        return None
+
+    print(f"📊 Engagement lookup against a stub server with {args.engagements:,} engagements")
+    for label, lookup in (('client-side scan', legacy_lookup), ('server-side filter', filtered_lookup)):
+        server.bytes_sent = 0
+        server.request_count = 0
+        seconds, engagement_id = timed(lookup, args.repeat)
+        print(f"   {label:<20} {seconds * 1000:9.2f} ms/lookup  "
+              f"{server.bytes_sent // args.repeat:>10,} bytes  "
+              f"{server.request_count // args.repeat} request(s)  -> ID {engagement_id}")
+
+    server.shutdown()
+
+
+def iter_synthetic_zap_xml(alerts, instances):
+    """Yield a ZAP XML report with ``alerts`` alertitems of ``instances`` instances each"""
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n<OWASPZAPReport version="2.12">\n'
+    yield '<site name="https://bench.example.com"><alerts>\n'
+    for index in range(alerts):
+        yield (
+            f'<alertitem><pluginid>{10000 + index % 200}</pluginid>'
+            f'<alert>Synthetic Alert {index % 200}</alert><name>Synthetic Alert {index % 200}</name>'
+            f'<riskcode>{index % 4}</riskcode><confidence>2</confidence>'
+            f'<desc>Synthetic description for benchmarking the extractor.</desc>'
+            f'<instances>'
+        )
+        for instance in range(instances):
+            yield (
+                f'<instance><uri>https://bench.example.com/page/{index}/{instance}</uri>'
+                f'<method>GET</method><param>q</param><attack></attack>'
+                f'<evidence>evidence {instance}</evidence></instance>'
+            )
+        yield (
+            '</instances><count>1</count>'
+            '<solution>Fix it.</solution><reference>https://owasp.org/</reference>'
+            f'<cweid>{index % 1000}</cweid><wascid>13</wascid></alertitem>\n'
+        )
+    yield '</alerts></site>\n</OWASPZAPReport>\n'
+
+
+def synthetic_zap_xml(alerts, instances):
+    return ''.join(iter_synthetic_zap_xml(alerts, instances))
+
+
+def bench_zap_alert_extraction(args):
+    """Per-field descendant searches vs single-pass child extraction of ZAP alerts"""
+    zap_module = load_script('zap-xml-defectdojo-uploader.py', 'zap_xml_defectdojo_uploader')
+    uploader = zap_module.ZAPXMLDefectDojoUploader(
+        'http://127.0.0.1', 'benchmark-token', 'benchmark-product',
+        session=DefectDojoSession(), id_cache=DefectDojoIDCache(ttl=0)
+    )
+    root = ET.fromstring(synthetic_zap_xml(args.alerts, args.instances))
+    alert_items = root.findall('.//alertitem')
+    site_name = 'https://bench.example.com'
+
+    def descendant_text(element, tag, default=''):
+        # Previous _get_xml_text: a './/' search re-walking the subtree per field
+        found = element.find(f'.//{tag}')
+        return found.text if found is not None and found.text else default
+
+    def legacy_extract():
+        extracted = 0
+        for alert in alert_items:
+            fields = [descendant_text(alert, tag) for tag in
+                      ('pluginid', 'name', 'riskcode', 'confidence', 'desc',
+                       'solution', 'reference', 'cweid', 'wascid')]
+            instance = alert.find('.//instance')
+            if instance is not None:
+                fields += [descendant_text(instance, tag) for tag in
+                           ('uri', 'method', 'param', 'attack', 'evidence')]
+            extracted += bool(fields[0])
+        return extracted
+
+    def single_pass_extract():
+        return sum(1 for alert in alert_items if uploader._extract_finding_from_alert(alert, site_name))
+
+    print(f"📊 Field extraction over {len(alert_items):,} alerts with {args.instances} instance(s) each")
+    for label, extract in (('descendant search', legacy_extract), ('single pass', single_pass_extract)):
+        seconds, extracted = timed(extract, args.repeat)
+        print(f"   {label:<20} {seconds * 10000 / len(alert_items) * 1000:9.2f} ms/10k alerts  "
+              f"{len(alert_items) / seconds:>12,.0f} alerts/s  -> {extracted:,} extracted")
+
+
+def _retain_findings(xml_path, representation, results):
+    """Child process body for finding-memory: parse, keep every finding, report peak RSS"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        zap_module = load_script('zap-xml-defectdojo-uploader.py', 'zap_xml_defectdojo_uploader')
+        uploader = zap_module.ZAPXMLDefectDojoUploader(
+            'http://127.0.0.1', 'benchmark-token', 'benchmark-product',
+            session=DefectDojoSession(), id_cache=DefectDojoIDCache(ttl=0)
+        )
+        findings = uploader.iter_zap_xml_findings(xml_path)
+        if representation == 'none':
+            retained = sum(1 for _ in findings)
+        elif representation == 'dict':
+            # Previous in-memory representation: one ~25-key dict per finding
+            retained = len([finding.to_dict() for finding in findings])
+        else:
+            retained = len(list(findings))
+    # ru_maxrss is KiB on Linux
+    results.put((retained, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss))
+
+
+def bench_finding_memory(args):
+    """Peak RSS holding every finding as a 25-key dict vs a slotted Finding"""
+    with tempfile.NamedTemporaryFile('w', suffix='.xml', delete=False) as report:
+        # Streamed to disk: the child inherits the parent's RSS high-water mark
+        report.writelines(iter_synthetic_zap_xml(args.findings, 1))
+    try:
+        # Fresh interpreter per representation so peak RSS is not inherited
+        context = multiprocessing.get_context('spawn')
+        print(f"📊 Peak RSS retaining {args.findings:,} findings parsed from a synthetic ZAP XML report")
+        for label, representation in (('parse only', 'none'), ('dict findings', 'dict'),
+                                      ('slotted Finding', 'slots')):
+            results = context.Queue()
+            worker = context.Process(target=_retain_findings, args=(report.name, representation, results))
+            worker.start()
+            retained, peak_kib = results.get()
+            worker.join()
+            print(f"   {label:<20} {peak_kib / 1024:9.1f} MiB peak RSS  ({retained:,} findings)")
+    finally:
+        os.unlink(report.name)
+
+
+def iter_multisite_zap_xml(sites, plugins, text_bytes):
+    """Yield a ZAP XML report where every site raises the same ``plugins`` alerts
+
+    Each pluginid carries its own desc/solution/reference text of roughly
+    ``text_bytes`` in total, repeated verbatim on every site as ZAP does.
+    """
+    yield '<?xml version="1.0" encoding="UTF-8"?>\n<OWASPZAPReport version="2.12">\n'
+    sentence = 'The response does not protect against &quot;this&quot; issue on every page. '
+    for site in range(sites):
+        yield f'<site name="https://site-{site}.bench.example.com"><alerts>\n'
+        for plugin in range(plugins):
+            text = f'Plugin {plugin}: ' + sentence * max(1, text_bytes // 3 // len(sentence))
+            yield (
+                f'<alertitem><pluginid>{10000 + plugin}</pluginid><alert>Synthetic Alert {plugin}</alert>'
+                f'<riskcode>{plugin % 4}</riskcode><confidence>2</confidence><desc>{text}</desc>'
+                f'<instances><instance><uri>https://site-{site}.bench.example.com/p/{plugin}</uri>'
+                f'<method>GET</method><param>q</param><attack></attack><evidence></evidence>'
+                f'</instance></instances><solution>{text}</solution><reference>{text}</reference>'
+                f'<cweid>{plugin % 1000}</cweid><wascid>13</wascid></alertitem>\n'
+            )
+        yield '</alerts></site>\n'
+    yield '</OWASPZAPReport>\n'
+
+
+def iter_synthetic_zap_json(sites, alerts, instances, body_bytes):
+    """Yield a ZAP JSON report whose instances carry ~``body_bytes`` HTTP bodies"""
+    html = '<html><body><p class="row">Benchmark "content" \\ line</p>\n</body></html>\n'
+    response = 'HTTP/1.1 200 OK\r\nContent-Type: text/html\r\n\r\n' + html * max(body_bytes // len(html), 1)
+    yield '{"@programName": "ZAP", "@version": "2.12.0", "site": ['
+    for site in range(sites):
+        yield (f'{", " if site else ""}{{"@name": "https://site{site}.bench.example.com", '
+               f'"@host": "site{site}.bench.example.com", "@port": "443", "@ssl": "true", "alerts": [')
+        for index in range(alerts):
+            # Instances of an alert often share a page; 50 distinct pages per site
+            page = f'X-Page: {index % 50}\r\n' + response
+            alert_instances = ', '.join(json.dumps({
+                'uri': f'https://site{site}.bench.example.com/page/{index}/{instance}',
+                'method': 'GET', 'param': 'q', 'attack': '', 'evidence': f'evidence {instance}',
+                'request': f'GET /page/{index}/{instance} HTTP/1.1\r\nHost: bench.example.com\r\n\r\n',
+                'response': page,
+            }) for instance in range(instances))
+            yield (
+                f'{", " if index else ""}{{"pluginid": "{10000 + index % 200}", "alertRef": "{10000 + index % 200}", '
+                f'"alert": "Synthetic Alert {index % 200}", "name": "Synthetic Alert {index % 200}", '
+                f'"riskcode": "{index % 4}", "confidence": "2", "riskdesc": "Medium (Medium)", '
+                f'"desc": "Synthetic description for benchmarking the extractor.", '
+                f'"instances": [{alert_instances}], "count": "{instances}", "solution": "Fix it.", '
+                f'"otherinfo": "", "reference": "https://owasp.org/", "cweid": "{index % 1000}", '
+                f'"wascid": "13", "sourceid": "1"}}'
+            )
+        yield ']}'
+    yield ']}\n'
+
+
+def _convert_zap_json(json_path, mode, results):
+    """Child process body for zap-json-memory: convert a report, report peak RSS and time"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        enhanced = load_script('upload-reports-enhanced.py', 'upload_reports_enhanced')
+        uploader = enhanced.DefectDojoUploader(
+            'http://127.0.0.1', 'benchmark-token', 'benchmark-product',
+            session=DefectDojoSession(), id_cache=DefectDojoIDCache(ttl=0)
+        )
+        start = time.perf_counter()
+        if mode == 'load':
+            # Previous reader: the whole document in memory to reach site[0].alerts
+            with open(json_path, 'r') as f:
+                report = json.load(f)
+            converted = sum(1 for alert in report['site'][0]['alerts'] if alert.get('instances'))
+        else:
+            converted = sum(1 for _ in uploader.iter_zap_dast_findings(json_path))
+        seconds = time.perf_counter() - start
+    results.put((converted, seconds, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss))
+
+
+def bench_zap_json_memory(args):
+    """Peak RSS and time of json.load vs the streaming ZAP JSON reader"""
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as report:
+        report.writelines(iter_synthetic_zap_json(1, args.alerts, args.instances, args.body_bytes))
+    try:
+        size = os.path.getsize(report.name)
+        context = multiprocessing.get_context('spawn')
+        print(f"📊 Converting a {size / 1024 / 1024:,.1f} MiB ZAP JSON report "
+              f"({args.alerts:,} alerts x {args.instances} instances, ~{args.body_bytes:,} byte bodies)")
+        for label, mode in (('json.load', 'load'), ('streaming reader', 'stream')):
+            results = context.Queue()
+            worker = context.Process(target=_convert_zap_json, args=(report.name, mode, results))
+            worker.start()
+            converted, seconds, peak_kib = results.get()
+            worker.join()
+            print(f"   {label:<20} {peak_kib / 1024:9.1f} MiB peak RSS  {seconds:7.2f} s  ({converted:,} findings)")
+    finally:
+        os.unlink(report.name)
+
+
+def bench_zap_json_sites(args):
+    """Sequential vs per-site process-pool conversion of a multi-site ZAP JSON report"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        enhanced = load_script('upload-reports-enhanced.py', 'upload_reports_enhanced')
+        uploader = enhanced.DefectDojoUploader(
+            'http://127.0.0.1', 'benchmark-token', 'benchmark-product',
+            session=DefectDojoSession(), id_cache=DefectDojoIDCache(ttl=0)
+        )
+
+    alerts_per_site = max(args.alerts // args.sites, 1)
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as report:
+        report.writelines(iter_synthetic_zap_json(args.sites, alerts_per_site, args.instances, args.body_bytes))
+    try:
+        size = os.path.getsize(report.name)
+        print(f"📊 Converting a {size / 1024 / 1024:,.1f} MiB ZAP JSON report ({args.sites} sites x "
+              f"{alerts_per_site:,} alerts x {args.instances} instances) on {os.cpu_count()} CPU(s)")
+
+        def convert(workers):
+            with contextlib.redirect_stdout(io.StringIO()):
+                return [finding.to_dict() for finding in uploader.iter_zap_dast_findings(report.name, workers)]
+
+        baseline, expected = timed(lambda: convert(1), args.repeat)
+        print(f"   {'sequential':<24} {baseline:8.2f} s  -> {len(expected):,} findings")
+        for workers in sorted({count for count in (2, 4, args.workers) if count > 1}):
+            seconds, findings = timed(lambda: convert(workers), args.repeat)
+            print(f"   {f'{workers} worker processes':<24} {seconds:8.2f} s  -> {len(findings):,} findings  "
+                  f"{baseline / seconds:5.2f}x  identical: {findings == expected}")
+    finally:
+        os.unlink(report.name)
+
+
+def bench_evidence_store(args):
+    """Import payload size and encode time with bodies inline vs in the evidence store"""
+    from defectdojo_evidence import EvidenceStore
+    from defectdojo_findings import iter_import_body
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        enhanced = load_script('upload-reports-enhanced.py', 'upload_reports_enhanced')
+        uploader = enhanced.DefectDojoUploader(
+            'http://127.0.0.1', 'benchmark-token', 'benchmark-product',
+            session=DefectDojoSession(), id_cache=DefectDojoIDCache(ttl=0), parse_workers=1
+        )
+
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as report:
+        report.writelines(iter_synthetic_zap_json(1, args.alerts, args.instances, args.body_bytes))
+    try:
+        size = os.path.getsize(report.name)
+        print(f"📊 {size / 1024 / 1024:,.1f} MiB ZAP JSON report ({args.alerts:,} alerts x {args.instances} "
+              f"instances, ~{args.body_bytes:,} byte responses, 50 distinct pages)")
+        for label, max_chars in (('bodies inline', 0), ('evidence store', enhanced.DEFAULT_EVIDENCE_MAX_BYTES)):
+            evidence = EvidenceStore(max_chars) if max_chars else None
+            with contextlib.redirect_stdout(io.StringIO()):
+                findings = uploader.extract_zap_dast_findings(report.name, evidence)
+            seconds, payload = timed(lambda: sum(len(chunk) for chunk in iter_import_body({}, findings)),
+                                     args.repeat)
+            print(f"   {label:<18} {payload / 1024 / 1024:9.1f} MiB import body  {seconds * 1000:9.1f} ms encode"
+                  + (f"  + {len(evidence.attachments())} attachments, "
+                     f"{sum(os.path.getsize(path) for _, path in evidence.attachments()) / 1024 / 1024:.1f} MiB"
+                     if evidence else ""))
+            if evidence:
+                evidence.close()
+            del findings
+    finally:
+        os.unlink(report.name)
+
+
+def iter_synthetic_gitleaks(findings):
+    """Yield a Gitleaks JSON report with ``findings`` leaks"""
+    yield '['
+    for index in range(findings):
+        secret = f'AKIA{index:016d}'
+        yield ('{}{}'.format(', ' if index else '', json.dumps({
+            'Description': 'AWS Access Key', 'StartLine': index % 400, 'EndLine': index % 400,
+            'StartColumn': 12, 'EndColumn': 32, 'Match': f'aws_access_key_id = {secret}', 'Secret': secret,
+            'File': f'src/module{index % 500}/config.js', 'Commit': f'{index:040x}', 'Entropy': 3.7,
+            'Author': 'Benchmark Author', 'Email': 'bench@example.com', 'Date': '2024-01-01T00:00:00Z',
+            'Message': 'Add configuration', 'Tags': [], 'RuleID': 'aws-access-token',
+            'Fingerprint': f'{index:040x}:src/module{index % 500}/config.js:aws-access-token:{index % 400}',
+        })))
+    yield ']\n'
+
+
+def iter_synthetic_semgrep(findings):
+    """Yield a Semgrep JSON report with ``findings`` results"""
+    yield '{"errors": [], "results": ['
+    for index in range(findings):
+        yield ('{}{}'.format(', ' if index else '', json.dumps({
+            'check_id': f'javascript.express.security.audit.rule-{index % 150}',
+            'path': f'src/module{index % 500}/handler.js',
+            'start': {'line': index % 400, 'col': 5, 'offset': index}, 'end': {'line': index % 400, 'col': 60},
+            'extra': {
+                'message': 'User input flows into a response without escaping. ' * 3,
+                'severity': ('ERROR', 'WARNING', 'INFO')[index % 3],
+                'metadata': {'cwe': [f'CWE-{(79, 89, 22)[index % 3]}: Improper Neutralization'],
+                             'references': ['https://owasp.org/Top10/'], 'confidence': 'MEDIUM'},
+                'lines': 'res.send(req.query.name)', 'fingerprint': f'{index:064x}',
+            },
+        })))
+    yield '], "paths": {"scanned": [%s]}, "version": "1.50.0"}\n' % ', '.join(
+        f'"src/module{index}/handler.js"' for index in range(500))
+
+
+def iter_synthetic_trivy(findings):
+    """Yield a Trivy JSON report with ``findings`` vulnerabilities over 20 targets"""
+    yield ('{"SchemaVersion": 2, "ArtifactName": "bench", "ArtifactType": "container_image", "Metadata": %s, '
+           '"Results": [' % json.dumps({'ImageConfig': {'history': [{'created_by': 'RUN step ' * 20}] * 200}}))
+    per_target = max(findings // 20, 1)
+    for target in range(20):
+        yield f'{", " if target else ""}{{"Target": "layer{target}/package-lock.json", "Class": "lang-pkgs", ' \
+              f'"Type": "npm", "Vulnerabilities": ['
+        for index in range(per_target):
+            yield ('{}{}'.format(', ' if index else '', json.dumps({
+                'VulnerabilityID': f'CVE-2024-{index:05d}', 'PkgName': f'package-{index % 900}',
+                'InstalledVersion': '1.2.3', 'FixedVersion': '1.2.4',
+                'Severity': ('CRITICAL', 'HIGH', 'MEDIUM', 'LOW')[index % 4],
+                'Title': 'Prototype pollution', 'Description': 'A crafted payload pollutes Object.prototype. ' * 8,
+                'CweIDs': ['CWE-1321'], 'References': [f'https://nvd.nist.gov/vuln/detail/CVE-2024-{index:05d}'],
+            })))
+        yield ']}'
+    yield ']}\n'
+
+
+def iter_synthetic_sarif(findings):
+    """Yield a SARIF log with ``findings`` results over 150 rules"""
+    rules = [{'id': f'rule_{rule}', 'shortDescription': {'text': f'Synthetic rule {rule}'},
+              'helpUri': 'https://owasp.org/', 'help': {'text': 'Validate input.'},
+              'defaultConfiguration': {'level': 'warning'}, 'properties': {'tags': [f'CWE-{(79, 89, 22)[rule % 3]}']}}
+             for rule in range(150)]
+    yield '{"version": "2.1.0", "runs": [{"tool": {"driver": {"name": "bench", "rules": %s}}, "results": [' % (
+        json.dumps(rules))
+    for index in range(findings):
+        yield ('{}{}'.format(', ' if index else '', json.dumps({
+            'ruleId': f'rule_{index % 150}', 'ruleIndex': index % 150,
+            'message': {'text': 'Untrusted data reaches a sensitive sink. ' * 3},
+            'locations': [{'physicalLocation': {
+                'artifactLocation': {'uri': f'src/module{index % 500}/db.js'},
+                'region': {'startLine': index % 400, 'snippet': {'text': 'db.query(sql + input)'}}}}],
+            'partialFingerprints': {'primaryLocationLineHash': f'{index:016x}:1'},
+        })))
+    yield ']}]}\n'
+
+
+def iter_synthetic_dependency_track(findings):
+    """Yield a Dependency-Track findings export with ``findings`` entries"""
+    yield '['
+    for index in range(findings):
+        yield ('{}{}'.format(', ' if index else '', json.dumps({
+            'component': {'uuid': f'{index:032x}', 'name': f'package-{index % 900}', 'version': '1.2.3',
+                          'purl': f'pkg:npm/package-{index % 900}@1.2.3'},
+            'vulnerability': {'vulnId': f'CVE-2024-{index:05d}', 'source': 'NVD',
+                              'severity': ('CRITICAL', 'HIGH', 'MEDIUM', 'LOW')[index % 4],
+                              'description': 'A crafted payload pollutes Object.prototype. ' * 8,
+                              'cwes': [{'cweId': 1321, 'name': 'Prototype Pollution'}]},
+            'analysis': {'isSuppressed': False}, 'matrix': f'p:{index:032x}:v',
+        })))
+    yield ']\n'
+
+
+# Benchmark label -> (scan type, synthetic report generator)
+SYNTHETIC_REPORTS = {
+    'gitleaks': ('Gitleaks Scan', iter_synthetic_gitleaks),
+    'semgrep': ('Semgrep JSON Report', iter_synthetic_semgrep),
+    'trivy': ('Trivy Scan', iter_synthetic_trivy),
+    'sarif': ('SARIF', iter_synthetic_sarif),
+    'dependency-track': ('Dependency-Track Scan', iter_synthetic_dependency_track),
+}
+
+
+def _convert_native_report(report_path, scan_type, mode, results):
+    """Child process body for native-adapters: convert a report, report peak RSS and time"""
+    from defectdojo_adapters import ADAPTERS
+
+    start = time.perf_counter()
+    if mode == 'load':
+        # What a json.load based parser holds before the first finding
+        with open(report_path, 'rb') as f:
+            report = json.load(f)
+        converted = len(report)
+    else:
+        with open(report_path, 'rb') as f:
+            converted = sum(1 for _ in ADAPTERS[scan_type](f))
+    seconds = time.perf_counter() - start
+    results.put((converted, seconds, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss))
+
+
+def bench_native_adapters(args):
+    """Throughput and peak RSS of each Gitleaks/Semgrep/Trivy/SARIF/Dependency-Track adapter vs json.load"""
+    context = multiprocessing.get_context('spawn')
+    print(f"📊 Converting synthetic reports with {args.findings:,} findings each")
+    for label, (scan_type, generate) in SYNTHETIC_REPORTS.items():
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as report:
+            report.writelines(generate(args.findings))
+        try:
+            size = os.path.getsize(report.name) / 1024 / 1024
+            measured = {}
+            for mode in ('load', 'stream'):
+                results = context.Queue()
+                worker = context.Process(target=_convert_native_report,
+                                         args=(report.name, scan_type, mode, results))
+                worker.start()
+                measured[mode] = results.get()
+                worker.join()
+            converted, seconds, peak_kib = measured['stream']
+            _, load_seconds, load_peak_kib = measured['load']
+            print(f"   {label:<18} {size:6.1f} MiB  {converted:>8,} findings  {seconds:6.2f} s  "
+                  f"{converted / seconds:>8,.0f} findings/s  {size / seconds:5.1f} MiB/s  "
+                  f"peak RSS {peak_kib / 1024:5.1f} MiB  "
+                  f"(json.load alone: {load_seconds:5.2f} s, {load_peak_kib / 1024:5.1f} MiB)")
+        finally:
+            os.unlink(report.name)
+
+
+def bench_alert_text_cache(args):
+    """Retained memory and JSON encode time with and without the pluginid text cache"""
+    findings_module = load_script('defectdojo_findings.py', 'defectdojo_findings')
+    with contextlib.redirect_stdout(io.StringIO()):
+        zap_module = load_script('zap-xml-defectdojo-uploader.py', 'zap_xml_defectdojo_uploader')
+
+        class UncachedUploader(zap_module.ZAPXMLDefectDojoUploader):
+            def _alert_template(self, alert, site_name, text_cache=None):
+                return super()._alert_template(alert, site_name, None)
+
+        uploaders = [
+            (label, uploader_class(
+                'http://127.0.0.1', 'benchmark-token', 'benchmark-product',
+                session=DefectDojoSession(), id_cache=DefectDojoIDCache(ttl=0)
+            ), encode)
+            for label, uploader_class, encode in (
+                ('copy per alert', UncachedUploader, lambda finding: json.dumps(finding.to_dict())),
+                ('pluginid cache', zap_module.ZAPXMLDefectDojoUploader, findings_module.encode_finding),
+            )
+        ]
+
+    with tempfile.NamedTemporaryFile('w', suffix='.xml', delete=False) as report:
+        report.writelines(iter_multisite_zap_xml(args.sites, args.plugins, args.text_bytes))
+    try:
+        print(f"📊 {args.sites} site(s) x {args.plugins} plugin(s), ~{args.text_bytes:,} bytes of alert text each")
+        for label, uploader, encode in uploaders:
+            with contextlib.redirect_stdout(io.StringIO()):
+                tracemalloc.start()
+                findings = list(uploader.iter_zap_xml_findings(report.name))
+                retained, _ = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+            seconds, _ = timed(lambda: [encode(finding) for finding in findings], args.repeat)
+            print(f"   {label:<20} {retained / 1024 / 1024:9.1f} MiB retained  "
+                  f"{seconds * 1000:9.1f} ms JSON encode  ({len(findings):,} findings)")
+            del findings
+    finally:
+        os.unlink(report.name)
+
+
+def bench_parallel_parse(args):
+    """Sequential vs process-pool parsing of several ZAP XML reports"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        zap_module = load_script('zap-xml-defectdojo-uploader.py', 'zap_xml_defectdojo_uploader')
+
+    report_dir = tempfile.mkdtemp(prefix='zap-bench-')
+    paths = []
+    for index in range(args.reports):
+        path = os.path.join(report_dir, f'report-{index}.xml')
+        with open(path, 'w') as report:
+            report.writelines(iter_synthetic_zap_xml(args.alerts, args.instances))
+        paths.append(path)
+
+    def sequential():
+        with contextlib.redirect_stdout(io.StringIO()):
+            zap_module._init_parse_worker(False)
+            return sum(len(zap_module._parse_report(path)[0]) for path in paths)
+
+    def process_pool():
+        with contextlib.redirect_stdout(io.StringIO()):
+            with new_process_pool(args.workers, zap_module._init_parse_worker, (False,)) as pool:
+                return sum(len(batch) for batch, _ in pool.map(zap_module._parse_report, paths))
+
+    try:
+        print(f"📊 Parsing {args.reports} reports of {args.alerts:,} alerts on {os.cpu_count()} CPU(s)")
+        for label, parse in (('sequential', sequential), (f'{args.workers} worker process(es)', process_pool)):
+            seconds, findings = timed(parse, args.repeat)
+            print(f"   {label:<24} {seconds:8.2f} s  -> {findings:,} findings")
+    finally:
+        for path in paths:
+            os.unlink(path)
+        os.rmdir(report_dir)
+
+
+def bench_split_parse(args):
+    """Serial parse vs byte-range split parse of one large ZAP XML report"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        zap_module = load_script('zap-xml-defectdojo-uploader.py', 'zap_xml_defectdojo_uploader')
+        uploader = zap_module.ZAPXMLDefectDojoUploader(
+            'http://127.0.0.1', 'benchmark-token', 'benchmark-product',
+            session=DefectDojoSession(), id_cache=DefectDojoIDCache(ttl=0)
+        )
+
+    with tempfile.NamedTemporaryFile('w', suffix='.xml', delete=False) as report:
+        report.writelines(iter_multisite_zap_xml(args.sites, args.plugins, args.text_bytes))
+    try:
+        size = os.path.getsize(report.name)
+        print(f"📊 Parsing one {size / 1024 / 1024:,.1f} MiB report "
+              f"({args.sites} sites x {args.plugins} alerts) on {os.cpu_count()} CPU(s)")
+
+        def serial():
+            with contextlib.redirect_stdout(io.StringIO()):
+                return [finding.to_dict() for finding in uploader.iter_zap_xml_findings(report.name)]
+
+        baseline, expected = timed(serial, args.repeat)
+        print(f"   {'serial':<24} {baseline:8.2f} s  -> {len(expected):,} findings")
+
+        for workers in sorted({count for count in (2, 4, args.workers) if count > 1}):
+            def split():
+                with contextlib.redirect_stdout(io.StringIO()):
+                    return [finding.to_dict()
+                            for finding in uploader.iter_zap_xml_findings_split(report.name, workers)]
+
+            seconds, findings = timed(split, args.repeat)
+            print(f"   {f'split, {workers} workers':<24} {seconds:8.2f} s  -> {len(findings):,} findings  "
+                  f"{baseline / seconds:5.2f}x  identical: {findings == expected}")
+    finally:
+        os.unlink(report.name)
+
+
+def bench_owasp_classification(args):
+    """Per-alert cost of the shared OWASP classifier vs a plain title dict lookup"""
+    from defectdojo_classification import OWASPClassifier
+
+    # Mix of alerts resolved by each index, plus alerts nothing matches
+    samples = (
+        ('10038', '693', 'Content Security Policy (CSP) Header Not Set'),
+        ('40012', '79', 'Cross Site Scripting (Reflected)'),
+        ('99999', '352', 'Custom CSRF Check'),
+        ('99998', '', 'X-Frame-Options Header Not Set'),
+        ('99997', '', 'Cookie Without Secure Flag'),
+        ('99996', '', 'Unclassified Custom Alert'),
+    )
+    alerts = [samples[index % len(samples)] for index in range(args.findings)]
+    titles = {title: 'A05:2021-Security Misconfiguration' for _, _, title in samples[:3]}
+
+    classifier = OWASPClassifier()
+    load_start = time.perf_counter()
+    classifier.classify()
+    load_seconds = time.perf_counter() - load_start
+
+    print(f"📊 Classifying {len(alerts):,} alerts (data {classifier.version}, loaded in {load_seconds * 1000:.1f} ms)")
+    for label, classify in (
+        ('title dict lookup', lambda: [titles.get(title) for _, _, title in alerts]),
+        ('shared classifier', lambda: [classifier.classify(plugin_id, cwe, title) for plugin_id, cwe, title in alerts]),
+    ):
+        seconds, _ = timed(classify, args.repeat)
+        print(f"   {label:<20} {seconds * 1000:8.1f} ms  ({seconds / len(alerts) * 1e9:6.0f} ns/alert)")
+    print(f"   {classifier.format_stats()}")
+
+
+BENCHMARKS = {
+    'engagement-lookup': bench_engagement_lookup,
+    'zap-alert-extraction': bench_zap_alert_extraction,
+    'finding-memory': bench_finding_memory,
+    'alert-text-cache': bench_alert_text_cache,
+    'parallel-parse': bench_parallel_parse,
+    'split-parse': bench_split_parse,
+    'owasp-classification': bench_owasp_classification,
+    'zap-json-memory': bench_zap_json_memory,
+    'zap-json-sites': bench_zap_json_sites,
+    'evidence-store': bench_evidence_store,
+    'native-adapters': bench_native_adapters,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks for the DefectDojo upload scripts")
+    parser.add_argument('benchmark', nargs='?', choices=sorted(BENCHMARKS))
+    parser.add_argument('--list', action='store_true', help="List available benchmarks")
+    parser.add_argument('--repeat', type=int, default=5, help="Runs per measurement; the best is reported")
+    parser.add_argument('--engagements', type=int, default=10000,
+                        help="Engagements served by the stub server (engagement-lookup)")
+    parser.add_argument('--alerts', type=int, default=10000, help="Alerts in the synthetic ZAP report")
+    parser.add_argument('--body-bytes', type=int, default=2048,
+                        help="HTTP response body size per instance (zap-json-memory, zap-json-sites, evidence-store)")
+    parser.add_argument('--instances', type=int, default=10, help="Instances per synthetic ZAP alert")
+    parser.add_argument('--findings', type=int, default=100000,
+                        help="Findings in the synthetic report (finding-memory, owasp-classification, "
+                             "native-adapters)")
+    parser.add_argument('--sites', type=int, default=50,
+                        help="Sites in the synthetic report (alert-text-cache, split-parse, zap-json-sites)")
+    parser.add_argument('--plugins', type=int, default=300,
+                        help="Distinct pluginids per site (alert-text-cache, split-parse)")
+    parser.add_argument('--reports', type=int, default=8, help="Reports to parse (parallel-parse)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Worker processes (parallel-parse)")
+    parser.add_argument('--text-bytes', type=int, default=4096,
+                        help="desc+solution+reference size per plugin (alert-text-cache, split-parse)")
+    args = parser.parse_args()
+
+    if args.list or not args.benchmark:
+        for name, func in sorted(BENCHMARKS.items()):
+            print(f"   {name:<24} {func.__doc__}")
+        sys.exit(0)
+
+    BENCHMARKS[args.benchmark](args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,479 @@
+#!/usr/bin/env python3
+
+"""
+🔌 DEFECTDOJO NATIVE REPORT ADAPTERS
+========================================
+Description: Streaming Gitleaks / Semgrep / Trivy / SARIF / Dependency-Track parsers
+Author: Security Team
+Version: 1.0.0
+
+Only ZAP reports used to be converted on our side; every other scanner
+report was posted to DefectDojo as an opaque file for the server to parse.
+Each adapter here walks one report format with JSONStreamReader and yields
+the same slotted Finding objects as the ZAP path, so whatever the uploader
+does with findings before the import applies to every scanner.
+
+The adapters are opt-in (DEFECTDOJO_NATIVE_ADAPTERS=1 or --native-adapters).
+DefectDojo only parses these scan types from a report file, so the
+converted findings are written as a Generic Findings Import file, titled
+with the original scan type, and posted through the multipart import path.
+
+Reports are never loaded whole. The walker skips the sections it does not
+need (Trivy image metadata, Semgrep path lists, SARIF artifacts) and decodes
+one result at a time, so memory is bounded by the largest single result.
+
+   Report                        Findings from
+   gitleaks.json                 top-level array
+   semgrep.json                  results[]
+   trivy_*_report.json           Results[].Vulnerabilities / Misconfigurations / Secrets
+   *.sarif                       runs[].results[], titled from runs[].tool.driver.rules
+   dependency_track_findings     top-level array, or {"findings": [...]}
+
+Field order assumptions match what the scanners write: Trivy's Target comes
+before its finding arrays and SARIF's tool before its results. A SARIF run
+that lists results first still converts, titled by rule id only.
+
+Gitleaks secrets are never copied into a finding: the Secret field is
+dropped and its occurrence in Match is masked.
+
+Every adapter takes an optional FindingFilter (see defectdojo_filters) and
+checks it on the decoded result before building a finding; the location
+rules match the result's file path.
+"""
+
+import re
+
+from defectdojo_classification import get_classifier
+from defectdojo_findings import Finding
+from defectdojo_jsonstream import JSONStreamReader
+
+_CWE_ID = re.compile(r'cwe[-_/ ]?0*(\d+)', re.I)
+
+# Characters of a secret left visible in front of the mask
+SECRET_VISIBLE_CHARS = 4
+SECRET_MASK = '*' * 8
+
+SEMGREP_SEVERITY = {
+    'CRITICAL': 'Critical', 'HIGH': 'High', 'ERROR': 'High',
+    'MEDIUM': 'Medium', 'WARNING': 'Medium',
+    'LOW': 'Low', 'INFO': 'Low',
+}
+TRIVY_SEVERITY = {'CRITICAL': 'Critical', 'HIGH': 'High', 'MEDIUM': 'Medium', 'LOW': 'Low', 'UNKNOWN': 'Info'}
+SARIF_LEVEL_SEVERITY = {'error': 'High', 'warning': 'Medium', 'note': 'Low', 'none': 'Info'}
+DEPENDENCY_TRACK_SEVERITY = {
+    'CRITICAL': 'Critical', 'HIGH': 'High', 'MEDIUM': 'Medium', 'LOW': 'Low',
+    'INFO': 'Info', 'UNASSIGNED': 'Info',
+}
+
+
+class GitleaksFinding(Finding):
+    """Finding converted from a Gitleaks JSON report"""
+
+    __slots__ = ()
+    test_type = 'Secrets'
+    static_finding = True
+    dynamic_finding = False
+    tags = ('Secrets', 'Gitleaks')
+
+
+class SemgrepFinding(Finding):
+    """Finding converted from a Semgrep JSON report"""
+
+    __slots__ = ()
+    test_type = 'SAST'
+    static_finding = True
+    dynamic_finding = False
+    tags = ('SAST', 'Semgrep')
+
+
+class TrivyFinding(Finding):
+    """Finding converted from a Trivy JSON report"""
+
+    __slots__ = ()
+    test_type = 'SCA'
+    static_finding = True
+    dynamic_finding = False
+    tags = ('SCA', 'Trivy')
+
+
+class SARIFFinding(Finding):
+    """Finding converted from a SARIF log"""
+
+    __slots__ = ()
+    test_type = 'SAST'
+    static_finding = True
+    dynamic_finding = False
+    tags = ('SAST', 'SARIF')
+
+
+class DependencyTrackFinding(Finding):
+    """Finding converted from a Dependency-Track findings export"""
+
+    __slots__ = ()
+    test_type = 'SCA'
+    static_finding = True
+    dynamic_finding = False
+    tags = ('SCA', 'Dependency-Track')
+
+
+def parse_cwe(value):
+    """First CWE number in a string or list such as 'CWE-79: ...' or ['external/cwe/cwe-079']"""
+    if isinstance(value, (list, tuple)):
+        for item in value:
+            cwe = parse_cwe(item)
+            if cwe is not None:
+                return cwe
+        return None
+    if isinstance(value, int):
+        return value
+    match = _CWE_ID.search(value) if isinstance(value, str) else None
+    return int(match.group(1)) if match else None
+
+
+def redact_secret(secret):
+    """A secret reduced to its first few characters and a fixed-width mask"""
+    if len(secret) <= SECRET_VISIBLE_CHARS * 2:
+        return SECRET_MASK
+    return secret[:SECRET_VISIBLE_CHARS] + SECRET_MASK
+
+
+def _iter_items(reader):
+    """(element, its size in bytes) for each element of the array at the reader (null is an empty array)"""
+    if reader.peek() == b'n':
+        reader.skip()
+        return
+    for _ in reader.iter_array():
+        start = reader.tell()
+        item = reader.read()
+        yield item, reader.tell() - start
+
+
+def _iter_key_items(reader, key):
+    """(element, size) pairs of the array under ``key`` of the object at the reader, skipping every other key"""
+    for name in reader.iter_object():
+        if name == key:
+            yield from _iter_items(reader)
+        else:
+            reader.skip()
+
+
+def iter_gitleaks_findings(stream, finding_filter=None):
+    """Findings of a Gitleaks JSON report (a top-level array of leaks)"""
+    classify = get_classifier().classify
+    owasp_top_10 = classify(cwe=798)
+    for leak, nbytes in _iter_items(JSONStreamReader(stream)):
+        file_path = leak.get('File', '')
+        if finding_filter is not None and finding_filter.rejects(nbytes, 'High', 'High', 798, file_path):
+            continue
+        secret = leak.get('Secret') or ''
+        match = leak.get('Match') or ''
+        if secret:
+            match = match.replace(secret, redact_secret(secret))
+        line = leak.get('StartLine')
+        description = leak.get('Description') or leak.get('RuleID', 'Secret')
+        details = [f"Rule: {leak.get('RuleID', '')}", f"File: {file_path}:{line}", f"Match: {match}"]
+        if leak.get('Commit'):
+            details.append(f"Commit: {leak['Commit']} by {leak.get('Author', '')} on {leak.get('Date', '')}")
+        yield GitleaksFinding(
+            title=f"Hard coded {description} found in {file_path}",
+            description='\n'.join(details),
+            severity='High',
+            cwe=798,
+            impact='High',
+            confidence='High',
+            owasp_top_10=owasp_top_10,
+            evidence=match,
+            file_path=file_path,
+            line=line,
+            vuln_id_from_tool=leak.get('RuleID', ''),
+            unique_id_from_tool=leak.get('Fingerprint', ''),
+        )
+
+
+def iter_semgrep_findings(stream, finding_filter=None):
+    """Findings of a Semgrep JSON report (its results[] array)"""
+    classify = get_classifier().classify
+    for result, nbytes in _iter_key_items(JSONStreamReader(stream), 'results'):
+        extra = result.get('extra') or {}
+        metadata = extra.get('metadata') or {}
+        severity = SEMGREP_SEVERITY.get(str(extra.get('severity', '')).upper(), 'Low')
+        confidence = str(metadata.get('confidence', 'Medium')).title()
+        cwe = parse_cwe(metadata.get('cwe'))
+        file_path = result.get('path', '')
+        if finding_filter is not None and finding_filter.rejects(nbytes, severity, confidence, cwe, file_path):
+            continue
+        check_id = result.get('check_id', 'Unknown Semgrep Finding')
+        references = metadata.get('references') or []
+        if isinstance(references, str):
+            references = [references]
+        finding = SemgrepFinding(
+            title=check_id,
+            description=extra.get('message', ''),
+            severity=severity,
+            cwe=cwe,
+            references='\n'.join(references),
+            solution=extra.get('fix', ''),
+            impact=severity,
+            confidence=confidence,
+            owasp_top_10=classify(cwe=cwe, name=check_id),
+            file_path=file_path,
+            line=(result.get('start') or {}).get('line'),
+            vuln_id_from_tool=check_id,
+        )
+        # Semgrep OSS writes 'requires login' in place of these without an account
+        if extra.get('lines') and extra['lines'] != 'requires login':
+            finding.evidence = extra['lines']
+        if extra.get('fingerprint') and extra['fingerprint'] != 'requires login':
+            finding.unique_id_from_tool = extra['fingerprint']
+        yield finding
+
+
+def _trivy_vulnerability(vulnerability, target, classify, finding_filter, nbytes):
+    severity = TRIVY_SEVERITY.get(vulnerability.get('Severity', ''), 'Info')
+    cwe = parse_cwe(vulnerability.get('CweIDs') or [])
+    if finding_filter is not None and finding_filter.rejects(nbytes, severity, 'High', cwe, target):
+        return None
+    vuln_id = vulnerability.get('VulnerabilityID', '')
+    package = vulnerability.get('PkgName', '')
+    version = vulnerability.get('InstalledVersion', '')
+    fixed = vulnerability.get('FixedVersion')
+    return TrivyFinding(
+        title=f"{vuln_id} {package} {version}",
+        description=vulnerability.get('Description') or vulnerability.get('Title', ''),
+        severity=severity,
+        cwe=cwe,
+        references='\n'.join(vulnerability.get('References') or []),
+        solution=f"Upgrade {package} to version {fixed}" if fixed else '',
+        impact=severity,
+        confidence='High',
+        owasp_top_10=classify(cwe=cwe) or 'A06:2021-Vulnerable and Outdated Components',
+        file_path=target,
+        component_name=package,
+        component_version=version,
+        vuln_id_from_tool=vuln_id,
+    )
+
+
+def _trivy_misconfiguration(misconfiguration, target, classify, finding_filter, nbytes):
+    severity = TRIVY_SEVERITY.get(misconfiguration.get('Severity', ''), 'Info')
+    if finding_filter is not None and finding_filter.rejects(nbytes, severity, 'High', None, target):
+        return None
+    check_id = misconfiguration.get('ID', '')
+    description = misconfiguration.get('Description', '')
+    if misconfiguration.get('Message'):
+        description = f"{description}\n\n{misconfiguration['Message']}".strip()
+    return TrivyFinding(
+        title=f"{check_id} - {misconfiguration.get('Title', '')}",
+        description=description,
+        severity=severity,
+        references='\n'.join(misconfiguration.get('References') or []),
+        solution=misconfiguration.get('Resolution', ''),
+        impact=severity,
+        confidence='High',
+        owasp_top_10='A05:2021-Security Misconfiguration',
+        file_path=target,
+        line=(misconfiguration.get('CauseMetadata') or {}).get('StartLine'),
+        vuln_id_from_tool=check_id,
+    )
+
+
+def _trivy_secret(secret, target, classify, finding_filter, nbytes):
+    severity = TRIVY_SEVERITY.get(secret.get('Severity', ''), 'Info')
+    if finding_filter is not None and finding_filter.rejects(nbytes, severity, 'High', 798, target):
+        return None
+    return TrivyFinding(
+        title=f"Secret detected in {target} - {secret.get('Title', '')}",
+        # Trivy masks the secret in Match itself
+        description=secret.get('Match', ''),
+        severity=severity,
+        cwe=798,
+        impact=severity,
+        confidence='High',
+        owasp_top_10=classify(cwe=798),
+        file_path=target,
+        line=secret.get('StartLine'),
+        vuln_id_from_tool=secret.get('RuleID', ''),
+    )
+
+
+TRIVY_SECTIONS = {
+    'Vulnerabilities': _trivy_vulnerability,
+    'Misconfigurations': _trivy_misconfiguration,
+    'Secrets': _trivy_secret,
+}
+
+
+def _iter_trivy_result(reader, classify, finding_filter):
+    target = ''
+    for key in reader.iter_object():
+        if key == 'Target':
+            target = reader.read()
+        elif key in TRIVY_SECTIONS:
+            convert = TRIVY_SECTIONS[key]
+            for item, nbytes in _iter_items(reader):
+                finding = convert(item, target, classify, finding_filter, nbytes)
+                if finding is not None:
+                    yield finding
+        else:
+            reader.skip()
+
+
+def _iter_trivy_results(reader):
+    """Yield once per result object, with the reader on it"""
+    if reader.peek() == b'[':
+        yield from reader.iter_array()
+        return
+    for key in reader.iter_object():
+        if key == 'Results' and reader.peek() == b'[':
+            yield from reader.iter_array()
+        else:
+            reader.skip()
+
+
+def iter_trivy_findings(stream, finding_filter=None):
+    """Findings of a Trivy JSON report (Results[], or the pre-0.20 top-level array)"""
+    classify = get_classifier().classify
+    reader = JSONStreamReader(stream)
+    for _ in _iter_trivy_results(reader):
+        if reader.peek() == b'n':
+            reader.skip()
+            continue
+        yield from _iter_trivy_result(reader, classify, finding_filter)
+
+
+def _sarif_text(value):
+    """Text of a SARIF message / multiformatMessageString, or '' when absent"""
+    return (value or {}).get('text', '') if isinstance(value, dict) else ''
+
+
+def _sarif_severity(result, rule):
+    """CVSS 'security-severity' of the rule when given, else the result or rule level"""
+    score = (rule.get('properties') or {}).get('security-severity')
+    try:
+        score = float(score)
+    except (TypeError, ValueError):
+        level = result.get('level') or (rule.get('defaultConfiguration') or {}).get('level') or 'warning'
+        return SARIF_LEVEL_SEVERITY.get(level, 'Medium')
+    if score >= 9.0:
+        return 'Critical'
+    if score >= 7.0:
+        return 'High'
+    if score >= 4.0:
+        return 'Medium'
+    return 'Low' if score > 0 else 'Info'
+
+
+def _sarif_finding(result, rules, rules_by_index, tool_name, classify, finding_filter, nbytes):
+    rule_id = result.get('ruleId') or (result.get('rule') or {}).get('id', '')
+    rule = rules.get(rule_id)
+    if rule is None:
+        rule_index = result.get('ruleIndex', (result.get('rule') or {}).get('index'))
+        rule = rules_by_index[rule_index] if isinstance(rule_index, int) and rule_index < len(rules_by_index) else {}
+    properties = rule.get('properties') or {}
+    severity = _sarif_severity(result, rule)
+    cwe = parse_cwe(properties.get('cwe') or properties.get('tags') or [])
+    location = ((result.get('locations') or [{}])[0] or {}).get('physicalLocation') or {}
+    file_path = (location.get('artifactLocation') or {}).get('uri', '')
+    if finding_filter is not None and finding_filter.rejects(nbytes, severity, None, cwe, file_path):
+        return None
+
+    title = _sarif_text(rule.get('shortDescription')) or rule.get('name') or rule_id or f"{tool_name} finding"
+    region = location.get('region') or {}
+    finding = SARIFFinding(
+        title=title,
+        description=_sarif_text(result.get('message')) or _sarif_text(rule.get('fullDescription')),
+        severity=severity,
+        cwe=cwe,
+        references=rule.get('helpUri', ''),
+        solution=_sarif_text(rule.get('help')),
+        impact=severity,
+        confidence='Medium',
+        owasp_top_10=classify(cwe=cwe, name=title),
+        file_path=file_path,
+        line=region.get('startLine'),
+        vuln_id_from_tool=rule_id,
+    )
+    snippet = _sarif_text(region.get('snippet'))
+    if snippet:
+        finding.evidence = snippet
+    fingerprints = result.get('partialFingerprints') or result.get('fingerprints') or {}
+    if fingerprints:
+        finding.unique_id_from_tool = next(iter(fingerprints.values()))
+    return finding
+
+
+def _iter_sarif_run(reader, classify, finding_filter):
+    rules = {}
+    rules_by_index = []
+    tool_name = 'SARIF'
+    for key in reader.iter_object():
+        if key == 'tool':
+            # Rule metadata is small next to the results; decode it whole
+            driver = (reader.read() or {}).get('driver') or {}
+            tool_name = driver.get('name') or tool_name
+            rules_by_index = driver.get('rules') or []
+            rules = {rule.get('id'): rule for rule in rules_by_index}
+        elif key == 'results':
+            for result, nbytes in _iter_items(reader):
+                finding = _sarif_finding(result, rules, rules_by_index, tool_name, classify, finding_filter, nbytes)
+                if finding is not None:
+                    yield finding
+        else:
+            reader.skip()
+
+
+def iter_sarif_findings(stream, finding_filter=None):
+    """Findings of a SARIF 2.1 log (the results of every run)"""
+    classify = get_classifier().classify
+    reader = JSONStreamReader(stream)
+    for key in reader.iter_object():
+        if key != 'runs':
+            reader.skip()
+            continue
+        for _ in reader.iter_array():
+            yield from _iter_sarif_run(reader, classify, finding_filter)
+
+
+def iter_dependency_track_findings(stream, finding_filter=None):
+    """Findings of a Dependency-Track /api/v1/finding export; suppressed ones are left out"""
+    classify = get_classifier().classify
+    reader = JSONStreamReader(stream)
+    # The CI job writes {"findings": []} when the API call fails
+    items = _iter_items(reader) if reader.peek() == b'[' else _iter_key_items(reader, 'findings')
+    for item, nbytes in items:
+        if (item.get('analysis') or {}).get('isSuppressed'):
+            continue
+        vulnerability = item.get('vulnerability') or {}
+        severity = DEPENDENCY_TRACK_SEVERITY.get(vulnerability.get('severity', ''), 'Info')
+        cwe = vulnerability.get('cweId') or parse_cwe([c.get('cweId') for c in vulnerability.get('cwes') or []])
+        if finding_filter is not None and finding_filter.rejects(nbytes, severity, 'High', cwe):
+            continue
+        component = item.get('component') or {}
+        vuln_id = vulnerability.get('vulnId', '')
+        name = component.get('name', '')
+        version = component.get('version', '')
+        yield DependencyTrackFinding(
+            title=f"{name}:{version} | {vuln_id}",
+            description=vulnerability.get('description') or vulnerability.get('title', ''),
+            severity=severity,
+            cwe=cwe,
+            solution=vulnerability.get('recommendation') or '',
+            impact=severity,
+            confidence='High',
+            owasp_top_10=classify(cwe=cwe) or 'A06:2021-Vulnerable and Outdated Components',
+            component_name=name,
+            component_version=version,
+            vuln_id_from_tool=vuln_id,
+            unique_id_from_tool=item.get('matrix', ''),
+        )
+
+
+# Scan type (see get_scan_type in upload-reports-enhanced.py) -> adapter
+ADAPTERS = {
+    'Gitleaks Scan': iter_gitleaks_findings,
+    'Semgrep JSON Report': iter_semgrep_findings,
+    'Trivy Scan': iter_trivy_findings,
+    'SARIF': iter_sarif_findings,
+    'Dependency-Track Scan': iter_dependency_track_findings,
+}
+
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+"""
+🗃️ DEFECTDOJO ID CACHE
+========================================
+Description: Persistent product/engagement ID cache for the DefectDojo uploaders
+Author: Security Team
+Version: 1.0.0
+
+Product IDs are keyed by base_url + product name; engagement IDs additionally
+by engagement name and date, matching the "today's engagement" lookup done by
+create_engagement_if_not_exists. A warm cache lets an upload skip both search
+GETs entirely.
+
+Entries expire after a TTL. Every write re-reads the file, merges and swaps
+it in with an atomic rename (defectdojo_store), so concurrent CI jobs
+sharing the file never see a half-written cache. Callers invalidate a product's entries when
+DefectDojo answers 404 for a cached ID, then look the IDs up again and
+retry the rejected request once in the same run.
+
+Environment variables:
+   DEFECTDOJO_CACHE_FILE  Cache location (default: ~/.cache/defectdojo-uploader/id-cache.json)
+   DEFECTDOJO_CACHE_TTL   Entry lifetime in seconds, 0 disables the cache (default: 86400)
+"""
+
+import json
+import os
+import time
+
+from defectdojo_store import JSONEntryStore
+
+DEFAULT_CACHE_TTL = 24 * 60 * 60
+
+
+def default_cache_path():
+    cache_home = os.getenv('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'defectdojo-uploader', 'id-cache.json')
+
+
+class DefectDojoIDCache:
+    """TTL-evicting on-disk map of DefectDojo product/engagement IDs"""
+
+    def __init__(self, path=None, ttl=None):
+        self.path = path or os.getenv('DEFECTDOJO_CACHE_FILE') or default_cache_path()
+        self.ttl = int(os.getenv('DEFECTDOJO_CACHE_TTL', DEFAULT_CACHE_TTL)) if ttl is None else ttl
+        self.store = JSONEntryStore(self.path, indent=2)
+
+    @property
+    def enabled(self):
+        return self.ttl > 0
+
+    @staticmethod
+    def _product_key(base_url, product_name):
+        return json.dumps(['product', base_url.rstrip('/'), product_name])
+
+    @staticmethod
+    def _engagement_key(base_url, product_name, engagement_name, engagement_date):
+        return json.dumps(['engagement', base_url.rstrip('/'), product_name, engagement_name, engagement_date])
+
+    def _get(self, key):
+        if not self.enabled:
+            return None
+        entry = self.store.get(key)
+        return entry['id'] if entry else None
+
+    def _update(self, set_entries=None, drop=None):
+        if not self.enabled:
+            return
+
+        def change(entries):
+            if drop:
+                for key in [key for key in entries if drop(key)]:
+                    del entries[key]
+            if set_entries:
+                expires = time.time() + self.ttl
+                for key, value in set_entries.items():
+                    entries[key] = {'id': value, 'expires': expires}
+
+        try:
+            self.store.update(change)
+        except OSError as e:
+            print(f"⚠️  Unable to update DefectDojo ID cache {self.path}: {str(e)}")
+
+    def get_product_id(self, base_url, product_name):
+        return self._get(self._product_key(base_url, product_name))
+
+    def set_product_id(self, base_url, product_name, product_id):
+        self._update(set_entries={self._product_key(base_url, product_name): product_id})
+
+    def get_engagement_id(self, base_url, product_name, engagement_name, engagement_date):
+        return self._get(self._engagement_key(base_url, product_name, engagement_name, engagement_date))
+
+    def set_engagement_id(self, base_url, product_name, engagement_name, engagement_date, engagement_id):
+        key = self._engagement_key(base_url, product_name, engagement_name, engagement_date)
+        self._update(set_entries={key: engagement_id})
+
+    def invalidate_product(self, base_url, product_name):
+        """Drop the cached product ID and every engagement cached under it"""
+        prefix = [base_url.rstrip('/'), product_name]
+        self._update(drop=lambda key: json.loads(key)[1:3] == prefix)
+        print(f"🗑️  Invalidated cached DefectDojo IDs for {product_name}")
+
+
+def is_stale_id_response(response_status, response_text=''):
+    """True when DefectDojo rejected a request because a referenced ID is gone"""
+    if response_status == 404:
+        return True
+    # DRF reports unknown foreign keys as 400 'Invalid pk "N" - object does not exist.'
+    return response_status == 400 and 'object does not exist' in (response_text or '')
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+
+"""
+🏷️ DEFECTDOJO OWASP CLASSIFICATION
+========================================
+Description: Shared OWASP Top 10 classifier for the DefectDojo uploaders
+Author: Security Team
+Version: 1.0.0
+
+Both ZAP uploaders used to carry their own hand-written title -> category
+dicts, which disagreed (XSS was A01 in one and A03 in the other) and missed
+any title that was worded slightly differently from the key. The mapping now
+lives in one versioned data file, owasp-classification.json, and is looked up
+in order of reliability:
+
+   1. CWE id                 exact dict lookup
+   2. ZAP pluginid           exact dict lookup
+   3. Normalised alert name  exact dict lookup, then one precompiled regex
+                             alternation over the keyword patterns
+
+The CWE comes first because the scanner reports it for the alert itself,
+while a pluginid only says which rule raised it: a passive-scan alert can
+carry the id of an active rule (a "Content Security Policy Header Not Set"
+alert under pluginid 40018, SQL injection, still has CWE 693). The pluginid
+decides only for alerts without a known CWE; disagreements are counted.
+
+The file is read on the first classify() call, not on import. Name fallback
+results are memoised per raw title, so a report with thousands of instances
+of the same alert pays for normalisation once. Hits per index and misses are
+counted so uploads can report how findings were classified.
+
+Environment variables:
+   DEFECTDOJO_OWASP_DATA  Classification data file (default: owasp-classification.json next to this module)
+"""
+
+import json
+import os
+import re
+import threading
+
+DEFAULT_DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'owasp-classification.json')
+
+_NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+
+def normalise_name(name):
+    """Lower case with every run of non-alphanumerics collapsed to one space"""
+    return _NON_ALNUM.sub(' ', name.lower()).strip()
+
+
+def _int_and_str_keys(mapping):
+    """Index each id under both its int and str form so lookups never convert"""
+    index = {}
+    for key, category in mapping.items():
+        index[int(key)] = category
+        index[str(key)] = category
+    return index
+
+
+class OWASPClassifier:
+    """Lazily loaded pluginid / CWE / name index of OWASP Top 10 categories"""
+
+    INDEXES = ('pluginid', 'cwe', 'name')
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv('DEFECTDOJO_OWASP_DATA') or DEFAULT_DATA_PATH
+        self.version = None
+        self.hits = dict.fromkeys(self.INDEXES, 0)
+        self.misses = 0
+        # CWE hits whose pluginid entry named another category
+        self.conflicts = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._loaded:
+                return
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+
+            categories = data['categories']
+            self.version = data.get('version')
+            self._by_pluginid = _int_and_str_keys(
+                {plugin_id: categories[code] for plugin_id, code in data.get('pluginids', {}).items()})
+            self._by_cwe = _int_and_str_keys(
+                {cwe: categories[code] for code, cwes in data.get('cwes', {}).items() for cwe in cwes})
+            self._by_name = {normalise_name(name): categories[code] for name, code in data.get('names', {}).items()}
+
+            # One alternation with a named group per pattern; lastgroup says which matched
+            patterns = data.get('name_patterns', [])
+            self._pattern_categories = {f'p{i}': categories[code] for i, (_, code) in enumerate(patterns)}
+            self._name_pattern = re.compile(
+                '|'.join(f'(?P<p{i}>{pattern})' for i, (pattern, _) in enumerate(patterns))
+            ) if patterns else None
+            self._name_results = {}
+            self._loaded = True
+
+    def _classify_name(self, name):
+        normalised = normalise_name(name)
+        category = self._by_name.get(normalised)
+        if category is None and self._name_pattern is not None:
+            match = self._name_pattern.search(normalised)
+            if match:
+                category = self._pattern_categories[match.lastgroup]
+        return category
+
+    def classify(self, plugin_id=None, cwe=None, name=None):
+        """OWASP Top 10 category for an alert, or None when nothing matches"""
+        if not self._loaded:
+            self._load()
+
+        category = self._by_cwe.get(cwe)
+        if category is not None:
+            self.hits['cwe'] += 1
+            if self._by_pluginid.get(plugin_id, category) != category:
+                self.conflicts += 1
+            return category
+
+        category = self._by_pluginid.get(plugin_id)
+        if category is not None:
+            self.hits['pluginid'] += 1
+            return category
+
+        if name:
+            try:
+                category = self._name_results[name]
+            except KeyError:
+                category = self._name_results[name] = self._classify_name(name)
+            if category is not None:
+                self.hits['name'] += 1
+                return category
+
+        self.misses += 1
+        return None
+
+    def stats(self):
+        """Hit counts per index, misses, CWE/pluginid conflicts and the data file version"""
+        return {'version': self.version, 'hits': dict(self.hits), 'misses': self.misses,
+                'conflicts': self.conflicts}
+
+    def format_stats(self):
+        hits = ', '.join(f"{count} by {index}" for index, count in self.hits.items())
+        text = f"OWASP classification (data {self.version}): {hits}, {self.misses} unclassified"
+        if self.conflicts:
+            text += f", {self.conflicts} CWE overriding its pluginid"
+        return text
+
+
+_classifier = None
+_classifier_lock = threading.Lock()
+
+
+def get_classifier():
+    """Process-wide classifier; its data file is read on first use"""
+    global _classifier
+    if _classifier is None:
+        with _classifier_lock:
+            if _classifier is None:
+                _classifier = OWASPClassifier()
+    return _classifier
@@ -0,0 +1,640 @@
+#!/usr/bin/env python3
+
+"""
+🔌 DEFECTDOJO HTTP CLIENT
+========================================
+Description: Shared connection-pooled HTTP session for the DefectDojo uploaders
+Author: Security Team
+Version: 1.0.0
+
+Both upload-reports-enhanced.py and zap-xml-defectdojo-uploader.py route every
+API call through the session returned by get_session(), so product lookups,
+engagement lookups and imports reuse keep-alive connections instead of paying
+a TCP/TLS handshake per request.
+
+Import bodies can optionally be compressed (gzip or deflate). There is no
+probe request: the first compressed body sent to a host settles support for
+it. A server that cannot decode it answers 415, or a DRF parse error naming
+the undecodable JSON or multipart body, before anything is created; that
+request is resent uncompressed and the host gets plain bodies from then on.
+Bodies below a size threshold are never compressed. A report that is
+already gzip-compressed can be passed through untouched between
+gzip-compressed multipart framing (post_precompressed); the server sees
+concatenated gzip members, which decode to the plain multipart body.
+
+Every call goes through one RetryPolicy: 429/502/503/504 responses, connection
+resets and timeouts are retried with exponential backoff and jitter, honouring
+Retry-After, until the attempt or elapsed-time budget runs out. Streamed bodies
+are spooled as they are encoded (in memory up to a limit, then to a temporary
+file) and rewound for every attempt, so they are retried like bytes. POSTs
+are not idempotent, so they are retried only when the caller says a
+duplicate is harmless (idempotent=True) or supplies a before_retry hook that
+looks up whether the timed-out request already took effect; otherwise only
+failures that never reached the application are retried.
+
+Environment variables:
+   DEFECTDOJO_POOL_CONNECTIONS  Number of per-host pools to keep (default: 4)
+   DEFECTDOJO_POOL_MAXSIZE      Max connections kept per host (default: 10)
+   DEFECTDOJO_POOL_BLOCK        Block instead of exceeding the per-host limit (default: false)
+   DEFECTDOJO_KEEP_ALIVE        Reuse connections between requests (default: true)
+   DEFECTDOJO_COMPRESSION       Request body encoding: gzip, deflate or none (default: none)
+   DEFECTDOJO_COMPRESSION_MIN_BYTES  Smallest body worth compressing (default: 1024)
+   DEFECTDOJO_SPOOL_MEMORY_BYTES     Streamed body size kept in memory before spooling to disk (default: 8 MiB)
+   DEFECTDOJO_TIMEOUT           Read timeout in seconds per request (default: 600)
+   DEFECTDOJO_RETRY_ATTEMPTS    Max attempts per call, 1 disables retries (default: 5)
+   DEFECTDOJO_RETRY_BACKOFF     Base backoff in seconds, doubled per attempt (default: 1)
+   DEFECTDOJO_RETRY_BACKOFF_MAX Cap on a single backoff delay in seconds (default: 30)
+   DEFECTDOJO_RETRY_MAX_ELAPSED Give up once this many seconds have passed (default: 120)
+"""
+
+import io
+import os
+import random
+import tempfile
+import threading
+import time
+import zlib
+from email.utils import parsedate_to_datetime
+from itertools import chain
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+DEFAULT_POOL_CONNECTIONS = 4
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_COMPRESSION_MIN_BYTES = 1024
+DEFAULT_SPOOL_MEMORY_BYTES = 8 * 1024 * 1024
+
+# zlib window bits selecting the container for each Content-Encoding
+COMPRESSION_WBITS = {
+    'gzip': 16 + zlib.MAX_WBITS,
+    'deflate': zlib.MAX_WBITS
+}
+
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_READ_TIMEOUT = 600
+
+RETRYABLE_STATUSES = frozenset({429, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+# Statuses returned before the application processed the request
+UNPROCESSED_STATUSES = frozenset({429, 503})
+
+# 400 responses of a server that could not decode a compressed body: DRF's
+# ParseError for the still-compressed JSON or multipart body, or a proxy
+# naming the header. Other validation errors never mention these.
+ENCODING_REJECTION_MARKERS = ('json parse error', 'multipart form parse error', 'content-encoding')
+
+
+def _env_flag(name, default):
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+class ConnectionStats:
+    """Thread-safe counters for connection checkouts across all host pools"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+
+    def record_checkout(self):
+        with self._lock:
+            self.requests += 1
+
+    def record_new_connection(self):
+        with self._lock:
+            self.new_connections += 1
+
+    @property
+    def reused_connections(self):
+        return max(self.requests - self.new_connections, 0)
+
+    def as_dict(self):
+        return {
+            'requests': self.requests,
+            'new_connections': self.new_connections,
+            'reused_connections': self.reused_connections
+        }
+
+    def format_stats(self):
+        return (f"HTTP connections: {self.new_connections} opened, "
+                f"{self.reused_connections} reused across {self.requests} requests")
+
+
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date)"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return None
+
+
+class RetryPolicy:
+    """Exponential backoff with jitter bounded by attempts and total elapsed time"""
+
+    def __init__(self, max_attempts=None, backoff_base=None, backoff_max=None, max_elapsed=None,
+                 statuses=RETRYABLE_STATUSES):
+        self.max_attempts = max_attempts or int(os.getenv('DEFECTDOJO_RETRY_ATTEMPTS', 5))
+        self.backoff_base = backoff_base if backoff_base is not None else float(
+            os.getenv('DEFECTDOJO_RETRY_BACKOFF', 1))
+        self.backoff_max = backoff_max if backoff_max is not None else float(
+            os.getenv('DEFECTDOJO_RETRY_BACKOFF_MAX', 30))
+        self.max_elapsed = max_elapsed if max_elapsed is not None else float(
+            os.getenv('DEFECTDOJO_RETRY_MAX_ELAPSED', 120))
+        self.statuses = frozenset(statuses)
+
+    def is_retryable_status(self, status_code):
+        return status_code in self.statuses
+
+    def next_delay(self, attempt, elapsed, retry_after=None):
+        """Seconds to sleep before attempt ``attempt + 1``, or None to give up"""
+        if attempt >= self.max_attempts:
+            return None
+
+        if retry_after is not None:
+            delay = retry_after
+        else:
+            # "Equal jitter": half the exponential step fixed, half random
+            step = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+            delay = step / 2 + random.uniform(0, step / 2)
+
+        if elapsed + delay > self.max_elapsed:
+            return None
+        return delay
+
+
+def _is_replayable(kwargs):
+    """True when a request can be sent again with an identical body"""
+    if kwargs.get('files'):
+        return False
+    data = kwargs.get('data')
+    return data is None or isinstance(data, (bytes, bytearray, str, dict, list, tuple, io.IOBase))
+
+
+class CompressionStats:
+    """Thread-safe totals of request body bytes before and after compression"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.raw_bytes = 0
+        self.sent_bytes = 0
+        self.compressed_requests = 0
+        self.fallbacks = 0
+
+    def record(self, raw_bytes, sent_bytes, compressed):
+        with self._lock:
+            self.raw_bytes += raw_bytes
+            self.sent_bytes += sent_bytes
+            if compressed:
+                self.compressed_requests += 1
+
+    def record_fallback(self):
+        with self._lock:
+            self.fallbacks += 1
+
+    @property
+    def bytes_saved(self):
+        return max(self.raw_bytes - self.sent_bytes, 0)
+
+    def as_dict(self):
+        return {
+            'raw_bytes': self.raw_bytes,
+            'sent_bytes': self.sent_bytes,
+            'bytes_saved': self.bytes_saved,
+            'compressed_requests': self.compressed_requests,
+            'fallbacks': self.fallbacks
+        }
+
+
+def is_encoding_rejected(response):
+    """True when a response shows the server could not decode a compressed body"""
+    return _is_encoding_rejection(response.status_code, response.text)
+
+
+def _is_encoding_rejection(status_code, text):
+    if status_code == 415:
+        return True
+    return status_code == 400 and any(marker in text.lower() for marker in ENCODING_REJECTION_MARKERS)
+
+
+def _compress(data, encoding):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, COMPRESSION_WBITS[encoding])
+    return compressor.compress(data) + compressor.flush()
+
+
+def _decompress_spool(spool, encoding, max_memory):
+    """Plain copy of a compressed spool (bytes or file), as another spool"""
+    if isinstance(spool, bytes):
+        return zlib.decompress(spool, COMPRESSION_WBITS[encoding])
+
+    def chunks():
+        decompressor = zlib.decompressobj(COMPRESSION_WBITS[encoding])
+        spool.seek(0)
+        for block in iter(lambda: spool.read(1024 * 1024), b''):
+            yield decompressor.decompress(block)
+        yield decompressor.flush()
+
+    return spool_body(chunks(), max_memory)
+
+
+def _compress_stream(chunks, encoding, stats):
+    """Compress an iterable of byte chunks incrementally, recording sizes"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, COMPRESSION_WBITS[encoding])
+    raw_bytes = 0
+    sent_bytes = 0
+    for chunk in chunks:
+        raw_bytes += len(chunk)
+        compressed = compressor.compress(chunk)
+        if compressed:
+            sent_bytes += len(compressed)
+            yield compressed
+    tail = compressor.flush()
+    sent_bytes += len(tail)
+    yield tail
+    stats.record(raw_bytes, sent_bytes, True)
+
+
+def _count_stream(chunks, stats):
+    sent_bytes = 0
+    for chunk in chunks:
+        sent_bytes += len(chunk)
+        yield chunk
+    stats.record(sent_bytes, sent_bytes, False)
+
+
+def spool_body(chunks, max_memory):
+    """Drain byte chunks into a replayable body
+
+    Returns bytes while the body fits in ``max_memory``, otherwise an
+    unnamed temporary file positioned at the start.
+    """
+    chunks = iter(chunks)
+    head = []
+    size = 0
+    for chunk in chunks:
+        head.append(chunk)
+        size += len(chunk)
+        if size > max_memory:
+            break
+    else:
+        return b''.join(head)
+
+    spool = tempfile.TemporaryFile()
+    try:
+        spool.writelines(head)
+        del head
+        for chunk in chunks:
+            spool.write(chunk)
+        spool.seek(0)
+    except BaseException:
+        spool.close()
+        raise
+    return spool
+
+
+def encode_multipart(data, files):
+    """Encode form fields and files exactly as requests would: (body, content_type)"""
+    prepared = requests.Request('POST', 'http://multipart.invalid/', data=data, files=files).prepare()
+    return prepared.body, prepared.headers['Content-Type']
+
+
+def split_multipart(data, field_name, file_name, content_type):
+    """Multipart framing around a single file as (prefix, suffix, content_type)
+
+    Streaming ``prefix + file content + suffix`` produces the same body
+    encode_multipart would, without the file content having to be in memory.
+    """
+    marker = b'--file-content-' + os.urandom(16).hex().encode('ascii') + b'--'
+    body, multipart_type = encode_multipart(data, {field_name: (file_name, marker, content_type)})
+    prefix, suffix = body.split(marker)
+    return prefix, suffix, multipart_type
+
+
+def gzip_members(*parts):
+    """Compress each byte string as its own gzip member
+
+    Concatenated gzip members decode to the concatenated content, so these
+    can be spliced around an existing .gz file without recompressing it.
+    """
+    return b''.join(_compress(part, 'gzip') for part in parts)
+
+
+def _counting_pool_class(base_class, stats):
+    """Build a connection pool class that reports checkouts to ``stats``"""
+
+    class CountingConnectionPool(base_class):
+        def _get_conn(self, timeout=None):
+            stats.record_checkout()
+            return super()._get_conn(timeout=timeout)
+
+        def _new_conn(self):
+            stats.record_new_connection()
+            return super()._new_conn()
+
+    CountingConnectionPool.__name__ = f"Counting{base_class.__name__}"
+    return CountingConnectionPool
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose host pools feed a shared ConnectionStats counter"""
+
+    def __init__(self, stats, **kwargs):
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _counting_pool_class(HTTPConnectionPool, self.stats),
+            'https': _counting_pool_class(HTTPSConnectionPool, self.stats)
+        }
+
+
+class DefectDojoSession(requests.Session):
+    """requests.Session with a bounded keep-alive connection pool per host"""
+
+    def __init__(self, pool_connections=None, pool_maxsize=None, pool_block=None, keep_alive=None,
+                 compression=None, compression_min_bytes=None, retry_policy=None, timeout=None,
+                 spool_memory_bytes=None):
+        super().__init__()
+        self.pool_connections = pool_connections or int(
+            os.getenv('DEFECTDOJO_POOL_CONNECTIONS', DEFAULT_POOL_CONNECTIONS))
+        self.pool_maxsize = pool_maxsize or int(
+            os.getenv('DEFECTDOJO_POOL_MAXSIZE', DEFAULT_POOL_MAXSIZE))
+        self.pool_block = _env_flag('DEFECTDOJO_POOL_BLOCK', False) if pool_block is None else pool_block
+        self.keep_alive = _env_flag('DEFECTDOJO_KEEP_ALIVE', True) if keep_alive is None else keep_alive
+        self.stats = ConnectionStats()
+
+        if compression is None:
+            compression = os.getenv('DEFECTDOJO_COMPRESSION', '')
+        compression = compression.strip().lower()
+        self.compression = compression if compression in COMPRESSION_WBITS else None
+        self.compression_min_bytes = compression_min_bytes if compression_min_bytes is not None else int(
+            os.getenv('DEFECTDOJO_COMPRESSION_MIN_BYTES', DEFAULT_COMPRESSION_MIN_BYTES))
+        self.compression_stats = CompressionStats()
+        self.spool_memory_bytes = spool_memory_bytes if spool_memory_bytes is not None else int(
+            os.getenv('DEFECTDOJO_SPOOL_MEMORY_BYTES', DEFAULT_SPOOL_MEMORY_BYTES))
+        self._encoding_support = {}
+        self._encoding_lock = threading.Lock()
+
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.timeout = timeout or (
+            DEFAULT_CONNECT_TIMEOUT, float(os.getenv('DEFECTDOJO_TIMEOUT', DEFAULT_READ_TIMEOUT)))
+
+        adapter = PooledHTTPAdapter(
+            self.stats,
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block
+        )
+        self.mount('http://', adapter)
+        self.mount('https://', adapter)
+
+        self.headers['Connection'] = 'keep-alive' if self.keep_alive else 'close'
+
+    def request(self, method, url, idempotent=None, before_retry=None, **kwargs):
+        """Send a request, retrying transient failures according to retry_policy
+
+        ``idempotent`` defaults by method. ``before_retry`` is called before
+        every retry and may return a response to use instead of re-sending,
+        e.g. the lookup proving a timed-out create already succeeded. A file
+        body is rewound before every attempt.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        if not _is_replayable(kwargs):
+            return super().request(method, url, **kwargs)
+
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        policy = self.retry_policy
+        started = time.monotonic()
+        attempt = 0
+
+        data = kwargs.get('data')
+        start_offset = data.tell() if isinstance(data, io.IOBase) else None
+
+        while True:
+            attempt += 1
+            if attempt > 1 and before_retry is not None:
+                recovered = before_retry()
+                if recovered is not None:
+                    return recovered
+
+            if start_offset is not None:
+                data.seek(start_offset)
+            try:
+                response = super().request(method, url, **kwargs)
+                error = None
+            except (requests.ConnectionError, requests.Timeout) as e:
+                response = None
+                error = e
+
+            if error is None and not policy.is_retryable_status(response.status_code):
+                return response
+
+            if not (idempotent or before_retry is not None):
+                # A duplicate could be harmful: retry only if the app never saw it
+                unprocessed = isinstance(error, requests.ConnectTimeout) or (
+                    response is not None and response.status_code in UNPROCESSED_STATUSES)
+                if not unprocessed:
+                    if error is not None:
+                        raise error
+                    return response
+
+            retry_after = parse_retry_after(response.headers.get('Retry-After')) if response is not None else None
+            delay = policy.next_delay(attempt, time.monotonic() - started, retry_after)
+            if delay is None:
+                if error is not None:
+                    raise error
+                return response
+
+            reason = f"HTTP {response.status_code}" if response is not None else type(error).__name__
+            print(f"🔁 {method.upper()} {urlsplit(url).path} failed ({reason}); "
+                  f"retrying in {delay:.1f}s (attempt {attempt + 1}/{policy.max_attempts})")
+            if response is not None:
+                response.close()
+            time.sleep(delay)
+
+    def negotiate_encoding(self, url):
+        """Body encoding for ``url``'s host: the configured one unless the host has refused it
+
+        Makes no request; the first compressed body settles support (see
+        record_encoding_support).
+        """
+        if not self.compression:
+            return None
+        parts = urlsplit(url)
+        with self._encoding_lock:
+            supported = self._encoding_support.get((parts.scheme, parts.netloc), True)
+        return self.compression if supported else None
+
+    def compress_body(self, url, body):
+        """(data, encoding) to send a bytes ``body`` to ``url``'s host as; encoding is None when sent as-is"""
+        encoding = self.negotiate_encoding(url)
+        if encoding is None or len(body) < self.compression_min_bytes:
+            return body, None
+        return _compress(body, encoding), encoding
+
+    def record_encoding_support(self, url, status_code, text):
+        """Remember whether ``url``'s host decoded a compressed body, from the response to it
+
+        Returns False when the host refused it; the caller then resends the
+        body uncompressed.
+        """
+        supported = not _is_encoding_rejection(status_code, text)
+        parts = urlsplit(url)
+        host = (parts.scheme, parts.netloc)
+        with self._encoding_lock:
+            known = self._encoding_support.get(host)
+            self._encoding_support[host] = supported
+        if known is None and supported:
+            print(f"🗜️  {parts.netloc} accepts {self.compression} request bodies")
+        elif not supported:
+            print(f"⚠️  {parts.netloc} does not accept {self.compression} request bodies; sending uncompressed")
+            self.compression_stats.record_fallback()
+        return supported
+
+    def post_body(self, url, body, headers=None, **kwargs):
+        """POST a bytes body, or an iterable of byte chunks, compressing when worthwhile
+
+        Bodies below ``compression_min_bytes`` are sent as-is. A bytes body the
+        server refuses to decode is resent uncompressed. A streamed body is
+        encoded (and compressed, once negotiation succeeded) into a spool as it
+        is produced, so it is never held whole in memory yet can be retried.
+        """
+        headers = dict(headers or {})
+        stats = self.compression_stats
+
+        if isinstance(body, (bytes, bytearray)):
+            compressed, encoding = self.compress_body(url, body)
+            if encoding is None:
+                stats.record(len(body), len(body), False)
+                return self.post(url, headers=headers, data=body, **kwargs)
+
+            response = self.post(url, headers=dict(headers, **{'Content-Encoding': encoding}),
+                                 data=compressed, **kwargs)
+            if self.record_encoding_support(url, response.status_code, response.text):
+                stats.record(len(body), len(compressed), True)
+                return response
+
+            stats.record(len(body), len(body), False)
+            return self.post(url, headers=headers, data=body, **kwargs)
+
+        data, encoding, sizes = self.spool_stream(url, body)
+        try:
+            if encoding is None:
+                stats.record(sizes.raw_bytes, sizes.sent_bytes, False)
+                return self.post(url, headers=headers, data=data, **kwargs)
+
+            response = self.post(url, headers=dict(headers, **{'Content-Encoding': encoding}), data=data, **kwargs)
+            if self.record_encoding_support(url, response.status_code, response.text):
+                stats.record(sizes.raw_bytes, sizes.sent_bytes, True)
+                return response
+
+            stats.record(sizes.raw_bytes, sizes.raw_bytes, False)
+            plain = self.decompress_spool(data, encoding)
+            try:
+                return self.post(url, headers=headers, data=plain, **kwargs)
+            finally:
+                if not isinstance(plain, bytes):
+                    plain.close()
+        finally:
+            if not isinstance(data, bytes):
+                data.close()
+
+    def spool_stream(self, url, body):
+        """Encode an iterable of byte chunks for ``url``'s host into a replayable spool
+
+        Returns (data, encoding, sizes): data is bytes or a temporary file
+        positioned at the start (see spool_body), encoding is None when the
+        body is sent as-is, and sizes is a CompressionStats of this body alone.
+        The caller records sizes once it knows whether the host accepted the
+        encoding, and closes a file spool when done with it.
+        """
+        encoding = self.negotiate_encoding(url)
+        sizes = CompressionStats()
+
+        # Buffer just enough to decide whether compression pays off
+        chunks = iter(body)
+        head = []
+        head_bytes = 0
+        for chunk in chunks:
+            head.append(chunk)
+            head_bytes += len(chunk)
+            if encoding is None or head_bytes >= self.compression_min_bytes:
+                break
+        else:
+            # The whole body fits below the threshold
+            data = b''.join(head)
+            sizes.record(len(data), len(data), False)
+            return data, None, sizes
+
+        stream = chain(head, chunks)
+        if encoding is None:
+            return spool_body(_count_stream(stream, sizes), self.spool_memory_bytes), None, sizes
+        return spool_body(_compress_stream(stream, encoding, sizes), self.spool_memory_bytes), encoding, sizes
+
+    def decompress_spool(self, spool, encoding):
+        """Plain copy of a body spool_stream compressed with ``encoding``, to resend it uncompressed"""
+        return _decompress_spool(spool, encoding, self.spool_memory_bytes)
+
+    def post_precompressed(self, url, body, encoding, headers=None, **kwargs):
+        """POST a body that is already compressed with ``encoding``
+
+        Used to pass compressed report files through without decoding them.
+        Returns None when the server cannot decode the body, so the caller
+        can fall back to sending the decoded content.
+        """
+        response = self.post(url, headers=dict(headers or {}, **{'Content-Encoding': encoding}),
+                             data=body, **kwargs)
+        if not self.record_encoding_support(url, response.status_code, response.text):
+            return None
+        self.compression_stats.record(len(body), len(body), True)
+        return response
+
+    def print_compression_stats(self):
+        """Print request body bytes saved by compression, if enabled"""
+        if not self.compression:
+            return
+        stats = self.compression_stats.as_dict()
+        print(f"🗜️  Request bodies: {stats['raw_bytes']:,} bytes -> {stats['sent_bytes']:,} bytes sent "
+              f"({stats['bytes_saved']:,} saved, {stats['compressed_requests']} compressed, "
+              f"{stats['fallbacks']} fallback(s))")
+
+    def print_connection_stats(self):
+        """Print how many requests were served on reused connections"""
+        print(f"🔌 {self.stats.format_stats()}")
+
+
+_shared_session = None
+_shared_session_lock = threading.Lock()
+
+
+def get_session():
+    """Return the process-wide DefectDojoSession, creating it on first use"""
+    global _shared_session
+    if _shared_session is None:
+        with _shared_session_lock:
+            if _shared_session is None:
+                _shared_session = DefectDojoSession()
+    return _shared_session
+
+
+def configure_session(**kwargs):
+    """Replace the shared session with one built from explicit pool settings"""
+    global _shared_session
+    with _shared_session_lock:
+        if _shared_session is not None:
+            _shared_session.close()
+        _shared_session = DefectDojoSession(**kwargs)
+    return _shared_session
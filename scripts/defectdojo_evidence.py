@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+
+"""
+📎 DEFECTDOJO EVIDENCE STORE
+========================================
+Description: Content-addressed store for HTTP request/response bodies of DAST findings
+Author: Security Team
+Version: 1.0.0
+
+ZAP attaches the raw HTTP request and response to every alert instance, and
+the same multi-MB page is often the evidence for dozens of instances. Copied
+into each finding verbatim, those bodies dominate the import JSON and its
+encode time.
+
+EvidenceStore.externalise() keeps short bodies as they are. Longer ones are
+cut to their first ``max_chars`` characters (status line and headers
+survive) plus a marker naming the SHA-256 of the full body. Each distinct
+full body is spooled to disk once, as ``evidence-<digest>.txt`` in the store
+directory, and uploaded as a single test attachment after the import, no
+matter how many findings reference it.
+
+Files are written to a temporary name and renamed into place, so worker
+processes can share one store directory; a digest that already exists is
+never written twice.
+
+Environment variables:
+   DEFECTDOJO_EVIDENCE_MAX_BYTES  Characters of a body kept inline, 0 disables the store (default: 4096)
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+
+DEFAULT_EVIDENCE_MAX_BYTES = int(os.getenv('DEFECTDOJO_EVIDENCE_MAX_BYTES', '4096'))
+
+EVIDENCE_PREFIX = 'evidence-'
+EVIDENCE_SUFFIX = '.txt'
+
+
+class EvidenceStore:
+    """Truncates long evidence bodies and keeps one file per distinct full body"""
+
+    def __init__(self, max_chars=DEFAULT_EVIDENCE_MAX_BYTES, directory=None):
+        self.max_chars = max_chars
+        self.owns_directory = directory is None
+        self.directory = directory or tempfile.mkdtemp(prefix='defectdojo-evidence-')
+        self.truncated = 0
+        self.removed_chars = 0
+        # Digests this process has already seen, to skip the filesystem check
+        self._known = set()
+
+    @property
+    def enabled(self):
+        return self.max_chars > 0
+
+    def file_name(self, digest):
+        return f"{EVIDENCE_PREFIX}{digest}{EVIDENCE_SUFFIX}"
+
+    def externalise(self, body):
+        """Body to put in the finding: unchanged when short, else truncated with a digest marker"""
+        if not body or len(body) <= self.max_chars or not self.enabled:
+            return body
+        data = body.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        if digest not in self._known:
+            self._known.add(digest)
+            self._write(digest, data)
+        self.truncated += 1
+        self.removed_chars += len(body) - self.max_chars
+        return (f"{body[:self.max_chars]}\n... [truncated from {len(data)} bytes; "
+                f"full body attached as {self.file_name(digest)}]")
+
+    def _write(self, digest, data):
+        path = os.path.join(self.directory, self.file_name(digest))
+        if os.path.exists(path):
+            return
+        fd, tmp_path = tempfile.mkstemp(prefix='.evidence-', suffix='.tmp', dir=self.directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def add_counts(self, truncated, removed_chars):
+        """Merge counters reported by a worker process sharing this directory"""
+        self.truncated += truncated
+        self.removed_chars += removed_chars
+
+    def attachments(self):
+        """(file name, path) of every distinct body stored, sorted by name"""
+        names = sorted(name for name in os.listdir(self.directory)
+                       if name.startswith(EVIDENCE_PREFIX) and name.endswith(EVIDENCE_SUFFIX))
+        return [(name, os.path.join(self.directory, name)) for name in names]
+
+    def format_stats(self):
+        return (f"Evidence: {self.truncated} bodies truncated, {self.removed_chars / 1024 / 1024:.1f} MiB "
+                f"kept out of the import, {len(self.attachments())} unique bodies to attach")
+
+    def close(self):
+        if self.owns_directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
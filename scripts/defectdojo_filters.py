@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+
+"""
+🧹 DEFECTDOJO SOURCE FILTERS
+========================================
+Description: Per-scanner severity / confidence / CWE / URL filters applied before findings are built
+Author: Security Team
+Version: 1.0.0
+
+Every import asks DefectDojo for 'minimum_severity': 'Low', yet the
+uploaders used to build, encode and send Info findings for the server to
+throw away. A FindingFilter makes that decision at the source instead: the
+converters check the raw severity, confidence and CWE of an alert or result,
+and the URL (or file path) and parameter of each instance, before any
+Finding exists. A dropped finding is counted, never constructed or encoded.
+
+Rules are kept per DefectDojo scan type in upload-filters.json; the
+"default" block applies to every scan type and a scanner block overrides
+it key by key. The shipped file leaves minimum_severity empty, so every
+severity is sent as before and DefectDojo's import-level minimum decides;
+set it to "Low" to drop Info findings here instead:
+
+   minimum_severity    Critical, High, Medium, Low or Info
+   minimum_confidence  High, Medium or Low (findings without one pass)
+   cwe_allow           Only keep these CWEs (findings without a CWE are dropped)
+   cwe_deny            Drop these CWEs
+   include_urls        Only keep URLs / file paths matching one of these regexes
+   exclude_urls        Drop URLs / file paths matching one of these regexes
+   exclude_params      Drop instances whose parameter matches one of these regexes
+
+Lists are comma separated strings, as in the exclusions block of
+dast-config.json, or JSON arrays. Regexes match from the start of the value
+(".*\\.css$"), and each list is compiled into one alternation when the filter
+for a scan type is first requested.
+
+Environment variables:
+   DEFECTDOJO_FILTER_CONFIG  Filter rules file (default: upload-filters.json next to this module)
+"""
+
+import json
+import os
+import re
+import threading
+
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'upload-filters.json')
+
+SEVERITY_RANKS = {'Info': 0, 'Informational': 0, 'Low': 1, 'Medium': 2, 'High': 3, 'Critical': 4}
+CONFIDENCE_RANKS = {'False Positive': 0, 'Low': 1, 'Medium': 2, 'High': 3, 'Confirmed': 4}
+
+RULE_KEYS = ('minimum_severity', 'minimum_confidence', 'cwe_allow', 'cwe_deny',
+             'include_urls', 'exclude_urls', 'exclude_params')
+FILTER_REASONS = ('severity', 'confidence', 'cwe', 'url', 'param')
+
+_CWE_PREFIX = re.compile(r'^cwe-', re.I)
+
+
+def split_list(value):
+    """Items of a comma separated string or a JSON list, blanks removed"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    return [str(item).strip() for item in value if str(item).strip()]
+
+
+def compile_patterns(patterns):
+    """One regex matching any of ``patterns`` from the start of a value, or None"""
+    patterns = split_list(patterns)
+    return re.compile('|'.join(f'(?:{pattern})' for pattern in patterns)) if patterns else None
+
+
+def _rank(ranks, name, kind):
+    if not name:
+        return None
+    if name not in ranks:
+        raise ValueError(f"Unknown {kind} '{name}' in filter rules (expected one of {', '.join(ranks)})")
+    return ranks[name]
+
+
+class FindingFilter:
+    """Compiled filter rules for one scan type, with counts of what they dropped
+
+    One filter is shared by every upload thread of its scan type, so the
+    counts are only changed under a lock.
+    """
+
+    def __init__(self, minimum_severity=None, minimum_confidence=None, cwe_allow=None, cwe_deny=None,
+                 include_urls=None, exclude_urls=None, exclude_params=None):
+        self.rules = {key: value for key, value in zip(RULE_KEYS, (
+            minimum_severity, minimum_confidence, cwe_allow, cwe_deny,
+            include_urls, exclude_urls, exclude_params)) if value}
+        self._minimum_severity = _rank(SEVERITY_RANKS, minimum_severity, 'severity')
+        self._minimum_confidence = _rank(CONFIDENCE_RANKS, minimum_confidence, 'confidence')
+        self._cwe_allow = frozenset(int(_CWE_PREFIX.sub('', cwe)) for cwe in split_list(cwe_allow))
+        self._cwe_deny = frozenset(int(_CWE_PREFIX.sub('', cwe)) for cwe in split_list(cwe_deny))
+        self._include_urls = compile_patterns(include_urls)
+        self._exclude_urls = compile_patterns(exclude_urls)
+        self._exclude_params = compile_patterns(exclude_params)
+        self.dropped = dict.fromkeys(FILTER_REASONS, 0)
+        self.dropped_bytes = 0
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # Sent to parse worker processes, which get a lock of their own
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def active(self):
+        return bool(self.rules)
+
+    def reason(self, severity=None, confidence=None, cwe=None):
+        """Why a finding with these alert-level values is dropped, or None to keep it"""
+        if self._minimum_severity is not None:
+            rank = SEVERITY_RANKS.get(severity)
+            if rank is not None and rank < self._minimum_severity:
+                return 'severity'
+        if self._minimum_confidence is not None and confidence is not None:
+            rank = CONFIDENCE_RANKS.get(confidence)
+            if rank is not None and rank < self._minimum_confidence:
+                return 'confidence'
+        if self._cwe_deny and cwe in self._cwe_deny:
+            return 'cwe'
+        if self._cwe_allow and cwe not in self._cwe_allow:
+            return 'cwe'
+        return None
+
+    def location_reason(self, location, param=None):
+        """Why an instance at this URL / file path and parameter is dropped, or None"""
+        location = location or ''
+        if self._include_urls is not None and not self._include_urls.match(location):
+            return 'url'
+        if self._exclude_urls is not None and self._exclude_urls.match(location):
+            return 'url'
+        if self._exclude_params is not None and param and self._exclude_params.match(param):
+            return 'param'
+        return None
+
+    def drop(self, reason, count=1, nbytes=0):
+        with self._lock:
+            self.dropped[reason] += count
+            self.dropped_bytes += nbytes
+
+    def rejects(self, nbytes=0, severity=None, confidence=None, cwe=None, location=None, param=None):
+        """Check every rule for a single-record finding; True (and counted) when it is dropped"""
+        reason = self.reason(severity, confidence, cwe) or self.location_reason(location, param)
+        if reason is None:
+            return False
+        self.drop(reason, 1, nbytes)
+        return True
+
+    @property
+    def total_dropped(self):
+        return sum(self.dropped.values())
+
+    def take_counts(self):
+        """Counts since the last call, reset to zero (for worker processes to report back)"""
+        with self._lock:
+            counts = (self.dropped, self.dropped_bytes)
+            self.dropped = dict.fromkeys(FILTER_REASONS, 0)
+            self.dropped_bytes = 0
+        return counts
+
+    def add_counts(self, counts):
+        """Merge counts returned by take_counts() in a worker process"""
+        dropped, dropped_bytes = counts
+        with self._lock:
+            for reason, count in dropped.items():
+                self.dropped[reason] += count
+            self.dropped_bytes += dropped_bytes
+
+    def stats(self):
+        with self._lock:
+            dropped, dropped_bytes = dict(self.dropped), self.dropped_bytes
+        return {'rules': self.rules, 'dropped': dropped, 'dropped_findings': sum(dropped.values()),
+                'dropped_bytes': dropped_bytes}
+
+    def format_stats(self):
+        reasons = ', '.join(f"{count} by {reason}" for reason, count in self.dropped.items() if count)
+        return (f"Filtered at source: {self.total_dropped} findings, "
+                f"{self.dropped_bytes / 1024 / 1024:.1f} MiB of report data" + (f" ({reasons})" if reasons else ""))
+
+
+class FilterConfig:
+    """Filter rules file; one compiled FindingFilter per scan type, built on first request"""
+
+    def __init__(self, path=None):
+        self.path = path or os.getenv('DEFECTDOJO_FILTER_CONFIG') or DEFAULT_CONFIG_PATH
+        self._data = None
+        self._filters = {}
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if not os.path.exists(self.path) and self.path == DEFAULT_CONFIG_PATH:
+            return {}
+        with open(self.path, 'r') as f:
+            return json.load(f)
+
+    def rules_for(self, scan_type):
+        if self._data is None:
+            self._data = self._load()
+        rules = dict(self._data.get('default', {}))
+        rules.update(self._data.get('scanners', {}).get(scan_type, {}))
+        unknown = set(rules) - set(RULE_KEYS)
+        if unknown:
+            raise ValueError(f"Unknown filter rule(s) for {scan_type}: {', '.join(sorted(unknown))}")
+        return rules
+
+    def for_scan_type(self, scan_type):
+        """Shared FindingFilter for a scan type, or None when no rule applies to it"""
+        with self._lock:
+            if scan_type not in self._filters:
+                finding_filter = FindingFilter(**self.rules_for(scan_type))
+                self._filters[scan_type] = finding_filter if finding_filter.active else None
+            return self._filters[scan_type]
+
+    def filters(self):
+        """(scan type, filter) of every filter requested so far"""
+        with self._lock:
+            return [(scan_type, finding_filter) for scan_type, finding_filter in self._filters.items()
+                    if finding_filter is not None]
+
+
+_filter_config = None
+_filter_config_lock = threading.Lock()
+
+
+def get_filter_config():
+    """Process-wide filter rules; the file is read on first use"""
+    global _filter_config
+    if _filter_config is None:
+        with _filter_config_lock:
+            if _filter_config is None:
+                _filter_config = FilterConfig()
+    return _filter_config
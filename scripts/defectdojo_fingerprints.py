@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+
+"""
+🧬 DEFECTDOJO FINDING FINGERPRINTS
+========================================
+Description: Stable per-finding hashes and intra-report deduplication before upload
+Author: Security Team
+Version: 1.0.0
+
+ZAP reports the same alert on the same URL and parameter more than once
+(across sites and spider passes) and Trivy repeats a CVE for every image
+layer that ships the package. DefectDojo's deduplication_on_engagement
+only collapses these after the import, by comparing each finding's
+hash_code. A FindingDeduplicator computes the same kind of hash on the
+client, from the fields DefectDojo hashes for that scan type
+(HASHCODE_FIELDS_PER_SCANNER), and drops a finding whose fingerprint was
+already seen in the report before it is encoded.
+
+The first occurrence is kept, as DefectDojo keeps the original and marks
+later ones duplicate. Fingerprints are SHA-256 over the field values,
+separated so ('ab', 'c') and ('a', 'bc') differ; the index holds the raw
+32-byte digests, one per unique finding.
+
+DAST scan types add the instance URL and parameter to DefectDojo's
+title/cwe/severity, which there come from the finding's endpoints.
+
+Given the fingerprints of the previous upload (``known``, from the ledger
+in defectdojo_ledger), the deduplicator also passes over findings that
+were already sent and reports which known fingerprints did not come back.
+
+Environment variables:
+   DEFECTDOJO_DEDUPLICATE  0 uploads every finding, duplicates included (default: 1)
+"""
+
+import hashlib
+import os
+
+DEFAULT_DEDUPLICATE = os.getenv('DEFECTDOJO_DEDUPLICATE', '1') != '0'
+
+# DefectDojo's default hash_code fields, used for scan types not listed below
+DEFAULT_FINGERPRINT_FIELDS = ('title', 'cwe', 'line', 'file_path', 'description')
+
+# Finding fields hashed per scan type; vuln_id_from_tool stands in for DefectDojo's vulnerability_ids
+FINGERPRINT_FIELDS = {
+    'OWASP ZAP DAST Scan': ('title', 'cwe', 'severity', 'url', 'param'),
+    'OWASP ZAP DAST Scan (XML)': ('title', 'cwe', 'severity', 'url', 'param'),
+    'Trivy Scan': ('title', 'severity', 'vuln_id_from_tool', 'cwe', 'description'),
+    'Dependency-Track Scan': ('component_name', 'component_version', 'vuln_id_from_tool'),
+}
+
+_FIELD_SEPARATOR = '\x1f'
+
+
+def fingerprint_fields(scan_type):
+    return FINGERPRINT_FIELDS.get(scan_type, DEFAULT_FINGERPRINT_FIELDS)
+
+
+def fingerprint(finding, fields):
+    """SHA-256 digest of a finding's ``fields`` (unset and None hash as empty)"""
+    values = []
+    for name in fields:
+        value = finding.get(name)
+        values.append('' if value is None else str(value))
+    return hashlib.sha256(_FIELD_SEPARATOR.join(values).encode('utf-8')).digest()
+
+
+class FindingDeduplicator:
+    """Fingerprint index of one report's findings, passing each fingerprint once
+
+    With ``known`` (hex fingerprints of the previous upload) only fingerprints
+    outside it are passed on; the rest are counted as unchanged.
+    """
+
+    def __init__(self, scan_type, known=None):
+        self.scan_type = scan_type
+        self.fields = fingerprint_fields(scan_type)
+        self._seen = set()
+        self._known = frozenset(bytes.fromhex(value) for value in known) if known is not None else None
+        self.duplicates = 0
+        self.unchanged = 0
+
+    @property
+    def delta(self):
+        """True when findings are compared with a previous upload"""
+        return self._known is not None
+
+    def fingerprint(self, finding):
+        return fingerprint(finding, self.fields)
+
+    def iter_unique(self, findings):
+        """Yield the first finding of every fingerprint, counting the rest"""
+        seen = self._seen
+        known = self._known or frozenset()
+        fields = self.fields
+        for finding in findings:
+            digest = fingerprint(finding, fields)
+            if digest in seen:
+                self.duplicates += 1
+                continue
+            seen.add(digest)
+            if digest in known:
+                self.unchanged += 1
+                continue
+            yield finding
+
+    @property
+    def unique(self):
+        return len(self._seen)
+
+    @property
+    def new(self):
+        return self.unique - self.unchanged
+
+    def fingerprints(self):
+        """Hex fingerprints of every unique finding seen so far"""
+        return {digest.hex() for digest in self._seen}
+
+    def disappeared(self):
+        """Sorted hex fingerprints of the previous upload that were not seen this time"""
+        if self._known is None:
+            return []
+        return sorted(digest.hex() for digest in self._known - self._seen)
+
+    def stats(self):
+        stats = {'fields': list(self.fields), 'unique_findings': self.unique, 'duplicates_merged': self.duplicates}
+        if self.delta:
+            stats.update(new_findings=self.new, unchanged_findings=self.unchanged,
+                         disappeared_findings=len(self._known - self._seen))
+        return stats
+
+    def format_stats(self):
+        text = (f"Deduplicated by fingerprint ({', '.join(self.fields)}): "
+                f"{self.duplicates} duplicate(s) merged into {self.unique} unique finding(s)")
+        if self.delta:
+            text += (f"; delta: {self.new} new, {self.unchanged} unchanged since the last upload, "
+                     f"{len(self._known - self._seen)} gone")
+        return text
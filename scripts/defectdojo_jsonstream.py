@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+
+"""
+🌊 DEFECTDOJO STREAMING JSON READER
+========================================
+Description: Incremental JSON walker for large scanner reports, stdlib only
+Author: Security Team
+Version: 1.0.0
+
+json.load() materialises a whole report before the first finding can be
+built; ZAP's JSON embeds every HTTP request/response, so that is hundreds of
+MB for a large scan. JSONStreamReader instead reads the byte stream in
+fixed-size chunks and lets the caller walk the document: iterate the keys of
+an object or the elements of an array, decode just the values it needs with
+read(), and skip() the rest.
+
+Skipping is done with C-level regex scans over the buffer: one match
+consumes everything up to the next bracket, complete strings and escapes
+included, so Python only runs per nesting level. read() first offers a
+small ASCII value straight to the C decoder and only scans it when that
+cannot settle where it ends. Consumed bytes are dropped as the walk moves on,
+so memory is bounded by the largest value actually decoded rather than by
+the file size. Positions are absolute byte offsets; on a seekable stream a
+caller can tell() a value, skip it and come back to it later with seek().
+"""
+
+import json
+import re
+
+READ_CHUNK_SIZE = 256 * 1024
+# Bytes handed to the C decoder at once when read() tries its fast path
+FAST_READ_WINDOW = 16 * 1024
+
+_WHITESPACE = re.compile(rb'[ \t\r\n]*')
+# A run of string body: plain bytes and complete escapes, up to a quote, a
+# trailing lone backslash or the end of the buffer
+_STRING_BODY = re.compile(rb'[^"\\]*(?:\\.[^"\\]*)*', re.S)
+# Everything up to the next bracket outside a string, complete strings included;
+# stops early on a quote whose string runs past the end of the buffer
+_CONTAINER_RUN = re.compile(rb'[^"{}\[\]]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"{}\[\]]*)*', re.S)
+_SCALAR = re.compile(rb'[^,\]}: \t\r\n]*')
+_VALUE_TERMINATORS = frozenset(bytes([char]) for char in b',]}: \t\r\n')
+
+_decode = json.JSONDecoder().decode
+_raw_decode = json.JSONDecoder().raw_decode
+
+
+class JSONStreamReader:
+    """Pull-style walker over a binary JSON stream"""
+
+    def __init__(self, stream, chunk_size=READ_CHUNK_SIZE):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self._buffer = b''
+        self._pos = 0
+        self._base = 0  # absolute offset of _buffer[0]
+        self._keep = None  # buffer index that must survive the next refill
+        self._eof = False
+
+    def _fill(self):
+        """Read one more chunk, dropping buffer bytes no longer needed; False at EOF"""
+        if self._eof:
+            return False
+        chunk = self.stream.read(self.chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        drop = self._pos if self._keep is None else min(self._keep, self._pos)
+        if drop:
+            self._buffer = self._buffer[drop:]
+            self._base += drop
+            self._pos -= drop
+            if self._keep is not None:
+                self._keep -= drop
+        self._buffer += chunk
+        return True
+
+    def _skip_whitespace(self):
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer) or not self._fill():
+                return
+
+    def peek(self):
+        """Next significant byte (b'' at end of input)"""
+        self._skip_whitespace()
+        return self._buffer[self._pos:self._pos + 1]
+
+    def expect(self, token):
+        if self.peek() != token:
+            raise ValueError(f"Expected {token!r} at byte {self.tell()}, found {self.peek()!r}")
+        self._pos += 1
+
+    def tell(self):
+        self._skip_whitespace()
+        return self._base + self._pos
+
+    def seek(self, offset):
+        """Continue from an absolute offset taken with tell() (seekable streams only)"""
+        self.stream.seek(offset)
+        self._buffer = b''
+        self._pos = 0
+        self._base = offset
+        self._keep = None
+        self._eof = False
+
+    def _scan_string(self):
+        # _pos is on the opening quote
+        self._pos += 1
+        while True:
+            self._pos = _STRING_BODY.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer) and self._buffer[self._pos] == 0x22:
+                self._pos += 1
+                return
+            if not self._fill():
+                raise ValueError("Unterminated string in JSON report")
+
+    def _scan_value(self):
+        """Move past the value at the current position without decoding it"""
+        token = self.peek()
+        if token == b'"':
+            self._scan_string()
+            return
+        if token not in (b'{', b'['):
+            while True:
+                end = _SCALAR.match(self._buffer, self._pos).end()
+                if end < len(self._buffer) or not self._fill():
+                    break
+            if end == self._pos:
+                raise ValueError(f"Unexpected {token!r} at byte {self.tell()} in JSON report")
+            self._pos = end
+            return
+
+        depth = 0
+        while True:
+            self._pos = _CONTAINER_RUN.match(self._buffer, self._pos).end()
+            if self._pos == len(self._buffer):
+                if not self._fill():
+                    raise ValueError("Truncated JSON report")
+                continue
+            char = self._buffer[self._pos]
+            if char == 0x22:
+                self._scan_string()
+                continue
+            self._pos += 1
+            depth += 1 if char in (0x7b, 0x5b) else -1
+            if depth == 0:
+                return
+
+    def skip(self):
+        """Discard the next value"""
+        self._scan_value()
+
+    def read_raw(self):
+        """Bytes of the next value, undecoded"""
+        self._skip_whitespace()
+        self._keep = self._pos
+        try:
+            self._scan_value()
+            return self._buffer[self._keep:self._pos]
+        finally:
+            self._keep = None
+
+    def read(self):
+        """Decode the next value (reports are UTF-8, as ZAP and the other scanners write them)"""
+        self._skip_whitespace()
+        # Fast path for the common small value: let the C decoder find its end
+        # in an ASCII window of the buffer instead of scanning it here first.
+        # Only trusted when a delimiter follows the value inside the window, so
+        # a number cut at the window edge ('-25' of '-2500.0') is never taken
+        # for the whole number
+        window = self._buffer[self._pos:self._pos + FAST_READ_WINDOW]
+        if window.isascii():
+            try:
+                value, end = _raw_decode(window.decode('ascii'))
+            except ValueError:
+                pass
+            else:
+                if window[end:end + 1] in _VALUE_TERMINATORS:
+                    self._pos += end
+                    return value
+        return _decode(self.read_raw().decode('utf-8'))
+
+    def iter_array(self):
+        """Yield once per element; the caller must read() or skip() each one"""
+        self.expect(b'[')
+        if self.peek() == b']':
+            self._pos += 1
+            return
+        while True:
+            yield
+            token = self.peek()
+            self._pos += 1
+            if token == b']':
+                return
+            if token != b',':
+                raise ValueError(f"Expected ',' or ']' at byte {self.tell() - 1} in JSON report")
+
+    def iter_object(self):
+        """Yield each key; the caller must read() or skip() its value"""
+        self.expect(b'{')
+        if self.peek() == b'}':
+            self._pos += 1
+            return
+        while True:
+            key = self.read()
+            self.expect(b':')
+            yield key
+            token = self.peek()
+            self._pos += 1
+            if token == b'}':
+                return
+            if token != b',':
+                raise ValueError(f"Expected ',' or '}}' at byte {self.tell() - 1} in JSON report")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+"""
+📒 DEFECTDOJO FINGERPRINT LEDGER
+========================================
+Description: Persisted fingerprints of the last successful upload, for delta imports
+Author: Security Team
+Version: 1.0.0
+
+Every pipeline used to re-import its full result set, and DefectDojo then
+spent minutes deduplicating findings it already had. In delta mode the
+uploaders look up the fingerprints (see defectdojo_fingerprints) of the
+last successful upload of the same report and send only findings whose
+fingerprint is new. Fingerprints that were uploaded last time but are no
+longer reported go to DefectDojo as one compact engagement note. Only once
+the import and the note have both succeeded is the ledger entry replaced
+with the fingerprints of this run, so a failed run is retried in full.
+
+Entries are keyed by base_url, product, engagement name, scan type and
+report file name. The engagement name rather than its ID is used because a
+new engagement is opened each day: a finding sent yesterday is not sent
+again today. Entries older than the TTL are ignored, so a full import still
+happens at least once per TTL and re-seeds the ledger.
+
+The file is kept like the ID cache's, by defectdojo_store: every write
+re-reads it, merges and swaps it in with an atomic rename, so concurrent CI
+jobs uploading different reports never lose each other's entries.
+
+Environment variables:
+   DEFECTDOJO_DELTA_UPLOAD  1 sends only findings new since the last upload (default: 0)
+   DEFECTDOJO_LEDGER_FILE   Ledger location (default: ~/.cache/defectdojo-uploader/fingerprint-ledger.json)
+   DEFECTDOJO_LEDGER_TTL    Entry lifetime in seconds before a full re-import (default: 604800)
+"""
+
+import json
+import os
+import time
+
+from defectdojo_store import JSONEntryStore
+
+DEFAULT_DELTA_UPLOAD = os.getenv('DEFECTDOJO_DELTA_UPLOAD', '').lower() in ('1', 'true', 'yes')
+DEFAULT_LEDGER_TTL = 7 * 24 * 60 * 60
+
+
+def default_ledger_path():
+    cache_home = os.getenv('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'defectdojo-uploader', 'fingerprint-ledger.json')
+
+
+class FingerprintLedger:
+    """TTL-evicting on-disk map of report key -> fingerprints of its last successful upload"""
+
+    def __init__(self, path=None, ttl=None):
+        self.path = path or os.getenv('DEFECTDOJO_LEDGER_FILE') or default_ledger_path()
+        self.ttl = int(os.getenv('DEFECTDOJO_LEDGER_TTL', DEFAULT_LEDGER_TTL)) if ttl is None else ttl
+        self.store = JSONEntryStore(self.path)
+
+    @staticmethod
+    def key(base_url, product_name, engagement_name, scan_type, report):
+        return json.dumps([base_url.rstrip('/'), product_name, engagement_name, scan_type, report])
+
+    def get(self, key):
+        """Hex fingerprints of the last successful upload under ``key``, or None when unknown"""
+        if self.ttl <= 0:
+            return None
+        entry = self.store.get(key)
+        return set(entry['fingerprints']) if entry else None
+
+    def set(self, key, fingerprints):
+        """Record the fingerprints of a successful upload; False when the file cannot be written"""
+        if self.ttl <= 0:
+            return False
+        entry = {'fingerprints': sorted(fingerprints), 'updated': time.time(), 'expires': time.time() + self.ttl}
+        try:
+            self.store.update(lambda entries: entries.update({key: entry}))
+            return True
+        except OSError as e:
+            print(f"⚠️  Unable to update fingerprint ledger {self.path}: {str(e)}")
+            return False
+
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+
+"""
+🧵 DEFECTDOJO PROCESS POOLS
+========================================
+Description: Process pools for the uploaders' parsers that never fork a threaded parent
+Author: Security Team
+Version: 1.0.0
+
+Report parsing runs on ProcessPoolExecutors, and with --max-parallel those
+pools are created from inside ThreadPoolExecutor upload workers while other
+threads hold locks (the ID cache, the connection pool, stdout). The default
+fork start method copies such a process with the locks held and without the
+threads that would release them, so a worker can hang forever. new_process_pool
+starts workers with spawn (or forkserver) instead: a fresh interpreter that
+imports what it needs.
+
+A spawned worker unpickles the pool's functions by module name. The uploader
+scripts have hyphenated file names and are also loaded under other names
+(benchmark-uploaders.py, the tests), so every worker first re-imports the
+initializer's module from its file and registers it under the same name,
+then runs the initializer.
+
+Environment variables:
+   DEFECTDOJO_START_METHOD  spawn or forkserver (default: spawn)
+"""
+
+import importlib
+import importlib.util
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+SAFE_START_METHODS = ('spawn', 'forkserver')
+DEFAULT_START_METHOD = 'spawn'
+
+
+def start_method():
+    method = os.getenv('DEFECTDOJO_START_METHOD', DEFAULT_START_METHOD).strip().lower()
+    if method not in SAFE_START_METHODS or method not in multiprocessing.get_all_start_methods():
+        return DEFAULT_START_METHOD
+    return method
+
+
+def new_process_pool(max_workers, initializer, initargs=()):
+    """ProcessPoolExecutor of spawned workers, each set up by ``initializer(*initargs)``"""
+    module = sys.modules[initializer.__module__]
+    return ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context(start_method()),
+        initializer=_init_worker,
+        initargs=(initializer.__module__, getattr(module, '__file__', None), initializer.__name__, initargs),
+    )
+
+
+def _import_module(module_name, path):
+    """The module a parent function came from, loaded from ``path`` if its name is not importable"""
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return module
+    try:
+        return importlib.import_module(module_name)
+    except ImportError:
+        if path is None:
+            raise
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    # Registered before running it, so tasks and results pickle against it
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _init_worker(module_name, path, initializer, initargs):
+    module = _import_module(module_name, path)
+    getattr(module, initializer)(*initargs)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+"""
+📦 DEFECTDOJO REPORT INPUT
+========================================
+Description: Transparent access to plain or compressed scanner report files
+Author: Security Team
+Version: 1.0.0
+
+CI artifacts are often stored as report.json.gz / report.xml.xz to save space.
+The uploaders open every report through open_report(), which detects gzip,
+bz2 and xz input by its magic bytes (not the file name) and decompresses it
+as a stream, so the parsers read the original document without it ever
+being written back to disk. report_name() gives the name the report had
+before compression, which is what scan-type detection keys on.
+"""
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+
+# Leading bytes identifying each supported container
+COMPRESSION_MAGIC = (
+    ('gzip', b'\x1f\x8b'),
+    ('bz2', b'BZh'),
+    ('xz', b'\xfd7zXZ\x00'),
+)
+COMPRESSION_SUFFIXES = {'gzip': ('.gz', '.gzip'), 'bz2': ('.bz2',), 'xz': ('.xz',)}
+COMPRESSION_OPENERS = {'gzip': gzip.open, 'bz2': bz2.open, 'xz': lzma.open}
+
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def detect_compression(path):
+    """'gzip', 'bz2', 'xz' or None for an uncompressed file"""
+    with open(path, 'rb') as f:
+        head = f.read(6)
+    for compression, magic in COMPRESSION_MAGIC:
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def open_report(path, mode='rb', compression=None):
+    """Open a report for reading, decompressing on the fly when needed
+
+    ``mode`` is 'rb' or 'r' (UTF-8 text). Pass ``compression`` when it is
+    already known to skip sniffing the file again.
+    """
+    compression = compression or detect_compression(path)
+    if compression is None:
+        stream = open(path, 'rb')
+    else:
+        stream = COMPRESSION_OPENERS[compression](path, 'rb')
+    if mode == 'r':
+        return io.TextIOWrapper(stream, encoding='utf-8')
+    return stream
+
+
+def iter_report_chunks(path, compression=None, chunk_size=READ_CHUNK_SIZE):
+    """Yield the (decompressed) content of a report in chunks"""
+    with open_report(path, compression=compression) as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def report_name(path, compression=None):
+    """Base name of a report with any compression suffix removed
+
+    gl-dast-report.json.gz -> gl-dast-report.json. The suffix is only
+    stripped when the content really is compressed.
+    """
+    name = os.path.basename(path)
+    if compression is None:
+        try:
+            compression = detect_compression(path)
+        except OSError:
+            # Missing files are reported by the caller's own existence check
+            return name
+    if compression:
+        for suffix in COMPRESSION_SUFFIXES[compression]:
+            if name.lower().endswith(suffix):
+                return name[:-len(suffix)]
+    return name
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+
+"""
+💾 DEFECTDOJO JSON ENTRY STORE
+========================================
+Description: Expiring JSON entries in a file shared by concurrent CI jobs
+Author: Security Team
+Version: 1.0.0
+
+The ID cache (defectdojo_cache) and the fingerprint ledger
+(defectdojo_ledger) both persist a JSON object of entries that carry an
+'expires' timestamp, in a file several pipeline jobs may write at once.
+JSONEntryStore holds that file handling in one place: reads skip expired
+entries and treat a missing or corrupt file as empty, and every update
+re-reads the file, applies the change and swaps it in with an atomic
+rename, so concurrent writers never see a half-written file nor drop each
+other's entries.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+
+
+class JSONEntryStore:
+    """JSON file of {key: {..., 'expires': timestamp}} entries with atomic read-merge-write updates"""
+
+    def __init__(self, path, indent=None):
+        self.path = path
+        self.indent = indent
+        self._lock = threading.Lock()
+
+    def load(self):
+        """Unexpired entries; {} when the file is missing, unreadable or not an entry map"""
+        try:
+            with open(self.path, 'r') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+        if not isinstance(entries, dict):
+            return {}
+
+        now = time.time()
+        return {
+            key: entry for key, entry in entries.items()
+            if isinstance(entry, dict) and entry.get('expires', 0) > now
+        }
+
+    def get(self, key):
+        """Unexpired entry stored under ``key``, or None"""
+        with self._lock:
+            return self.load().get(key)
+
+    def update(self, change):
+        """Apply ``change`` to the current entries in place and write them back
+
+        Raises OSError when the file cannot be written.
+        """
+        with self._lock:
+            # Merge with whatever other jobs have written in the meantime
+            entries = self.load()
+            change(entries)
+            self._save(entries)
+
+    def _save(self, entries):
+        """Write entries to a temp file and atomically rename it into place"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        fd, tmp_path = tempfile.mkstemp(prefix=f'.{os.path.basename(self.path)}-', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(entries, f, indent=self.indent, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
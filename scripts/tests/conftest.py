@@ -0,0 +1,175 @@
+"""Shared fixtures for the DefectDojo uploader tests"""
+
+import importlib.util
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+SCRIPT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_DIR = os.path.dirname(SCRIPT_DIR)
+sys.path.insert(0, SCRIPT_DIR)
+
+# Keep retries fast; tests that care pass an explicit RetryPolicy
+os.environ.setdefault('DEFECTDOJO_RETRY_BACKOFF', '0.01')
+os.environ.setdefault('DEFECTDOJO_RETRY_BACKOFF_MAX', '0.05')
+
+
+def load_script(file_name, module_name):
+    """Import one of the hyphenated uploader scripts as a module"""
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(SCRIPT_DIR, file_name))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def zap_alert(index, riskcode='2', confidence='2', cweid='79', urls=None):
+    """One ZAP alert as a dict of its report fields"""
+    return {'pluginid': str(10000 + index), 'name': f'Alert {index}', 'riskcode': str(riskcode),
+            'confidence': str(confidence), 'cweid': str(cweid), 'desc': f'Description {index}',
+            'solution': 'Fix it.', 'reference': 'https://owasp.org/',
+            'instances': [{'uri': url, 'method': 'GET', 'param': 'q'}
+                          for url in (urls or [f'https://app.example.com/{index}'])]}
+
+
+def write_zap_xml(path, alerts, site='https://app.example.com'):
+    """Write alerts (see zap_alert) as a ZAP XML report"""
+    items = []
+    for alert in alerts:
+        instances = ''.join(
+            f'<instance><uri>{instance["uri"]}</uri><method>{instance["method"]}</method>'
+            f'<param>{instance["param"]}</param></instance>' for instance in alert['instances'])
+        fields = ''.join(f'<{tag}>{alert[tag]}</{tag}>'
+                         for tag in ('pluginid', 'riskcode', 'confidence', 'cweid', 'desc', 'solution', 'reference'))
+        items.append(f'<alertitem><alert>{alert["name"]}</alert>{fields}<instances>{instances}</instances></alertitem>')
+    path.write_text('<?xml version="1.0" encoding="UTF-8"?>\n<OWASPZAPReport version="2.12">'
+                    f'<site name="{site}"><alerts>{"".join(items)}</alerts></site></OWASPZAPReport>')
+    return str(path)
+
+
+def write_zap_json(path, alerts, site='https://app.example.com'):
+    """Write alerts (see zap_alert) as a ZAP JSON report"""
+    path.write_text(json.dumps({'@version': '2.12', 'site': [{'@name': site, 'alerts': alerts}]}))
+    return str(path)
+
+
+class StubDefectDojo(ThreadingHTTPServer):
+    """In-process DefectDojo API answering from a script of (status, body) responses
+
+    Requests beyond the script get the default response for their method.
+    Every request is recorded as (method, path, headers, body).
+    """
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), _StubHandler)
+        self.requests = []
+        self.script = []
+        self.defaults = {'GET': (200, {'count': 0, 'next': None, 'results': []}),
+                         'POST': (201, {'id': 1, 'test': 1})}
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}'
+
+    def respond(self, *responses):
+        self.script.extend(responses)
+
+    def next_response(self, method):
+        with self._lock:
+            return self.script.pop(0) if self.script else self.defaults[method]
+
+    def posts(self, path=None):
+        return [r for r in self.requests if r[0] == 'POST' and (path is None or r[1].startswith(path))]
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def _read_body(self):
+        if self.headers.get('Transfer-Encoding') == 'chunked':
+            body = b''
+            while True:
+                size = int(self.rfile.readline().strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    return body
+                body += self.rfile.read(size)
+                self.rfile.readline()
+        return self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+    def _handle(self):
+        body = self._read_body()
+        self.server.requests.append((self.command, self.path, dict(self.headers), body))
+        status, payload = self.server.next_response(self.command)
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = _handle
+
+
+@pytest.fixture
+def dojo():
+    server = StubDefectDojo()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def enhanced():
+    return load_script('upload-reports-enhanced.py', 'upload_reports_enhanced')
+
+
+@pytest.fixture
+def uploader(enhanced, dojo, tmp_path):
+    from defectdojo_cache import DefectDojoIDCache
+    from defectdojo_client import DefectDojoSession
+    from defectdojo_ledger import FingerprintLedger
+
+    return enhanced.DefectDojoUploader(
+        dojo.url, 'token', 'Test Product', engagement_name='CI/CD Pipeline - test',
+        session=DefectDojoSession(compression='none'),
+        id_cache=DefectDojoIDCache(path=str(tmp_path / 'ids.json')),
+        ledger=FingerprintLedger(path=str(tmp_path / 'ledger.json')),
+        parse_workers=1)
+
+
+@pytest.fixture
+def zap_xml():
+    return load_script('zap-xml-defectdojo-uploader.py', 'zap_xml_defectdojo_uploader')
+
+
+@pytest.fixture
+def xml_uploader(zap_xml, dojo, tmp_path, monkeypatch):
+    from defectdojo_cache import DefectDojoIDCache
+    from defectdojo_client import DefectDojoSession
+    from defectdojo_ledger import FingerprintLedger
+
+    # Upload summaries are written to the working directory
+    monkeypatch.chdir(tmp_path)
+    return zap_xml.ZAPXMLDefectDojoUploader(
+        dojo.url, 'token', 'Test Product', engagement_name='CI/CD Pipeline - test',
+        session=DefectDojoSession(compression='none'),
+        id_cache=DefectDojoIDCache(path=str(tmp_path / 'ids.json')),
+        ledger=FingerprintLedger(path=str(tmp_path / 'ledger.json')))
+
+
+@pytest.fixture
+def sample_zap_xml():
+    return os.path.join(REPO_DIR, 'test-sample-zap-report.xml')
@@ -0,0 +1,101 @@
+"""Stale-ID invalidation of the ID cache, and recovery within the same run"""
+
+import asyncio
+import json
+from datetime import datetime
+
+from conftest import write_zap_xml, zap_alert
+from defectdojo_cache import DefectDojoIDCache, is_stale_id_response
+
+STALE_ENGAGEMENT = (400, {'engagement': ['Invalid pk "6" - object does not exist.']})
+STALE_PRODUCT = (400, {'product': ['Invalid pk "5" - object does not exist.']})
+TODAY = datetime.now().strftime('%Y-%m-%d')
+
+
+def seed_stale_ids(uploader):
+    uploader.id_cache.set_product_id(uploader.base_url, uploader.product_name, 5)
+    uploader.id_cache.set_engagement_id(uploader.base_url, uploader.product_name, uploader.engagement_name,
+                                        TODAY, 6)
+
+
+def import_engagements(dojo):
+    engagements = []
+    for _, _, headers, body in dojo.posts('/api/v2/import-scan/'):
+        marker = b'name="engagement"\r\n\r\n'
+        if marker in body:
+            engagements.append(int(body.split(marker)[1].split(b'\r\n')[0]))
+        else:
+            engagements.append(json.loads(body)['engagement'])
+    return engagements
+
+
+def test_invalidate_product_drops_its_engagements_only(tmp_path):
+    cache = DefectDojoIDCache(path=str(tmp_path / 'ids.json'), ttl=60)
+    cache.set_product_id('https://dojo/', 'app', 5)
+    cache.set_engagement_id('https://dojo', 'app', 'CI', TODAY, 6)
+    cache.set_product_id('https://dojo', 'other', 7)
+
+    cache.invalidate_product('https://dojo', 'app')
+
+    assert cache.get_product_id('https://dojo', 'app') is None
+    assert cache.get_engagement_id('https://dojo', 'app', 'CI', TODAY) is None
+    assert cache.get_product_id('https://dojo', 'other') == 7
+
+
+def test_stale_id_responses():
+    assert is_stale_id_response(404)
+    assert is_stale_id_response(400, '{"engagement": ["Invalid pk \\"6\\" - object does not exist."]}')
+    assert not is_stale_id_response(400, '{"scan_type": ["This field is required."]}')
+    assert not is_stale_id_response(503)
+
+
+def test_rejected_import_is_retried_with_fresh_ids(uploader, dojo, tmp_path):
+    seed_stale_ids(uploader)
+    report = tmp_path / 'semgrep.json'
+    report.write_text('{"results": []}')
+    dojo.respond(STALE_ENGAGEMENT)
+
+    assert uploader.upload_all_reports([str(report)])
+
+    assert import_engagements(dojo) == [6, 1]
+    assert uploader.cached_engagement_id() == 1
+
+
+def test_stale_product_is_looked_up_again_before_uploading(uploader, dojo, tmp_path):
+    # Only the product is cached: the engagement search and create use the stale product ID
+    uploader.id_cache.set_product_id(uploader.base_url, uploader.product_name, 5)
+    report = tmp_path / 'semgrep.json'
+    report.write_text('{"results": []}')
+    dojo.respond((200, {'count': 0, 'next': None, 'results': []}), STALE_PRODUCT)
+
+    assert uploader.upload_all_reports([str(report)])
+
+    engagement_posts = [json.loads(body) for _, _, _, body in dojo.posts('/api/v2/engagements/')]
+    assert [post['product'] for post in engagement_posts] == [5, 1]
+    assert import_engagements(dojo) == [1]
+
+
+def test_async_upload_is_retried_with_fresh_ids(enhanced, dojo, tmp_path):
+    uploader = enhanced.AsyncDefectDojoUploader(
+        dojo.url, 'token', 'Test Product', engagement_name='CI/CD Pipeline - test',
+        id_cache=DefectDojoIDCache(path=str(tmp_path / 'ids.json')), parse_workers=1)
+    seed_stale_ids(uploader)
+    report = tmp_path / 'semgrep.json'
+    report.write_text('{"results": []}')
+    dojo.respond(STALE_ENGAGEMENT)
+
+    assert asyncio.run(uploader.upload_all_reports([str(report)]))
+
+    assert import_engagements(dojo) == [6, 1]
+
+
+def test_zap_xml_upload_is_retried_with_fresh_ids(xml_uploader, dojo, tmp_path):
+    seed_stale_ids(xml_uploader)
+    report = write_zap_xml(tmp_path / 'zap.xml', [zap_alert(1), zap_alert(2)])
+    dojo.respond(STALE_ENGAGEMENT)
+
+    assert xml_uploader.process_zap_xml_upload(report)
+
+    assert import_engagements(dojo) == [6, 1]
+    retried = json.loads(dojo.posts('/api/v2/import-scan/')[1][3])
+    assert len(retried['import_findings']) == 2
@@ -0,0 +1,42 @@
+"""Lookup precedence of the shared OWASP Top 10 classifier"""
+
+from defectdojo_classification import OWASPClassifier
+
+A03 = 'A03:2021-Injection'
+A05 = 'A05:2021-Security Misconfiguration'
+
+
+def test_cwe_wins_over_a_disagreeing_pluginid():
+    classifier = OWASPClassifier()
+
+    # pluginid 40018 is ZAP's SQL injection rule; CWE 693 is a protection mechanism failure
+    assert classifier.classify('40018', 693, 'Content Security Policy Header Not Set') == A05
+    assert classifier.hits['cwe'] == 1
+    assert classifier.conflicts == 1
+
+
+def test_pluginid_decides_without_a_known_cwe():
+    classifier = OWASPClassifier()
+
+    assert classifier.classify('40018', -1, 'Some alert') == A03
+    assert classifier.classify(40018, None) == A03
+    assert classifier.hits['pluginid'] == 2
+    assert classifier.conflicts == 0
+
+
+def test_name_is_the_last_resort():
+    classifier = OWASPClassifier()
+
+    assert classifier.classify('999999', None, 'Reflected Cross-Site Scripting (XSS)') == A03
+    assert classifier.classify('999999', None, 'Something unheard of') is None
+    assert classifier.stats()['hits']['name'] == 1
+    assert classifier.misses == 1
+
+
+def test_sample_report_alert_is_security_misconfiguration(xml_uploader, sample_zap_xml):
+    xml_uploader.classifier = OWASPClassifier()
+
+    [finding] = xml_uploader.parse_zap_xml_report(sample_zap_xml)
+
+    assert finding.plugin_id == 40018
+    assert finding.owasp_top_10 == A05
@@ -0,0 +1,145 @@
+"""Retry and replay behaviour of the shared DefectDojo session"""
+
+import io
+import zlib
+
+from defectdojo_client import DefectDojoSession, RetryPolicy, is_encoding_rejected, spool_body
+
+
+def make_session(**kwargs):
+    kwargs.setdefault('retry_policy', RetryPolicy(max_attempts=3, backoff_base=0.01, backoff_max=0.01))
+    return DefectDojoSession(**kwargs)
+
+
+def body_chunks(count=200):
+    return (b'{"n": %d, "pad": "%s"}\n' % (i, b'x' * 64) for i in range(count))
+
+
+def test_streamed_body_is_retried_after_503(dojo):
+    dojo.respond((503, {'detail': 'unavailable'}))
+    session = make_session(compression='none')
+
+    response = session.post_body(dojo.url + '/api/v2/import-scan/', body_chunks(), idempotent=True)
+
+    assert response.status_code == 201
+    posts = dojo.posts('/api/v2/import-scan/')
+    assert len(posts) == 2
+    assert posts[0][3] == posts[1][3] == b''.join(body_chunks())
+
+
+def test_streamed_body_spilled_to_disk_is_rewound_for_each_attempt(dojo):
+    dojo.respond((503, {}), (502, {}))
+    session = make_session(compression='none', spool_memory_bytes=256)
+
+    response = session.post_body(dojo.url + '/api/v2/import-scan/', body_chunks(), idempotent=True)
+
+    assert response.status_code == 201
+    bodies = [post[3] for post in dojo.posts()]
+    assert bodies == [b''.join(body_chunks())] * 3
+
+
+def test_compressed_streamed_body_is_retried(dojo):
+    session = make_session(compression='gzip', compression_min_bytes=64)
+    dojo.respond((503, {}))
+
+    response = session.post_body(dojo.url + '/api/v2/import-scan/', body_chunks(), idempotent=True)
+
+    assert response.status_code == 201
+    posts = dojo.posts()
+    assert len(posts) == 2
+    assert all(post[2]['Content-Encoding'] == 'gzip' for post in posts)
+    assert zlib.decompress(posts[1][3], 47) == b''.join(body_chunks())
+
+
+def test_non_idempotent_post_is_retried_only_when_unprocessed(dojo):
+    dojo.respond((503, {}), (504, {}))
+    session = make_session(compression='none')
+
+    response = session.post(dojo.url + '/api/v2/products/', data=b'{}')
+
+    # 503 never reached the application; a 504 may have, so it is returned as-is
+    assert response.status_code == 504
+    assert len(dojo.posts()) == 2
+
+
+def test_retries_stop_after_max_attempts(dojo):
+    dojo.respond(*[(503, {})] * 5)
+    session = make_session(compression='none')
+
+    response = session.post_body(dojo.url + '/api/v2/import-scan/', body_chunks(), idempotent=True)
+
+    assert response.status_code == 503
+    assert len(dojo.posts()) == 3
+
+
+def test_spool_body_keeps_small_bodies_in_memory():
+    assert spool_body([b'ab', b'cd'], max_memory=16) == b'abcd'
+
+    spooled = spool_body([b'ab', b'cd', b'ef'], max_memory=3)
+    try:
+        assert isinstance(spooled, io.IOBase)
+        assert spooled.read() == b'abcdef'
+    finally:
+        spooled.close()
+
+
+class _Response:
+    def __init__(self, status_code, text):
+        self.status_code = status_code
+        self.text = text
+
+
+def test_encoding_rejection_requires_an_encoding_error():
+    assert is_encoding_rejected(_Response(415, ''))
+    assert is_encoding_rejected(_Response(400, '{"detail": "JSON parse error - invalid start byte"}'))
+    assert not is_encoding_rejected(_Response(400, '{"engagement": ["Invalid pk"]}'))
+    assert not is_encoding_rejected(_Response(400, '{"file": ["Unable to decode the report: unexpected token"]}'))
+    assert not is_encoding_rejected(_Response(400, '{"detail": "Report parse error on line 3"}'))
+
+
+def test_compression_is_negotiated_without_a_probe_request(dojo):
+    session = make_session(compression='gzip', compression_min_bytes=64)
+
+    session.post_body(dojo.url + '/api/v2/import-scan/', b''.join(body_chunks()), idempotent=True)
+    session.post_body(dojo.url + '/api/v2/import-scan/', b''.join(body_chunks()), idempotent=True)
+
+    posts = dojo.posts()
+    assert len(posts) == 2
+    assert all(zlib.decompress(post[3], 47) == b''.join(body_chunks()) for post in posts)
+
+
+def test_validation_error_mentioning_decode_keeps_compression(dojo):
+    dojo.respond((400, {'file': ['Unable to decode the report']}))
+    session = make_session(compression='gzip', compression_min_bytes=64)
+
+    response = session.post_body(dojo.url + '/api/v2/import-scan/', b''.join(body_chunks()), idempotent=True)
+
+    assert response.status_code == 400
+    assert len(dojo.posts()) == 1
+    assert session.negotiate_encoding(dojo.url) == 'gzip'
+
+
+def test_rejected_compressed_stream_is_resent_uncompressed(dojo):
+    dojo.respond((415, {'detail': 'Unsupported media type'}))
+    session = make_session(compression='gzip', compression_min_bytes=64, spool_memory_bytes=256)
+
+    response = session.post_body(dojo.url + '/api/v2/import-scan/', body_chunks(), idempotent=True)
+
+    assert response.status_code == 201
+    posts = dojo.posts()
+    assert [post[2].get('Content-Encoding') for post in posts] == ['gzip', None]
+    assert posts[1][3] == b''.join(body_chunks())
+    assert session.negotiate_encoding(dojo.url) is None
+    assert session.compression_stats.fallbacks == 1
+
+
+def test_rejected_compressed_stream_is_counted_as_sent_plain(dojo):
+    dojo.respond((415, {'detail': 'Unsupported media type'}))
+    session = make_session(compression='gzip', compression_min_bytes=64, spool_memory_bytes=256)
+
+    session.post_body(dojo.url + '/api/v2/import-scan/', body_chunks(), idempotent=True)
+
+    raw_bytes = len(b''.join(body_chunks()))
+    assert session.compression_stats.as_dict() == {
+        'raw_bytes': raw_bytes, 'sent_bytes': raw_bytes, 'bytes_saved': 0, 'compressed_requests': 0, 'fallbacks': 1
+    }
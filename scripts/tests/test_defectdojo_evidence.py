@@ -0,0 +1,99 @@
+"""Truncation and content-addressed storage of long DAST evidence bodies"""
+
+import json
+import os
+
+from conftest import write_zap_json, zap_alert
+from defectdojo_evidence import EvidenceStore
+
+
+def http_response(size):
+    return 'HTTP/1.1 200 OK\r\nContent-Type: text/html\r\n\r\n' + 'x' * size
+
+
+def store_files(directory):
+    return [name for name in os.listdir(directory) if not name.startswith('.')]
+
+
+def test_short_bodies_are_kept_inline(tmp_path):
+    store = EvidenceStore(max_chars=64, directory=str(tmp_path))
+
+    assert store.externalise('GET / HTTP/1.1') == 'GET / HTTP/1.1'
+    assert store.externalise('') == ''
+    assert store.truncated == 0
+    assert store.attachments() == []
+
+
+def test_long_body_is_truncated_and_stored_in_full(tmp_path):
+    store = EvidenceStore(max_chars=64, directory=str(tmp_path))
+    body = http_response(1000)
+
+    inline = store.externalise(body)
+
+    assert inline.startswith(body[:64])
+    assert 'HTTP/1.1 200 OK' in inline
+    [(name, path)] = store.attachments()
+    assert f'full body attached as {name}' in inline
+    assert f'truncated from {len(body)} bytes' in inline
+    with open(path, 'rb') as f:
+        assert f.read() == body.encode('utf-8')
+    assert store.truncated == 1
+    assert store.removed_chars == len(body) - 64
+
+
+def test_repeated_body_is_stored_once(tmp_path):
+    store = EvidenceStore(max_chars=64, directory=str(tmp_path))
+
+    first = store.externalise(http_response(1000))
+    second = store.externalise(http_response(1000))
+    store.externalise(http_response(2000))
+
+    assert first == second
+    assert len(store.attachments()) == 2
+    assert store.truncated == 3
+
+
+def test_stores_sharing_a_directory_write_each_body_once(tmp_path):
+    body = http_response(1000)
+
+    EvidenceStore(max_chars=64, directory=str(tmp_path)).externalise(body)
+    EvidenceStore(max_chars=64, directory=str(tmp_path)).externalise(body)
+
+    assert len(store_files(tmp_path)) == 1
+
+
+def test_zero_limit_disables_truncation(tmp_path):
+    store = EvidenceStore(max_chars=0, directory=str(tmp_path))
+    body = http_response(1000)
+
+    assert store.externalise(body) == body
+    assert store.attachments() == []
+
+
+def test_owned_directory_is_removed_on_close():
+    store = EvidenceStore(max_chars=64)
+    store.externalise(http_response(1000))
+
+    store.close()
+
+    assert not os.path.exists(store.directory)
+
+
+def test_zap_evidence_is_truncated_in_the_import_and_attached_once(uploader, dojo, tmp_path):
+    response = http_response(10000)
+    alert = zap_alert(1, urls=['https://app.example.com/a', 'https://app.example.com/b'])
+    for instance in alert['instances']:
+        instance['response'] = response
+    report = write_zap_json(tmp_path / 'gl-dast-report.json', [alert])
+
+    assert uploader.process_zap_dast_report(report, 3)
+
+    [upload] = dojo.posts('/api/v2/import-scan/')
+    findings = json.loads(upload[3])['import_findings']
+    assert len(findings) == 2
+    for finding in findings:
+        assert len(finding['response']) < len(response)
+        assert 'full body attached as evidence-' in finding['response']
+    attachments = dojo.posts('/api/v2/tests/1/files/')
+    assert len(attachments) == 1
+    assert response.encode() in attachments[0][3]
@@ -0,0 +1,134 @@
+"""Per-scan-type source filter rules and what they drop in each uploader"""
+
+import json
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from conftest import write_zap_json, write_zap_xml, zap_alert
+from defectdojo_filters import FilterConfig, FindingFilter
+
+
+def write_rules(path, default=None, scanners=None):
+    path.write_text(json.dumps({'default': default or {}, 'scanners': scanners or {}}))
+    return FilterConfig(str(path))
+
+
+def test_scanner_block_overrides_the_default_key_by_key(tmp_path):
+    config = write_rules(tmp_path / 'filters.json',
+                         default={'minimum_severity': 'Low', 'exclude_params': 'csrf.*'},
+                         scanners={'OWASP ZAP DAST Scan': {'minimum_severity': 'High'}})
+
+    assert config.rules_for('OWASP ZAP DAST Scan') == {'minimum_severity': 'High', 'exclude_params': 'csrf.*'}
+    assert config.rules_for('Trivy Scan') == {'minimum_severity': 'Low', 'exclude_params': 'csrf.*'}
+
+
+def test_each_scan_type_gets_its_own_threshold_and_counts(tmp_path):
+    config = write_rules(tmp_path / 'filters.json', default={'minimum_severity': 'Low'},
+                         scanners={'OWASP ZAP DAST Scan': {'minimum_severity': 'High'}})
+    zap = config.for_scan_type('OWASP ZAP DAST Scan')
+    trivy = config.for_scan_type('Trivy Scan')
+
+    assert zap.rejects(severity='Medium')
+    assert not trivy.rejects(severity='Medium')
+    assert trivy.rejects(severity='Info')
+    assert zap.dropped['severity'] == 1 and trivy.dropped['severity'] == 1
+    assert config.for_scan_type('OWASP ZAP DAST Scan') is zap
+
+
+def test_scan_type_without_rules_has_no_filter(tmp_path):
+    config = write_rules(tmp_path / 'filters.json', default={'minimum_severity': ''},
+                         scanners={'Trivy Scan': {'minimum_severity': 'High'}})
+
+    assert config.for_scan_type('Gitleaks Scan') is None
+    assert [scan_type for scan_type, _ in config.filters()] == []
+    config.for_scan_type('Trivy Scan')
+    assert [scan_type for scan_type, _ in config.filters()] == ['Trivy Scan']
+
+
+def test_unknown_rules_and_levels_are_refused(tmp_path):
+    config = write_rules(tmp_path / 'filters.json', scanners={'SARIF': {'min_severity': 'High'}})
+
+    with pytest.raises(ValueError, match='min_severity'):
+        config.for_scan_type('SARIF')
+    with pytest.raises(ValueError, match='Severe'):
+        FindingFilter(minimum_severity='Severe')
+
+
+def test_confidence_cwe_and_location_rules():
+    finding_filter = FindingFilter(minimum_confidence='Medium', cwe_deny='CWE-200, 16',
+                                   exclude_urls=r'.*\.css$', exclude_params='csrf.*')
+
+    assert finding_filter.reason('High', 'Low', 79) == 'confidence'
+    assert finding_filter.reason('High', None, 79) is None
+    assert finding_filter.reason('High', 'High', 200) == 'cwe'
+    assert finding_filter.location_reason('https://app/site.css') == 'url'
+    assert finding_filter.location_reason('https://app/login', 'csrf_token') == 'param'
+    assert finding_filter.location_reason('https://app/login', 'user') is None
+
+
+def test_cwe_allow_list_drops_findings_without_a_cwe():
+    finding_filter = FindingFilter(cwe_allow='79,89')
+
+    assert finding_filter.reason(cwe=89) is None
+    assert finding_filter.reason(cwe=22) == 'cwe'
+    assert finding_filter.reason(cwe=None) == 'cwe'
+
+
+def test_worker_counts_merge_into_the_parent_filter():
+    parent, worker = FindingFilter(minimum_severity='Low'), FindingFilter(minimum_severity='Low')
+    worker.rejects(nbytes=100, severity='Info')
+
+    parent.add_counts(worker.take_counts())
+
+    assert parent.dropped['severity'] == 1 and parent.dropped_bytes == 100
+    assert worker.total_dropped == 0
+
+
+def test_counts_from_concurrent_upload_threads_are_not_lost():
+    finding_filter = FindingFilter(minimum_severity='Low')
+    merged = FindingFilter(minimum_severity='Low')
+
+    def drop_and_report(_):
+        for _ in range(2000):
+            finding_filter.rejects(nbytes=3, severity='Info')
+        merged.add_counts(finding_filter.take_counts())
+
+    with ThreadPoolExecutor(max_workers=8) as threads:
+        list(threads.map(drop_and_report, range(8)))
+    merged.add_counts(finding_filter.take_counts())
+
+    assert merged.dropped['severity'] == 16000
+    assert merged.dropped_bytes == 48000
+
+
+def test_filter_pickles_for_worker_processes():
+    finding_filter = FindingFilter(minimum_severity='Medium', exclude_urls=r'.*\.css$')
+    finding_filter.drop('url', 2, 10)
+
+    copy = pickle.loads(pickle.dumps(finding_filter))
+    copy.drop('severity')
+
+    assert copy.rejects(location='https://app/site.css')
+    assert copy.stats()['dropped'] == {'severity': 1, 'confidence': 0, 'cwe': 0, 'url': 3, 'param': 0}
+    assert finding_filter.dropped['url'] == 2
+
+
+def test_json_and_xml_uploaders_apply_their_own_scan_type_rules(enhanced, zap_xml, dojo, tmp_path, monkeypatch):
+    config = write_rules(tmp_path / 'filters.json', default={'minimum_severity': 'Low'},
+                         scanners={'OWASP ZAP DAST Scan': {'minimum_severity': 'High'},
+                                   'OWASP ZAP DAST Scan (XML)': {'minimum_severity': 'Medium'}})
+    alerts = [zap_alert(code, riskcode=code) for code in range(4)]
+    monkeypatch.chdir(tmp_path)
+    json_uploader = enhanced.DefectDojoUploader(dojo.url, 'token', 'Test Product', filter_config=config,
+                                                parse_workers=1)
+    xml_uploader = zap_xml.ZAPXMLDefectDojoUploader(dojo.url, 'token', 'Test Product', filter_config=config)
+
+    json_findings = list(json_uploader.iter_zap_dast_findings(write_zap_json(tmp_path / 'zap.json', alerts)))
+    xml_findings = xml_uploader.parse_zap_xml_report(write_zap_xml(tmp_path / 'zap.xml', alerts))
+
+    assert [finding.severity for finding in json_findings] == ['High']
+    assert [finding.severity for finding in xml_findings] == ['Medium', 'High']
+    assert config.for_scan_type('OWASP ZAP DAST Scan').dropped['severity'] == 3
+    assert config.for_scan_type('OWASP ZAP DAST Scan (XML)').dropped['severity'] == 2
@@ -0,0 +1,81 @@
+"""Fingerprinting and intra-report merging of duplicate findings"""
+
+import json
+
+from conftest import write_zap_json, write_zap_xml, zap_alert
+from defectdojo_findings import Finding
+from defectdojo_fingerprints import DEFAULT_FINGERPRINT_FIELDS, FindingDeduplicator, fingerprint
+
+
+def zap_finding(url='https://app/a', param='q', **fields):
+    fields.setdefault('title', 'Cross Site Scripting')
+    fields.setdefault('severity', 'High')
+    return Finding(cwe=79, url=url, param=param, **fields)
+
+
+def test_fingerprint_separates_field_values():
+    assert fingerprint({'a': 'ab', 'b': 'c'}, ('a', 'b')) != fingerprint({'a': 'a', 'b': 'bc'}, ('a', 'b'))
+    assert fingerprint({'a': None}, ('a', 'b')) == fingerprint({}, ('a', 'b'))
+
+
+def test_first_of_each_fingerprint_is_kept():
+    first = zap_finding(description='first')
+    deduplicator = FindingDeduplicator('OWASP ZAP DAST Scan')
+
+    kept = list(deduplicator.iter_unique([first, zap_finding(description='again'), zap_finding(param='id')]))
+
+    # The description is not part of a DAST fingerprint; the parameter is
+    assert kept[0] is first
+    assert [finding.param for finding in kept] == ['q', 'id']
+    assert deduplicator.duplicates == 1
+    assert deduplicator.unique == 2
+
+
+def test_dast_fingerprint_includes_url_and_severity():
+    deduplicator = FindingDeduplicator('OWASP ZAP DAST Scan (XML)')
+
+    kept = list(deduplicator.iter_unique([zap_finding(), zap_finding(url='https://app/b'),
+                                          zap_finding(severity='Low')]))
+
+    assert len(kept) == 3
+    assert deduplicator.duplicates == 0
+
+
+def test_trivy_cve_repeated_per_layer_is_merged():
+    findings = [Finding(title='CVE-2024-1 in openssl', severity='High', vuln_id_from_tool='CVE-2024-1',
+                        description='openssl', file_path=f'layer-{layer}') for layer in range(3)]
+    deduplicator = FindingDeduplicator('Trivy Scan')
+
+    assert len(list(deduplicator.iter_unique(findings))) == 1
+    assert deduplicator.duplicates == 2
+
+
+def test_unknown_scan_type_uses_the_default_fields():
+    deduplicator = FindingDeduplicator('Semgrep JSON Report')
+
+    kept = list(deduplicator.iter_unique([Finding(title='eval', file_path='a.js', line=3),
+                                          Finding(title='eval', file_path='a.js', line=3),
+                                          Finding(title='eval', file_path='a.js', line=4)]))
+
+    assert deduplicator.fields == DEFAULT_FINGERPRINT_FIELDS
+    assert len(kept) == 2
+    assert deduplicator.stats() == {'fields': list(DEFAULT_FINGERPRINT_FIELDS), 'unique_findings': 2,
+                                    'duplicates_merged': 1}
+
+
+def test_json_uploader_imports_a_repeated_alert_once(uploader, dojo, tmp_path):
+    report = write_zap_json(tmp_path / 'gl-dast-report.json', [zap_alert(1), zap_alert(1), zap_alert(2)])
+
+    assert uploader.process_zap_dast_report(report, 3)
+
+    [upload] = dojo.posts('/api/v2/import-scan/')
+    assert [finding['title'] for finding in json.loads(upload[3])['import_findings']] == ['Alert 1', 'Alert 2']
+
+
+def test_xml_uploader_imports_a_repeated_alert_once(xml_uploader, dojo, tmp_path):
+    report = write_zap_xml(tmp_path / 'zap.xml', [zap_alert(1), zap_alert(1), zap_alert(2)])
+
+    assert xml_uploader.process_zap_xml_upload(report)
+
+    [upload] = dojo.posts('/api/v2/import-scan/')
+    assert [finding['title'] for finding in json.loads(upload[3])['import_findings']] == ['Alert 1', 'Alert 2']
@@ -0,0 +1,97 @@
+"""Incremental walking of JSON split at arbitrary chunk boundaries"""
+
+import io
+import json
+
+import pytest
+
+import defectdojo_jsonstream
+from defectdojo_jsonstream import JSONStreamReader
+
+DOCUMENT = {
+    'escapes': 'quote " backslash \\ slash / tab \t newline \n control \u0001',
+    'unicode': 'café ☃ \U0001F600',
+    'numbers': [0, -2500.0, 1e-7, 12345678901234567890, -0.5, 3.25e10],
+    'literals': [True, False, None],
+    'empty': {'array': [], 'object': {}, 'string': '', 'nested': [[], [{}]]},
+    'alerts': [{'name': f'Alert {index}', 'desc': '<p>' + '\\"x' * index + '</p>'} for index in range(5)],
+}
+
+
+def walk(reader):
+    """Rebuild the next value with iter_object/iter_array/read, like the converters do"""
+    token = reader.peek()
+    if token == b'{':
+        return {key: walk(reader) for key in reader.iter_object()}
+    if token == b'[':
+        return [walk(reader) for _ in reader.iter_array()]
+    return reader.read()
+
+
+def encode(document, ensure_ascii):
+    return json.dumps(document, ensure_ascii=ensure_ascii, indent=1).encode('utf-8')
+
+
+@pytest.mark.parametrize('ensure_ascii', [True, False])
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 64])
+def test_values_split_across_chunks_decode_like_json_loads(chunk_size, ensure_ascii):
+    data = encode(DOCUMENT, ensure_ascii)
+
+    assert walk(JSONStreamReader(io.BytesIO(data), chunk_size=chunk_size)) == json.loads(data)
+
+
+def test_escaped_surrogate_pair_is_one_character():
+    reader = JSONStreamReader(io.BytesIO(b'["\\ud83d\\ude00", "\\u00e9\\"\\\\"]'), chunk_size=3)
+
+    assert walk(reader) == ['\U0001F600', 'é"\\']
+
+
+def test_number_cut_at_the_fast_read_window_is_read_whole(monkeypatch):
+    monkeypatch.setattr(defectdojo_jsonstream, 'FAST_READ_WINDOW', 3)
+    reader = JSONStreamReader(io.BytesIO(b'[-2500.0, 1e-7, "abcdef"]'))
+
+    assert walk(reader) == [-2500.0, 1e-7, 'abcdef']
+
+
+@pytest.mark.parametrize('chunk_size', [1, 5, 64])
+def test_skipped_values_leave_the_reader_on_the_next_key(chunk_size):
+    data = encode(DOCUMENT, ensure_ascii=False)
+    reader = JSONStreamReader(io.BytesIO(data), chunk_size=chunk_size)
+
+    kept = {}
+    for key in reader.iter_object():
+        if key in ('empty', 'alerts'):
+            kept[key] = reader.read()
+        else:
+            reader.skip()
+
+    assert kept == {'empty': DOCUMENT['empty'], 'alerts': DOCUMENT['alerts']}
+    assert reader.peek() == b''
+
+
+def test_empty_containers_yield_nothing():
+    reader = JSONStreamReader(io.BytesIO(b'{"site": [ ], "alerts": {\n}}'), chunk_size=1)
+
+    seen = []
+    for key in reader.iter_object():
+        seen.append(key)
+        seen.extend(reader.iter_array() if key == 'site' else reader.iter_object())
+
+    assert seen == ['site', 'alerts']
+
+
+def test_read_raw_returns_the_value_bytes():
+    reader = JSONStreamReader(io.BytesIO(b'{"a": {"b": "]}\\""}, "c": 1}'), chunk_size=2)
+
+    keys = reader.iter_object()
+    assert next(keys) == 'a'
+    assert reader.read_raw() == b'{"b": "]}\\""}'
+    assert next(keys) == 'c'
+    assert reader.read() == 1
+
+
+def test_unterminated_string_is_an_error():
+    reader = JSONStreamReader(io.BytesIO(b'["abc'), chunk_size=2)
+
+    with pytest.raises(ValueError):
+        walk(reader)
@@ -0,0 +1,114 @@
+"""Fingerprint ledger persistence and delta uploads against it"""
+
+import json
+import time
+
+from conftest import write_zap_json, zap_alert
+from defectdojo_cache import DefectDojoIDCache
+from defectdojo_client import DefectDojoSession
+from defectdojo_findings import Finding
+from defectdojo_fingerprints import FindingDeduplicator
+from defectdojo_ledger import FingerprintLedger
+
+ZAP_SCAN_TYPE = 'OWASP ZAP DAST Scan'
+
+
+def ledger_key(engagement_name='CI/CD Pipeline - main', report='gl-dast-report.json'):
+    return FingerprintLedger.key('https://dojo/', 'Product', engagement_name, ZAP_SCAN_TYPE, report)
+
+
+def test_fingerprints_round_trip(tmp_path):
+    ledger = FingerprintLedger(path=str(tmp_path / 'ledger.json'), ttl=60)
+
+    assert ledger.get(ledger_key()) is None
+    assert ledger.set(ledger_key(), {'bb', 'aa'})
+    assert FingerprintLedger(path=str(tmp_path / 'ledger.json'), ttl=60).get(ledger_key()) == {'aa', 'bb'}
+    assert ledger.get(ledger_key(report='other.json')) is None
+    assert ledger.get(ledger_key(engagement_name='CI/CD Pipeline - develop')) is None
+
+
+def test_expired_entries_are_ignored(tmp_path, monkeypatch):
+    ledger = FingerprintLedger(path=str(tmp_path / 'ledger.json'), ttl=60)
+    ledger.set(ledger_key(), {'aa'})
+
+    later = time.time() + 61
+    monkeypatch.setattr(time, 'time', lambda: later)
+
+    assert ledger.get(ledger_key()) is None
+
+
+def test_zero_ttl_disables_the_ledger(tmp_path):
+    ledger = FingerprintLedger(path=str(tmp_path / 'ledger.json'), ttl=0)
+
+    assert not ledger.set(ledger_key(), {'aa'})
+    assert ledger.get(ledger_key()) is None
+    assert not (tmp_path / 'ledger.json').exists()
+
+
+def test_concurrent_writers_keep_each_others_entries(tmp_path):
+    path = str(tmp_path / 'ledger.json')
+    first, second = FingerprintLedger(path=path, ttl=60), FingerprintLedger(path=path, ttl=60)
+
+    first.set(ledger_key(report='a.json'), {'aa'})
+    second.set(ledger_key(report='b.json'), {'bb'})
+
+    assert first.get(ledger_key(report='a.json')) == {'aa'}
+    assert first.get(ledger_key(report='b.json')) == {'bb'}
+
+
+def test_corrupt_file_reads_as_empty(tmp_path):
+    (tmp_path / 'ledger.json').write_text('{not json')
+    ledger = FingerprintLedger(path=str(tmp_path / 'ledger.json'), ttl=60)
+
+    assert ledger.get(ledger_key()) is None
+    assert ledger.set(ledger_key(), {'aa'})
+
+
+def test_deduplicator_splits_new_unchanged_and_gone():
+    findings = [Finding(title=title, severity='High', url='https://app/', param='q') for title in 'ABC']
+    previous = FindingDeduplicator(ZAP_SCAN_TYPE)
+    list(previous.iter_unique(findings[:2]))
+
+    deduplicator = FindingDeduplicator(ZAP_SCAN_TYPE, known=previous.fingerprints())
+    sent = list(deduplicator.iter_unique(findings[1:]))
+
+    assert [finding.title for finding in sent] == ['C']
+    assert (deduplicator.new, deduplicator.unchanged) == (1, 1)
+    assert deduplicator.disappeared() == [previous.fingerprint(findings[0]).hex()]
+    assert deduplicator.stats()['disappeared_findings'] == 1
+
+
+def upload(enhanced, dojo, tmp_path, alerts):
+    uploader = enhanced.DefectDojoUploader(
+        dojo.url, 'token', 'Test Product', engagement_name='CI/CD Pipeline - test',
+        session=DefectDojoSession(compression='none'),
+        id_cache=DefectDojoIDCache(path=str(tmp_path / 'ids.json')),
+        ledger=FingerprintLedger(path=str(tmp_path / 'ledger.json')), parse_workers=1, delta_upload=True)
+    report = write_zap_json(tmp_path / 'gl-dast-report.json', alerts)
+    return uploader.process_zap_dast_report(report, 3)
+
+
+def imported_titles(dojo):
+    return [[finding['title'] for finding in json.loads(post[3])['import_findings']]
+            for post in dojo.posts('/api/v2/import-scan/')]
+
+
+def test_delta_upload_sends_only_new_findings_and_notes_gone_ones(enhanced, dojo, tmp_path):
+    assert upload(enhanced, dojo, tmp_path, [zap_alert(1), zap_alert(2)])
+    assert upload(enhanced, dojo, tmp_path, [zap_alert(1), zap_alert(2)])
+    assert upload(enhanced, dojo, tmp_path, [zap_alert(2), zap_alert(3)])
+
+    # The unchanged second run imports nothing
+    assert imported_titles(dojo) == [['Alert 1', 'Alert 2'], ['Alert 3']]
+    [note] = dojo.posts('/api/v2/engagements/3/notes/')
+    assert '1 finding(s) uploaded previously are no longer reported' in json.loads(note[3])['entry']
+
+
+def test_failed_delta_upload_leaves_the_ledger_alone(enhanced, dojo, tmp_path):
+    assert upload(enhanced, dojo, tmp_path, [zap_alert(1)])
+    dojo.respond((400, {'engagement': ['Invalid pk']}))
+
+    assert not upload(enhanced, dojo, tmp_path, [zap_alert(1), zap_alert(2)])
+    assert upload(enhanced, dojo, tmp_path, [zap_alert(1), zap_alert(2)])
+
+    assert imported_titles(dojo) == [['Alert 1'], ['Alert 2'], ['Alert 2']]
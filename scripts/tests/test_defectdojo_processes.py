@@ -0,0 +1,56 @@
+"""Parser process pools are spawned, also from inside upload threads"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from conftest import write_zap_xml, zap_alert
+from defectdojo_processes import new_process_pool
+
+
+def _square(value):
+    return value * value
+
+
+def _noop():
+    pass
+
+
+def test_pool_workers_are_spawned(monkeypatch):
+    monkeypatch.delenv('DEFECTDOJO_START_METHOD', raising=False)
+    with new_process_pool(1, _noop) as pool:
+        assert pool._mp_context.get_start_method() == 'spawn'
+        assert list(pool.map(_square, [2, 3])) == [4, 9]
+
+
+def test_unsafe_start_method_is_refused(monkeypatch):
+    monkeypatch.setenv('DEFECTDOJO_START_METHOD', 'fork')
+    with new_process_pool(1, _noop) as pool:
+        assert pool._mp_context.get_start_method() == 'spawn'
+
+
+def test_zap_json_sites_convert_in_workers_from_an_upload_thread(uploader, tmp_path):
+    report = tmp_path / 'gl-dast-report.json'
+    report.write_text(json.dumps({'@version': '2.12', 'site': [
+        {'@name': f'https://site{site}.example.com',
+         'alerts': [zap_alert(site * 10 + index, riskcode=1 + index % 3) for index in range(5)]}
+        for site in range(3)
+    ]}))
+
+    serial = [finding.to_dict() for finding in uploader.iter_zap_dast_findings(str(report), workers=1)]
+    with ThreadPoolExecutor(max_workers=2) as threads:
+        parallel = threads.submit(lambda: [finding.to_dict() for finding in
+                                           uploader.iter_zap_dast_findings(str(report), workers=2)]).result()
+
+    assert len(serial) == 15
+    assert parallel == serial
+
+
+def test_zap_xml_reports_parse_in_spawned_workers(xml_uploader, dojo, tmp_path):
+    paths = [write_zap_xml(tmp_path / f'zap-{index}.xml', [zap_alert(index * 10 + n) for n in range(3)])
+             for index in range(2)]
+
+    assert xml_uploader.process_zap_xml_uploads(paths, workers=2, merge=True)
+
+    [(_, _, _, body)] = dojo.posts('/api/v2/import-scan/')
+    findings = json.loads(body)['import_findings']
+    assert [finding['plugin_id'] for finding in findings] == [10000, 10001, 10002, 10010, 10011, 10012]
@@ -0,0 +1,79 @@
+"""Compressed report detection and transparent decompression"""
+
+import bz2
+import gzip
+import lzma
+
+import pytest
+
+from conftest import write_zap_json, write_zap_xml, zap_alert
+from defectdojo_reports import detect_compression, iter_report_chunks, open_report, report_name
+
+COMPRESSORS = {'gzip': ('.gz', gzip.compress), 'bz2': ('.bz2', bz2.compress), 'xz': ('.xz', lzma.compress)}
+CONTENT = '{"findings": ["café", "☃"], "pad": "%s"}' % ('x' * 5000)
+
+
+def compress_file(path, compression):
+    """Replace a file with its compressed copy at path + suffix"""
+    suffix, compress = COMPRESSORS[compression]
+    compressed = path.with_name(path.name + suffix)
+    compressed.write_bytes(compress(path.read_bytes()))
+    path.unlink()
+    return compressed
+
+
+@pytest.mark.parametrize('compression', sorted(COMPRESSORS))
+def test_compressed_report_reads_like_the_original(compression, tmp_path):
+    report = tmp_path / 'semgrep.json'
+    report.write_text(CONTENT, encoding='utf-8')
+    report = compress_file(report, compression)
+
+    assert detect_compression(str(report)) == compression
+    assert report_name(str(report)) == 'semgrep.json'
+    with open_report(str(report)) as f:
+        assert f.read() == CONTENT.encode('utf-8')
+    with open_report(str(report), mode='r') as f:
+        assert f.read() == CONTENT
+    assert b''.join(iter_report_chunks(str(report), chunk_size=1000)) == CONTENT.encode('utf-8')
+
+
+def test_plain_report_with_a_compression_suffix_keeps_its_name(tmp_path):
+    report = tmp_path / 'semgrep.json.gz'
+    report.write_text(CONTENT, encoding='utf-8')
+
+    assert detect_compression(str(report)) is None
+    assert report_name(str(report)) == 'semgrep.json.gz'
+    with open_report(str(report)) as f:
+        assert f.read() == CONTENT.encode('utf-8')
+
+
+@pytest.mark.parametrize('compression', sorted(COMPRESSORS))
+def test_compressed_zap_reports_parse_like_plain_ones(compression, uploader, xml_uploader, tmp_path):
+    alerts = [zap_alert(index, riskcode=1 + index % 3) for index in range(4)]
+    xml_report = tmp_path / 'zap.xml'
+    json_report = tmp_path / 'gl-dast-report.json'
+    write_zap_xml(xml_report, alerts)
+    write_zap_json(json_report, alerts)
+    plain_xml = [finding.to_dict() for finding in xml_uploader.iter_zap_xml_findings(str(xml_report))]
+    plain_json = [finding.to_dict() for finding in uploader.iter_zap_dast_findings(str(json_report))]
+
+    xml_report = compress_file(xml_report, compression)
+    json_report = compress_file(json_report, compression)
+
+    assert [finding.to_dict() for finding in xml_uploader.iter_zap_xml_findings(str(xml_report))] == plain_xml
+    assert [finding.to_dict() for finding in uploader.iter_zap_dast_findings(str(json_report))] == plain_json
+    assert len(plain_xml) == len(plain_json) == 4
+
+
+@pytest.mark.parametrize('compression', sorted(COMPRESSORS))
+def test_compressed_scanner_report_is_posted_decompressed(compression, uploader, dojo, tmp_path):
+    report = tmp_path / 'semgrep.json'
+    report.write_text(CONTENT, encoding='utf-8')
+    report = compress_file(report, compression)
+
+    assert uploader.upload_report(str(report), 3)
+
+    [(_, _, headers, body)] = dojo.posts('/api/v2/import-scan/')
+    assert 'Content-Encoding' not in headers
+    assert b'filename="semgrep.json"' in body
+    assert CONTENT.encode('utf-8') in body
@@ -0,0 +1,69 @@
+"""Atomic read-merge-write JSON entry store shared by the ID cache and the ledger"""
+
+import json
+import os
+import time
+
+import pytest
+
+from defectdojo_cache import DefectDojoIDCache
+from defectdojo_ledger import FingerprintLedger
+from defectdojo_store import JSONEntryStore
+
+
+def test_expired_and_malformed_entries_are_skipped(tmp_path):
+    path = tmp_path / 'store.json'
+    path.write_text(json.dumps({'live': {'expires': time.time() + 60}, 'old': {'expires': time.time() - 1},
+                                'bad': 5}))
+
+    assert list(JSONEntryStore(str(path)).load()) == ['live']
+
+
+def test_corrupt_or_missing_file_reads_as_empty(tmp_path):
+    path = tmp_path / 'store.json'
+    assert JSONEntryStore(str(path)).load() == {}
+
+    path.write_text('{"live": {"expi')
+    assert JSONEntryStore(str(path)).load() == {}
+
+    path.write_text('[1, 2]')
+    assert JSONEntryStore(str(path)).get('live') is None
+
+
+def test_update_merges_entries_written_by_another_job(tmp_path):
+    path = str(tmp_path / 'nested' / 'store.json')
+    ours, theirs = JSONEntryStore(path), JSONEntryStore(path)
+
+    ours.update(lambda entries: entries.update(a={'expires': time.time() + 60}))
+    theirs.update(lambda entries: entries.update(b={'expires': time.time() + 60}))
+    ours.update(lambda entries: entries.pop('a'))
+
+    assert list(JSONEntryStore(path).load()) == ['b']
+    assert os.listdir(os.path.dirname(path)) == ['store.json']
+
+
+def test_failed_write_leaves_the_file_and_no_temp_file(tmp_path, monkeypatch):
+    path = tmp_path / 'store.json'
+    store = JSONEntryStore(str(path))
+    store.update(lambda entries: entries.update(a={'expires': time.time() + 60}))
+
+    def fail(*args):
+        raise OSError('disk full')
+
+    monkeypatch.setattr(os, 'replace', fail)
+    with pytest.raises(OSError):
+        store.update(lambda entries: entries.update(b={'expires': time.time() + 60}))
+
+    assert list(store.load()) == ['a']
+    assert os.listdir(tmp_path) == ['store.json']
+
+
+def test_cache_and_ledger_share_one_file_format(tmp_path):
+    cache = DefectDojoIDCache(path=str(tmp_path / 'ids.json'), ttl=60)
+    ledger = FingerprintLedger(path=str(tmp_path / 'ledger.json'), ttl=60)
+
+    cache.set_product_id('https://dojo', 'app', 5)
+    ledger.set('report', {'aa'})
+
+    assert JSONEntryStore(cache.path).load()[cache._product_key('https://dojo', 'app')]['id'] == 5
+    assert JSONEntryStore(ledger.path).load()['report']['fingerprints'] == ['aa']
@@ -0,0 +1,221 @@
+"""Upload paths of upload-reports-enhanced.py against a stub DefectDojo"""
+
+import asyncio
+import json
+import time
+import zlib
+from datetime import datetime, timedelta
+from urllib.parse import parse_qs, urlsplit
+
+from conftest import write_zap_json, zap_alert
+from defectdojo_cache import DefectDojoIDCache
+from defectdojo_client import DefectDojoSession
+from defectdojo_findings import Finding
+from defectdojo_ledger import FingerprintLedger
+
+
+def make_findings(count):
+    return (Finding(title=f'Finding {i}', severity='Medium', description='x' * 100, url=f'https://app/{i}')
+            for i in range(count))
+
+
+def test_streamed_import_is_retried_after_503(uploader, dojo):
+    dojo.respond((503, {'detail': 'unavailable'}))
+
+    assert uploader.upload_findings(make_findings(50), 3, 'Generic Findings Import', 'report.json')
+
+    imports = dojo.posts('/api/v2/import-scan/')
+    assert len(imports) == 2
+    assert imports[0][3] == imports[1][3]
+    assert len(json.loads(imports[1][3])['import_findings']) == 50
+
+
+def test_zap_json_risk_codes_match_the_xml_uploader(uploader, tmp_path):
+    alerts = [zap_alert(code, riskcode=code) for code in range(4)]
+    report = write_zap_json(tmp_path / 'gl-dast-report.json', alerts)
+
+    findings = list(uploader.iter_zap_dast_findings(report))
+
+    # upload-filters.json sets no minimum_severity, so the riskcode 0 alert is kept as Info
+    assert [finding.severity for finding in findings] == ['Info', 'Low', 'Medium', 'High']
+
+
+def make_async_uploader(enhanced, dojo, tmp_path, session):
+    return enhanced.AsyncDefectDojoUploader(
+        dojo.url, 'token', 'Test Product', engagement_name='CI/CD Pipeline - test', session=session,
+        id_cache=DefectDojoIDCache(path=str(tmp_path / 'ids.json')),
+        ledger=FingerprintLedger(path=str(tmp_path / 'ledger.json')), parse_workers=1)
+
+
+async def upload_async(uploader, findings):
+    import aiohttp
+
+    async with aiohttp.ClientSession() as http_session:
+        uploader.http_session = http_session
+        return await uploader.upload_findings(findings, 3, 'Generic Findings Import', 'report.json')
+
+
+def test_async_import_body_is_compressed(enhanced, dojo, tmp_path):
+    session = DefectDojoSession(compression='gzip', compression_min_bytes=64)
+    uploader = make_async_uploader(enhanced, dojo, tmp_path, session)
+
+    assert asyncio.run(upload_async(uploader, make_findings(50)))
+
+    imports = dojo.posts('/api/v2/import-scan/')
+    assert len(imports) == 1
+    assert imports[0][2]['Content-Encoding'] == 'gzip'
+    assert len(json.loads(zlib.decompress(imports[0][3], 47))['import_findings']) == 50
+    assert session.compression_stats.bytes_saved > 0
+
+
+def test_async_import_refused_compressed_is_resent_plain(enhanced, dojo, tmp_path):
+    dojo.respond((415, {'detail': 'Unsupported media type'}))
+    session = DefectDojoSession(compression='gzip', compression_min_bytes=64)
+    uploader = make_async_uploader(enhanced, dojo, tmp_path, session)
+
+    assert asyncio.run(upload_async(uploader, make_findings(50)))
+
+    imports = dojo.posts('/api/v2/import-scan/')
+    assert [post[2].get('Content-Encoding') for post in imports] == ['gzip', None]
+    assert len(json.loads(imports[1][3])['import_findings']) == 50
+    assert session.negotiate_encoding(dojo.url) is None
+
+
+def test_async_findings_are_spooled_lazily_and_retried(enhanced, dojo, tmp_path, monkeypatch):
+    dojo.respond((503, {'detail': 'unavailable'}))
+    session = DefectDojoSession(compression='none', spool_memory_bytes=256)
+    uploader = make_async_uploader(enhanced, dojo, tmp_path, session)
+    spooling = []
+    spool_stream = session.spool_stream
+
+    def tracking_spool_stream(url, chunks):
+        spooling.append(url)
+        return spool_stream(url, chunks)
+
+    def findings():
+        for finding in make_findings(50):
+            # Pulled only while the body is spooled, never collected up front
+            assert spooling
+            yield finding
+
+    monkeypatch.setattr(session, 'spool_stream', tracking_spool_stream)
+
+    assert asyncio.run(upload_async(uploader, findings()))
+
+    imports = dojo.posts('/api/v2/import-scan/')
+    assert len(imports) == 2
+    assert imports[0][3] == imports[1][3]
+    assert len(json.loads(imports[1][3])['import_findings']) == 50
+
+
+def test_async_zap_report_is_not_materialised(enhanced, dojo, tmp_path, monkeypatch):
+    report = write_zap_json(tmp_path / 'gl-dast-report.json', [zap_alert(index) for index in range(5)])
+    uploader = make_async_uploader(enhanced, dojo, tmp_path, DefectDojoSession(compression='none'))
+
+    def extract_zap_dast_findings(*args, **kwargs):
+        raise AssertionError('the async path must not build the findings list')
+
+    monkeypatch.setattr(uploader, 'extract_zap_dast_findings', extract_zap_dast_findings)
+
+    async def process():
+        import aiohttp
+
+        async with aiohttp.ClientSession() as http_session:
+            uploader.http_session = http_session
+            return await uploader.process_zap_dast_report(str(report), 3)
+
+    assert asyncio.run(process())
+    assert len(json.loads(dojo.posts('/api/v2/import-scan/')[0][3])['import_findings']) == 5
+
+
+def engagement_pages(dojo):
+    """Two result pages: yesterday's engagement, then today's one, with a third page never needed"""
+    today = datetime.now()
+    return (
+        (200, {'count': 3, 'next': dojo.url + '/api/v2/engagements/?page=2', 'results': [
+            {'id': 76, 'target_start': (today - timedelta(days=1)).strftime('%Y-%m-%d')}]}),
+        (200, {'count': 3, 'next': dojo.url + '/api/v2/engagements/?page=3', 'results': [
+            {'id': 77, 'target_start': today.strftime('%Y-%m-%d')}]}),
+    )
+
+
+def engagement_lookups(dojo):
+    return [path for method, path, _, _ in dojo.requests if method == 'GET' and path.startswith('/api/v2/engagements/')]
+
+
+def test_engagement_lookup_follows_next_links_until_found(enhanced, uploader, dojo):
+    dojo.respond(*engagement_pages(dojo))
+
+    assert uploader.create_engagement_if_not_exists(5) == 77
+
+    first, second = engagement_lookups(dojo)
+    query = parse_qs(urlsplit(first).query)
+    assert query['product'] == ['5']
+    assert query['target_start'] == [datetime.now().strftime('%Y-%m-%d')]
+    assert query['limit'] == [str(enhanced.ENGAGEMENT_LOOKUP_LIMIT)]
+    assert second == '/api/v2/engagements/?page=2'
+    assert dojo.posts() == []
+
+
+def test_async_engagement_lookup_follows_next_links_until_found(enhanced, dojo, tmp_path):
+    import aiohttp
+
+    dojo.respond(*engagement_pages(dojo))
+    uploader = make_async_uploader(enhanced, dojo, tmp_path, DefectDojoSession(compression='none'))
+
+    async def lookup():
+        async with aiohttp.ClientSession() as http_session:
+            uploader.http_session = http_session
+            return await uploader.create_engagement_if_not_exists(5)
+
+    assert asyncio.run(lookup()) == 77
+    assert engagement_lookups(dojo)[1:] == ['/api/v2/engagements/?page=2']
+    assert dojo.posts() == []
+
+
+def test_concurrent_uploads_keep_input_order_and_isolate_a_failure(uploader, dojo, tmp_path, monkeypatch, capsys):
+    reports = []
+    for index in range(5):
+        report = tmp_path / f'report-{index}.json'
+        report.write_text(json.dumps({'findings': [], 'index': index}))
+        reports.append(str(report))
+    upload_report = uploader.upload_report
+
+    def slow_upload_report(file_path, engagement_id):
+        index = reports.index(file_path)
+        # Later reports finish first, so results arrive out of input order
+        time.sleep(0.05 * (len(reports) - index))
+        if index == 2:
+            raise RuntimeError('connection reset')
+        return upload_report(file_path, engagement_id)
+
+    monkeypatch.setattr(uploader, 'upload_report', slow_upload_report)
+
+    outcomes = uploader.upload_reports(reports, 3, workers=4)
+
+    assert outcomes == [(True, False), (True, False), (False, False), (True, False), (True, False)]
+    assert len(dojo.posts('/api/v2/import-scan/')) == 4
+
+    assert uploader.upload_all_reports(reports, max_parallel=4)
+    summary = capsys.readouterr().out.split('📊 Upload Summary:')[-1].splitlines()[1:6]
+    assert summary == [f"   {'❌' if index == 2 else '✅'} report-{index}.json" for index in range(5)]
+
+
+def test_async_summary_reports_connection_and_compression_stats(enhanced, dojo, tmp_path, capsys):
+    session = DefectDojoSession(compression='gzip', compression_min_bytes=64)
+    uploader = make_async_uploader(enhanced, dojo, tmp_path, session)
+    reports = []
+    for index in range(3):
+        report = tmp_path / f'report-{index}.json'
+        report.write_text(json.dumps({'findings': [], 'pad': 'x' * 1000}))
+        reports.append(str(report))
+
+    assert asyncio.run(uploader.upload_all_reports(reports, max_parallel=2))
+
+    output = capsys.readouterr().out
+    stats = uploader.connection_stats
+    assert stats.requests == len(dojo.requests) == 7
+    assert 1 <= stats.new_connections <= 2
+    assert (f"🔌 HTTP connections: {stats.new_connections} opened, {stats.reused_connections} reused "
+            f"across 7 requests") in output
+    assert "🗜️  Request bodies: " in output and "3 compressed" in output
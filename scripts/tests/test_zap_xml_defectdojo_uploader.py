@@ -0,0 +1,148 @@
+"""Upload paths of zap-xml-defectdojo-uploader.py against a stub DefectDojo"""
+
+import io
+import json
+
+from conftest import write_zap_xml, zap_alert
+from defectdojo_filters import FindingFilter
+from defectdojo_findings import Finding
+
+
+def make_findings(count):
+    return (Finding(title=f'Alert {i}', severity='Low', description='x' * 100, url=f'https://app/{i}')
+            for i in range(count))
+
+
+def test_streamed_import_is_retried_after_503(xml_uploader, dojo, tmp_path):
+    report = tmp_path / 'zap-report.xml'
+    report.write_text('<OWASPZAPReport/>')
+    dojo.respond((503, {'detail': 'unavailable'}))
+
+    assert xml_uploader.upload_zap_xml_findings(make_findings(40), 3, str(report))
+
+    imports = dojo.posts('/api/v2/import-scan/')
+    assert len(imports) == 2
+    assert imports[0][3] == imports[1][3]
+    assert len(json.loads(imports[1][3])['import_findings']) == 40
+
+
+def test_risk_and_confidence_codes_match_zap(xml_uploader, tmp_path):
+    alerts = [zap_alert(code, riskcode=code, confidence=code + 1) for code in range(4)]
+    report = write_zap_xml(tmp_path / 'zap.xml', alerts)
+    xml_uploader.finding_filter = None
+
+    findings = xml_uploader.parse_zap_xml_report(report)
+
+    assert [finding.severity for finding in findings] == ['Info', 'Low', 'Medium', 'High']
+    assert [finding.confidence for finding in findings] == ['Low', 'Medium', 'High', 'Confirmed']
+
+
+def test_low_alerts_pass_a_low_minimum_severity(xml_uploader, tmp_path):
+    alerts = [zap_alert(code, riskcode=code) for code in range(4)]
+    report = write_zap_xml(tmp_path / 'zap.xml', alerts)
+    xml_uploader.finding_filter = FindingFilter(minimum_severity='Low')
+
+    findings = xml_uploader.parse_zap_xml_report(report)
+
+    assert [finding.severity for finding in findings] == ['Low', 'Medium', 'High']
+    assert xml_uploader.finding_filter.dropped['severity'] == 1
+
+
+def test_default_filter_rules_keep_info_alerts(xml_uploader, tmp_path):
+    alerts = [zap_alert(code, riskcode=code) for code in range(4)]
+    report = write_zap_xml(tmp_path / 'zap.xml', alerts)
+
+    findings = xml_uploader.parse_zap_xml_report(report)
+
+    assert [finding.severity for finding in findings] == ['Info', 'Low', 'Medium', 'High']
+
+
+def test_report_slices_cut_inside_an_alertitem_parse_like_the_whole_report(zap_xml, xml_uploader, tmp_path):
+    report = write_zap_xml(tmp_path / 'zap.xml', [zap_alert(index, riskcode=1 + index % 3) for index in range(9)])
+    data = open(report, 'rb').read()
+    first = data.index(b'<alertitem>')
+    item_bytes = data.index(b'<alertitem>', first + 1) - first
+
+    # Jumping just past one item lands inside the second; the cut moves on to the third
+    site_names, slices = zap_xml.scan_report_slices(report, slice_bytes=item_bytes + 10)
+
+    assert site_names == ['https://app.example.com']
+    assert len(slices) == 5
+    assert all(data[start:start + 11] == b'<alertitem>' for _, start, _, _ in slices)
+    serial = [finding.to_dict() for finding in xml_uploader.iter_zap_xml_findings(report)]
+    sliced = [finding.to_dict() for head, start, end, tail in slices
+              for finding in xml_uploader.iter_zap_xml_findings(io.BytesIO(head + data[start:end] + tail))]
+    assert len(serial) == 9
+    assert sliced == serial
+
+
+def test_split_parse_yields_the_serial_findings_in_order(zap_xml, xml_uploader, tmp_path, monkeypatch):
+    alerts = [zap_alert(index, riskcode=1 + index % 3, urls=[f'https://app.example.com/{index}/{n}' for n in range(2)])
+              for index in range(12)]
+    report = write_zap_xml(tmp_path / 'zap.xml', alerts)
+    monkeypatch.setattr(zap_xml, 'SPLIT_SLICE_BYTES', 200)
+    xml_uploader.per_instance = True
+
+    serial = [finding.to_dict() for finding in xml_uploader.iter_zap_xml_findings(report)]
+    split = [finding.to_dict() for finding in xml_uploader.iter_zap_xml_findings_split(report, workers=2)]
+
+    assert len(serial) == 24
+    assert split == serial
+
+
+def test_chunked_upload_appends_later_chunks_to_the_imported_test(xml_uploader, dojo, tmp_path):
+    report = tmp_path / 'zap-report.xml'
+    report.write_text('<OWASPZAPReport/>')
+    dojo.respond((201, {'id': 9, 'test': 42}))
+
+    assert xml_uploader.upload_zap_xml_findings_chunked(make_findings(10), 3, str(report), max_findings=4)
+
+    posts = dojo.posts()
+    assert [path for _, path, _, _ in posts] == ['/api/v2/import-scan/'] + ['/api/v2/reimport-scan/'] * 2
+    bodies = [json.loads(body) for _, _, _, body in posts]
+    assert 'test' not in bodies[0]
+    assert [(body['test'], body['close_old_findings']) for body in bodies[1:]] == [(42, False), (42, False)]
+    assert [len(body['import_findings']) for body in bodies] == [4, 4, 2]
+    assert [finding['title'] for body in bodies for finding in body['import_findings']] == [
+        f'Alert {i}' for i in range(10)]
+
+
+def test_chunked_upload_keeps_every_body_within_the_byte_limit(xml_uploader, dojo, tmp_path):
+    report = tmp_path / 'zap-report.xml'
+    report.write_text('<OWASPZAPReport/>')
+
+    assert xml_uploader.upload_zap_xml_findings_chunked(make_findings(30), 3, str(report), max_bytes=4096)
+
+    posts = dojo.posts()
+    assert len(posts) > 1
+    assert all(len(body) <= 4096 for _, _, _, body in posts)
+    assert sum(len(json.loads(body)['import_findings']) for _, _, _, body in posts) == 30
+
+
+def test_per_instance_mode_yields_one_finding_per_instance(xml_uploader, tmp_path):
+    alerts = [zap_alert(index, urls=[f'https://app.example.com/{index}/{n}' for n in range(3)]) for index in range(2)]
+    report = write_zap_xml(tmp_path / 'zap.xml', alerts)
+
+    grouped = xml_uploader.parse_zap_xml_report(report)
+    xml_uploader.per_instance = True
+    expanded = xml_uploader.parse_zap_xml_report(report)
+
+    assert [finding.url for finding in grouped] == ['https://app.example.com/0/0', 'https://app.example.com/1/0']
+    assert [finding.url for finding in expanded] == [f'https://app.example.com/{index}/{n}'
+                                                      for index in range(2) for n in range(3)]
+    assert [finding.title for finding in expanded] == ['Alert 0'] * 3 + ['Alert 1'] * 3
+    # Instances of one alert share its text rather than holding copies
+    assert expanded[0].description is expanded[1].description is expanded[2].description
+
+
+def test_per_instance_upload_sends_every_instance(xml_uploader, dojo, tmp_path):
+    alerts = [zap_alert(index, urls=[f'https://app.example.com/{index}/{n}' for n in range(4)]) for index in range(3)]
+    report = write_zap_xml(tmp_path / 'zap.xml', alerts)
+    xml_uploader.per_instance = True
+
+    assert xml_uploader.process_zap_xml_upload(report)
+
+    [(_, _, _, body)] = dojo.posts('/api/v2/import-scan/')
+    findings = json.loads(body)['import_findings']
+    assert len(findings) == 12
+    assert len({finding['url'] for finding in findings}) == 12
@@ -1,13 +1,205 @@
 #!/usr/bin/env python3
 
-import requests
+import argparse
+import asyncio
+import contextlib
+import contextvars
+import io
 import sys
-import json
 import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from itertools import chain, islice
+from urllib.parse import urlencode
+
+from defectdojo_adapters import ADAPTERS
+from defectdojo_cache import DefectDojoIDCache, is_stale_id_response
+from defectdojo_classification import get_classifier
+from defectdojo_client import (
+    IDEMPOTENT_METHODS,
+    UNPROCESSED_STATUSES,
+    ConnectionStats,
+    RetryPolicy,
+    configure_session,
+    encode_multipart,
+    get_session,
+    gzip_members,
+    parse_retry_after,
+    split_multipart,
+)
+from defectdojo_evidence import DEFAULT_EVIDENCE_MAX_BYTES, EvidenceStore
+from defectdojo_filters import FilterConfig, get_filter_config
+from defectdojo_findings import (
+    ZAP_CONFIDENCE_LEVELS,
+    ZAP_RISK_LEVELS,
+    Finding,
+    iter_generic_findings_file,
+    iter_import_body,
+)
+from defectdojo_fingerprints import DEFAULT_DEDUPLICATE, FindingDeduplicator
+from defectdojo_jsonstream import JSONStreamReader
+from defectdojo_ledger import DEFAULT_DELTA_UPLOAD, FingerprintLedger
+from defectdojo_processes import new_process_pool
+from defectdojo_reports import detect_compression, iter_report_chunks, open_report, report_name
+
+try:
+    import aiohttp
+except ImportError:  # Optional: only required for --async uploads
+    aiohttp = None
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; per-site peak RSS is then omitted
+    resource = None
+
+# Set when DefectDojo rejects a request of the current upload because a cached
+# ID is gone; a ContextVar so each upload thread and async task sees its own
+_stale_id_seen = contextvars.ContextVar('stale_id_seen', default=False)
+
+# Page size requested from the engagements API; the date filter normally
+# narrows the result to a single engagement, so one small page is enough
+ENGAGEMENT_LOOKUP_LIMIT = 10
+
+# Processes converting the sites of a multi-site ZAP JSON report (default: one per CPU)
+DEFAULT_PARSE_WORKERS = int(os.getenv('DEFECTDOJO_PARSE_WORKERS', '0')) or os.cpu_count() or 1
+
+# Convert Gitleaks/Semgrep/Trivy/SARIF/Dependency-Track reports to findings here
+# and import them as a Generic Findings Import file, instead of posting the
+# scanner report for DefectDojo's own parser (opt-in: changes the test type)
+DEFAULT_NATIVE_ADAPTERS = os.getenv('DEFECTDOJO_NATIVE_ADAPTERS', '0') == '1'
+
+
+class ZAPDASTFinding(Finding):
+    """Finding converted from a ZAP DAST JSON report"""
+
+    __slots__ = ()
+    mitigated = False
+    tags = ('DAST', 'OWASP ZAP', 'Web Application')
+
+
+def iter_zap_json_sites(reader):
+    """Yield once per site object of a ZAP JSON report, with the reader on the site
+
+    The caller must consume the site, with iter_zap_json_site_alerts() or
+    reader.skip(), before asking for the next one.
+    """
+    for key in reader.iter_object():
+        if key != 'site':
+            reader.skip()
+            continue
+        # Older reports write a single site as an object rather than a list
+        sites = reader.iter_array() if reader.peek() == b'[' else iter([None])
+        for _ in sites:
+            yield
+
+
+def iter_zap_json_site_alerts(reader, rewindable=False):
+    """Yield (site name, alert fields, instances) for the site object at the reader
+
+    The site is walked incrementally, never loaded whole. ``alert fields``
+    holds every key of the alert except 'instances'; ``instances`` is a
+    ZAPAlertInstances, only valid until the next item is requested. ZAP
+    writes 'instances' before 'solution', 'reference' and 'cweid', so the
+    array is passed over first and read back once the alert is complete: on
+    a rewindable (plain file) stream only its offset is kept, otherwise its
+    raw bytes are held for that one alert.
+    """
+    site_name = ''
+    for site_key in reader.iter_object():
+        if site_key == '@name':
+            site_name = reader.read()
+        elif site_key == 'alerts':
+            for _ in reader.iter_array():
+                alert, instances = _read_zap_alert(reader, rewindable)
+                resume_at = reader.tell()
+                yield site_name, alert, instances
+                # Alerts dropped by a filter never had their instances read back
+                if instances.moved:
+                    reader.seek(resume_at)
+        else:
+            reader.skip()
+
+
+def scan_zap_json_sites(file_path):
+    """(offset, length) of every site object in an uncompressed ZAP JSON report"""
+    sites = []
+    with open(file_path, 'rb') as stream:
+        reader = JSONStreamReader(stream)
+        for _ in iter_zap_json_sites(reader):
+            start = reader.tell()
+            reader.skip()
+            sites.append((start, reader.tell() - start))
+    return sites
+
+
+def _read_zap_alert(reader, rewindable):
+    """Alert fields plus its instances, by offset (rewindable) or raw bytes"""
+    alert = {}
+    instances = ZAPAlertInstances()
+    for key in reader.iter_object():
+        if key != 'instances':
+            alert[key] = reader.read()
+        elif rewindable:
+            offset = reader.tell()
+            reader.skip()
+            instances = ZAPAlertInstances(reader, offset, nbytes=reader.tell() - offset)
+        else:
+            raw = reader.read_raw()
+            instances = ZAPAlertInstances(raw=raw, nbytes=len(raw))
+    return alert, instances
+
+
+def zap_instance_count(alert, instances):
+    """Instances of an alert from its 'count' field, else by walking the array"""
+    count = str(alert.get('count', ''))
+    return int(count) if count.isdigit() else instances.count()
+
+
+class ZAPAlertInstances:
+    """The 'instances' array of one ZAP JSON alert, read back on demand
+
+    Iterating yields (instance fields, size in bytes); count() walks the
+    array without decoding any instance. ``nbytes`` is the size of the whole
+    array and ``moved`` tells whether the shared reader was repositioned.
+    """
+
+    def __init__(self, reader=None, offset=None, raw=b'[]', nbytes=0):
+        self.reader = reader
+        self.offset = offset
+        self.raw = raw
+        self.nbytes = nbytes
+        self.moved = False
+
+    def _open(self):
+        if self.offset is None:
+            return JSONStreamReader(io.BytesIO(self.raw))
+        self.moved = True
+        self.reader.seek(self.offset)
+        return self.reader
+
+    def __iter__(self):
+        reader = self._open()
+        for _ in reader.iter_array():
+            start = reader.tell()
+            instance = reader.read()
+            yield instance, reader.tell() - start
+
+    def count(self):
+        reader = self._open()
+        count = 0
+        for _ in reader.iter_array():
+            reader.skip()
+            count += 1
+        return count
+
 
 class DefectDojoUploader:
-    def __init__(self, base_url, api_key, product_name, engagement_name=None):
+    def __init__(self, base_url, api_key, product_name, engagement_name=None, session=None, id_cache=None,
+                 parse_workers=DEFAULT_PARSE_WORKERS, evidence_max_bytes=DEFAULT_EVIDENCE_MAX_BYTES,
+                 native_adapters=DEFAULT_NATIVE_ADAPTERS, filter_config=None, deduplicate=DEFAULT_DEDUPLICATE,
+                 delta_upload=DEFAULT_DELTA_UPLOAD, ledger=None):
         self.base_url = base_url.rstrip('/')
         self.api_key = api_key
         self.product_name = product_name
@@ -16,56 +208,143 @@ class DefectDojoUploader:
             'Authorization': f'Token {api_key}',
             'Content-Type': 'application/json'
         }
+        # Shared keep-alive connection pool for all DefectDojo API calls
+        self.session = session or get_session()
+        # Persistent product/engagement ID cache shared across pipeline runs
+        self.id_cache = id_cache or DefectDojoIDCache()
+        self.parse_workers = parse_workers
+        # Request/response bodies longer than this are truncated and attached once per digest
+        self.evidence_max_bytes = evidence_max_bytes
+        self.native_adapters = native_adapters
+        # Per-scanner severity/confidence/CWE/URL rules applied before findings are built
+        self.filter_config = filter_config or get_filter_config()
+        # Drop repeats of a finding fingerprint within a report before encoding
+        self.deduplicate = deduplicate
+        # (report label, FindingDeduplicator) of every converted upload, for the summary
+        self.deduplicators = []
+        # Send only findings whose fingerprint the last successful upload of the report lacked
+        self.delta_upload = delta_upload
+        self.ledger = ledger or FingerprintLedger()
+        # Per-site conversion statistics of ZAP JSON reports, for the upload summary
+        self.zap_site_stats = []
+
+    def cached_product_id(self):
+        product_id = self.id_cache.get_product_id(self.base_url, self.product_name)
+        if product_id:
+            print(f"⚡ Using cached product: {self.product_name} (ID: {product_id})")
+        return product_id
+
+    def cached_engagement_id(self):
+        engagement_date = datetime.now().strftime('%Y-%m-%d')
+        engagement_id = self.id_cache.get_engagement_id(
+            self.base_url, self.product_name, self.engagement_name, engagement_date)
+        if engagement_id:
+            print(f"⚡ Using cached engagement: {self.engagement_name} (ID: {engagement_id})")
+        return engagement_id
+
+    def remember_product_id(self, product_id):
+        self.id_cache.set_product_id(self.base_url, self.product_name, product_id)
+
+    def remember_engagement_id(self, engagement_id):
+        engagement_date = datetime.now().strftime('%Y-%m-%d')
+        self.id_cache.set_engagement_id(
+            self.base_url, self.product_name, self.engagement_name, engagement_date, engagement_id)
+
+    def invalidate_if_stale(self, status_code, response_text):
+        """Forget cached IDs when DefectDojo reports a referenced ID is gone"""
+        if is_stale_id_response(status_code, response_text):
+            self.id_cache.invalidate_product(self.base_url, self.product_name)
+            _stale_id_seen.set(True)
+            return True
+        return False
+
+    def product_search_url(self):
+        return f"{self.base_url}/api/v2/products/?name={self.product_name}"
+
+    def product_data(self):
+        return {
+            "name": self.product_name,
+            "description": f"Auto-created product for {self.product_name}",
+            "prod_type": 1,  # Web Application
+            "tags": ["ci-cd", "automated", os.getenv('CI_PROJECT_NAME', 'unknown')]
+        }
 
     def create_product_if_not_exists(self):
         """Create product if it doesn't exist and return product ID"""
+        product_id = self.cached_product_id()
+        if product_id:
+            return product_id
+
         # Check if product exists
-        search_url = f"{self.base_url}/api/v2/products/?name={self.product_name}"
-        response = requests.get(search_url, headers=self.headers)
+        response = self.session.get(self.product_search_url(), headers=self.headers)
 
         if response.status_code == 200:
             products = response.json().get('results', [])
             if products:
                 product_id = products[0]['id']
                 print(f"✅ Found existing product: {self.product_name} (ID: {product_id})")
+                self.remember_product_id(product_id)
                 return product_id
 
-        # Create new product
-        product_data = {
-            "name": self.product_name,
-            "description": f"Auto-created product for {self.product_name}",
-            "prod_type": 1,  # Web Application
-            "tags": ["ci-cd", "automated", os.getenv('CI_PROJECT_NAME', 'unknown')]
-        }
+        def recover_created_product():
+            # Before re-POSTing, check whether a timed-out attempt already created it
+            response = self.session.get(self.product_search_url(), headers=self.headers)
+            if response.status_code == 200 and response.json().get('results'):
+                return response
+            return None
 
+        # Create new product
         create_url = f"{self.base_url}/api/v2/products/"
-        response = requests.post(create_url, headers=self.headers, json=product_data)
+        response = self.session.post(create_url, headers=self.headers, json=self.product_data(),
+                                     before_retry=recover_created_product)
 
-        if response.status_code == 201:
+        if response.status_code == 200:
+            product_id = response.json()['results'][0]['id']
+            print(f"✅ Found product created by an earlier attempt: {self.product_name} (ID: {product_id})")
+            self.remember_product_id(product_id)
+            return product_id
+        elif response.status_code == 201:
             product_id = response.json()['id']
             print(f"✅ Created new product: {self.product_name} (ID: {product_id})")
+            self.remember_product_id(product_id)
             return product_id
         else:
             print(f"❌ Failed to create product: {response.text}")
             return None
 
-    def create_engagement_if_not_exists(self, product_id):
-        """Create engagement if it doesn't exist and return engagement ID"""
-        # Check if engagement exists for this pipeline run
+    def engagement_search_url(self, product_id):
+        """Engagement search with the date filter and page size pushed to the API"""
+        query = urlencode({
+            'name': self.engagement_name,
+            'product': product_id,
+            'target_start': datetime.now().strftime('%Y-%m-%d'),
+            'limit': ENGAGEMENT_LOOKUP_LIMIT
+        })
+        return f"{self.base_url}/api/v2/engagements/?{query}"
+
+    def iter_engagement_pages(self, url):
+        """Yield engagement result pages, requesting the next page only on demand"""
+        while url:
+            response = self.session.get(url, headers=self.headers)
+            if response.status_code != 200:
+                return
+            body = response.json()
+            yield body.get('results', [])
+            url = body.get('next')
+
+    def todays_engagements(self, engagements):
         engagement_date = datetime.now().strftime('%Y-%m-%d')
-        search_url = f"{self.base_url}/api/v2/engagements/?name={self.engagement_name}&product={product_id}"
-        response = requests.get(search_url, headers=self.headers)
+        return [eng for eng in engagements if eng['target_start'].startswith(engagement_date)]
 
-        if response.status_code == 200:
-            engagements = response.json().get('results', [])
-            # Check for engagement with today's date
-            for eng in engagements:
-                if eng['target_start'].startswith(engagement_date):
-                    print(f"✅ Found existing engagement: {self.engagement_name} (ID: {eng['id']})")
-                    return eng['id']
+    def find_todays_engagement(self, engagements):
+        """Return the ID of the engagement started today, if any"""
+        for eng in self.todays_engagements(engagements):
+            print(f"✅ Found existing engagement: {self.engagement_name} (ID: {eng['id']})")
+            return eng['id']
+        return None
 
-        # Create new engagement
-        engagement_data = {
+    def engagement_data(self, product_id):
+        return {
             "name": self.engagement_name,
             "description": f"Auto-created engagement for CI/CD pipeline run",
             "product": product_id,
@@ -76,15 +355,44 @@ class DefectDojoUploader:
             "tags": ["automated", "ci-cd", os.getenv('CI_PIPELINE_ID', 'unknown')]
         }
 
+    def create_engagement_if_not_exists(self, product_id):
+        """Create engagement if it doesn't exist and return engagement ID"""
+        engagement_id = self.cached_engagement_id()
+        if engagement_id:
+            return engagement_id
+
+        # Check if engagement exists for this pipeline run; the date check is
+        # repeated client-side in case the server ignores the filter
+        for engagements in self.iter_engagement_pages(self.engagement_search_url(product_id)):
+            engagement_id = self.find_todays_engagement(engagements)
+            if engagement_id:
+                self.remember_engagement_id(engagement_id)
+                return engagement_id
+
+        def recover_created_engagement():
+            # Before re-POSTing, check whether a timed-out attempt already created it
+            response = self.session.get(self.engagement_search_url(product_id), headers=self.headers)
+            if response.status_code == 200 and self.todays_engagements(response.json().get('results', [])):
+                return response
+            return None
+
+        # Create new engagement
         create_url = f"{self.base_url}/api/v2/engagements/"
-        response = requests.post(create_url, headers=self.headers, json=engagement_data)
+        response = self.session.post(create_url, headers=self.headers, json=self.engagement_data(product_id),
+                                     before_retry=recover_created_engagement)
 
-        if response.status_code == 201:
+        if response.status_code == 200:
+            engagement_id = self.find_todays_engagement(response.json()['results'])
+            self.remember_engagement_id(engagement_id)
+            return engagement_id
+        elif response.status_code == 201:
             engagement_id = response.json()['id']
             print(f"✅ Created new engagement: {self.engagement_name} (ID: {engagement_id})")
+            self.remember_engagement_id(engagement_id)
             return engagement_id
         else:
             print(f"❌ Failed to create engagement: {response.text}")
+            self.invalidate_if_stale(response.status_code, response.text)
             return None
 
     def get_scan_type(self, file_name):
@@ -103,79 +411,257 @@ class DefectDojoUploader:
             'njsscan.sarif': 'SARIF',
             'security_summary.json': 'Security Summary Report'
         }
-        return scan_types.get(file_name, 'Generic Findings Import')
+        if file_name in scan_types:
+            return scan_types[file_name]
+        # Any scanner may write SARIF (gitleaks.sarif, semgrep.sarif, ...)
+        if file_name.lower().endswith('.sarif'):
+            return 'SARIF'
+        return 'Generic Findings Import'
+
+    def iter_zap_dast_findings(self, file_path, workers=None, evidence=None):
+        """Stream DefectDojo findings out of a ZAP DAST JSON report
+
+        Every site and every alert instance becomes a finding. With several
+        workers, the sites of an uncompressed report are converted
+        concurrently in worker processes; findings are still yielded in
+        report order, and at most two sites per worker are held at a time.
+        Long request/response bodies go through ``evidence`` when given.
+        Alerts and instances rejected by the scan type's source filter are
+        dropped before they become findings.
+        """
+        workers = self.parse_workers if workers is None else workers
+        compression = detect_compression(file_path)
+        classifier = get_classifier()
+        finding_filter = self.finding_filter('OWASP ZAP DAST Scan')
+
+        print(f"🕷️ Processing ZAP DAST report: {os.path.basename(file_path)}")
+
+        sites = scan_zap_json_sites(file_path) if workers > 1 and compression is None else []
+        extracted = 0
+        if len(sites) > 1:
+            workers = min(workers, len(sites))
+            print(f"⚙️  Converting {len(sites)} sites with {workers} worker process(es)")
+            tasks = iter([(file_path, offset, length) for offset, length in sites])
+            evidence_args = (evidence.directory, evidence.max_chars) if evidence is not None else (None, 0)
+            # Spawned, not forked: this may run inside a --max-parallel upload thread
+            with new_process_pool(workers, _init_site_worker, evidence_args + (finding_filter,)) as pool:
+                pending = deque(pool.submit(_convert_zap_site, task) for task in islice(tasks, workers * 2))
+                while pending:
+                    findings, site_stats = pending.popleft().result()
+                    task = next(tasks, None)
+                    if task is not None:
+                        pending.append(pool.submit(_convert_zap_site, task))
+                    truncated, removed_chars = site_stats.pop('evidence')
+                    if evidence is not None:
+                        evidence.add_counts(truncated, removed_chars)
+                    filtered = site_stats.pop('filtered')
+                    if finding_filter is not None:
+                        finding_filter.add_counts(filtered)
+                    self.zap_site_stats.append(site_stats)
+                    extracted += len(findings)
+                    yield from findings
+        else:
+            # Transform ZAP format to DefectDojo findings format, one alert at a time
+            with open_report(file_path, compression=compression) as stream:
+                reader = JSONStreamReader(stream)
+                for _ in iter_zap_json_sites(reader):
+                    site_stats = new_site_stats(reader.tell())
+                    for finding in self.iter_zap_site_findings(reader, compression is None, site_stats, evidence,
+                                                               finding_filter):
+                        extracted += 1
+                        yield finding
+                    finish_site_stats(site_stats, reader.tell())
+                    self.zap_site_stats.append(site_stats)
+
+        print(f"📊 Extracted {extracted} findings from ZAP DAST report")
+        # Classification ran in the worker processes when sites were converted there
+        if extracted and classifier.version is not None:
+            print(f"🏷️  {classifier.format_stats()}")
+
+    def iter_zap_site_findings(self, reader, rewindable, site_stats, evidence=None, finding_filter=None):
+        """One finding per alert instance of the site object at the reader
+
+        With ``finding_filter``, an alert it rejects is passed over without
+        its instances being read back, and a rejected instance is skipped
+        before any finding is built for it.
+        """
+        classifier = get_classifier()
+        externalise = evidence.externalise if evidence is not None else (lambda body: body)
+        for site_name, alert, instances in iter_zap_json_site_alerts(reader, rewindable):
+            site_stats['site'] = site_name
+            site_stats['alerts'] += 1
+            # Current ZAP JSON carries riskcode only; 'risk' is kept for older reports
+            risk = alert.get('risk') or ZAP_RISK_LEVELS.get(alert.get('riskcode'), 'Low')
+            severity = self.map_zap_risk_to_severity(risk)
+            cwe = int(alert.get('cweid', 0)) if alert.get('cweid') else None
+            if finding_filter is not None:
+                reason = finding_filter.reason(severity, ZAP_CONFIDENCE_LEVELS.get(alert.get('confidence')), cwe)
+                if reason is not None:
+                    finding_filter.drop(reason, zap_instance_count(alert, instances), instances.nbytes)
+                    continue
+
+            template = None
+            for instance, nbytes in instances:
+                url = instance.get('uri') or site_name
+                param = instance.get('param', '')
+                if finding_filter is not None:
+                    reason = finding_filter.location_reason(url, param)
+                    if reason is not None:
+                        finding_filter.drop(reason, 1, nbytes)
+                        continue
+                if template is None:
+                    # Alert-level values are shared by reference between its instances
+                    template = ZAPDASTFinding(
+                        title=alert.get('name', 'Unknown ZAP Finding'),
+                        description=alert.get('desc', ''),
+                        severity=severity,
+                        cwe=cwe,
+                        references=alert.get('reference', ''),
+                        solution=alert.get('solution', ''),
+                        impact=risk,
+                        confidence='High',  # ZAP baseline scans are generally high confidence
+
+                        # OWASP ZAP specific metadata
+                        scanner_confidence='High',
+                        owasp_top_10=classifier.classify(alert.get('pluginid'), cwe, alert.get('name', '')),
+                    )
+                site_stats['findings'] += 1
+
+                # URL and instance information
+                yield template.replace(
+                    url=url,
+                    param=param,
+                    attack=instance.get('attack', ''),
+                    evidence=instance.get('evidence', ''),
+                    request=externalise(instance.get('request', '')),
+                    response=externalise(instance.get('response', '')),
+                )
+
+    def finding_filter(self, scan_type):
+        """Source filter for a scan type, or None when no rule applies"""
+        return self.filter_config.for_scan_type(scan_type)
+
+    def print_filter_stats(self):
+        """Findings and report bytes each scan type's source filter dropped"""
+        for scan_type, finding_filter in self.filter_config.filters():
+            if finding_filter.total_dropped:
+                print(f"   🧹 {scan_type}: {finding_filter.format_stats()}")
+
+    def ledger_key(self, scan_type, report):
+        return self.ledger.key(self.base_url, self.product_name, self.engagement_name, scan_type, report)
+
+    def new_deduplicator(self, scan_type, label, report):
+        """Fingerprint index for one upload, seeded from the ledger in delta mode; None when off"""
+        if not (self.deduplicate or self.delta_upload):
+            return None
+        known = self.ledger.get(self.ledger_key(scan_type, report)) if self.delta_upload else None
+        deduplicator = FindingDeduplicator(scan_type, known)
+        self.deduplicators.append((label, deduplicator))
+        return deduplicator
+
+    def engagement_notes_url(self, engagement_id):
+        return f"{self.base_url}/api/v2/engagements/{engagement_id}/notes/"
+
+    def disappeared_note_data(self, scan_type, report, fingerprints):
+        """Engagement note listing the fingerprints a delta upload no longer found"""
+        entry = (f"Delta upload of {report} ({scan_type}, pipeline {os.getenv('CI_PIPELINE_ID', 'unknown')}): "
+                 f"{len(fingerprints)} finding(s) uploaded previously are no longer reported. Fingerprints:\n"
+                 + '\n'.join(fingerprints))
+        return {'entry': entry, 'private': False}
+
+    def record_delta(self, engagement_id, scan_type, report, deduplicator):
+        """After a successful delta upload: note disappeared fingerprints, then update the ledger"""
+        if not self.delta_upload:
+            return True
+        disappeared = deduplicator.disappeared()
+        if disappeared:
+            response = self.session.post(self.engagement_notes_url(engagement_id), headers=self.headers,
+                                         json=self.disappeared_note_data(scan_type, report, disappeared))
+            if response.status_code != 201:
+                print(f"❌ Failed to record disappeared findings of {report}: "
+                      f"{response.status_code} - {response.text}")
+                return False
+            print(f"🔕 {len(disappeared)} finding(s) of {report} no longer reported; listed in an engagement note")
+        self.ledger.set(self.ledger_key(scan_type, report), deduplicator.fingerprints())
+        return True
+
+    def record_empty_report(self, engagement_id, scan_type, report):
+        """A report without findings: in delta mode every previously uploaded finding disappeared"""
+        if not self.delta_upload:
+            return True
+        return self.record_delta(engagement_id, scan_type, report, self.new_deduplicator(scan_type, report, report))
+
+    def print_dedup_stats(self):
+        """Duplicate findings merged, and unchanged ones skipped in delta mode, per uploaded report"""
+        for label, deduplicator in self.deduplicators:
+            if deduplicator.duplicates or deduplicator.delta:
+                print(f"   🧬 {label}: {deduplicator.format_stats()}")
+
+    def print_site_stats(self):
+        """Per-site conversion time and memory of the ZAP JSON reports processed"""
+        if not self.zap_site_stats:
+            return
+        print(f"   🌐 ZAP sites converted: {len(self.zap_site_stats)}")
+        for site_stats in self.zap_site_stats:
+            peak_rss = site_stats['peak_rss_mib']
+            print(f"      {site_stats['site'] or '(site without alerts)'}: {site_stats['alerts']} alerts, "
+                  f"{site_stats['findings']} findings, {site_stats['bytes'] / 1024 / 1024:.1f} MiB, "
+                  f"{site_stats['seconds']:.2f} s"
+                  + (f", peak RSS {peak_rss:.0f} MiB" if peak_rss is not None else ""))
+
+    def extract_zap_dast_findings(self, file_path, evidence=None):
+        """Convert a ZAP DAST JSON report into a list of DefectDojo findings"""
+        return list(self.iter_zap_dast_findings(file_path, evidence=evidence))
+
+    def new_evidence_store(self):
+        return EvidenceStore(self.evidence_max_bytes) if self.evidence_max_bytes > 0 else None
+
+    def iter_native_findings(self, file_path, adapter, compression=None, finding_filter=None):
+        """Stream findings out of a scanner report with its adapter (see defectdojo_adapters)"""
+        extracted = 0
+        with open_report(file_path, compression=compression) as stream:
+            for finding in adapter(stream, finding_filter):
+                extracted += 1
+                yield finding
+        print(f"📊 Extracted {extracted} findings from {os.path.basename(file_path)}")
+
+    def process_native_report(self, file_path, scan_type, adapter, compression, engagement_id):
+        """Convert a scanner report on our side and import its findings"""
+        try:
+            findings = self.iter_native_findings(file_path, adapter, compression, self.finding_filter(scan_type))
+            first_finding = next(findings, None)
+            if first_finding is None:
+                print(f"⚠️  No findings found in {os.path.basename(file_path)}")
+                return self.record_empty_report(engagement_id, scan_type, os.path.basename(file_path))
+            return self.upload_findings(chain([first_finding], findings), engagement_id, scan_type,
+                                        os.path.basename(file_path))
+
+        except Exception as e:
+            print(f"❌ Error processing {file_path}: {str(e)}")
+            return False
 
     def process_zap_dast_report(self, file_path, engagement_id):
         """Process ZAP DAST report and convert to DefectDojo format"""
+        evidence = self.new_evidence_store()
         try:
-            with open(file_path, 'r') as f:
-                zap_data = json.load(f)
-
-            print(f"🕷️ Processing ZAP DAST report: {os.path.basename(file_path)}")
-
-            # Transform ZAP format to DefectDojo findings format
-            findings = []
-            sites = zap_data.get('site', [])
-
-            if isinstance(sites, list) and len(sites) > 0:
-                site = sites[0]
-                alerts = site.get('alerts', [])
-
-                for alert in alerts:
-                    # Get instances of this finding
-                    instances = alert.get('instances', [])
-                    if instances:
-                        instance = instances[0]  # Use first instance
-
-                        finding = {
-                            'title': alert.get('name', 'Unknown ZAP Finding'),
-                            'description': alert.get('desc', ''),
-                            'severity': self.map_zap_risk_to_severity(alert.get('risk', 'Low')),
-                            'cwe': int(alert.get('cweid', 0)) if alert.get('cweid') else None,
-                            'references': alert.get('reference', ''),
-                            'solution': alert.get('solution', ''),
-                            'false_positive': False,
-                            'duplicate': False,
-                            'out_of_scope': False,
-                            'mitigated': None,
-                            'impact': alert.get('risk', 'Low'),
-                            'confidence': 'High',  # ZAP baseline scans are generally high confidence
-                            'finding_type': 'Vulnerability',
-                            'test_type': 'DAST',
-                            'static_finding': False,
-                            'dynamic_finding': True,
-                            'active': True,
-                            'verified': False,  # Let DefectDojo verify
-                            'mitigated': False,
-
-                            # URL and instance information
-                            'url': site.get('@name', ''),
-                            'param': instance.get('param', ''),
-                            'attack': instance.get('attack', ''),
-                            'evidence': instance.get('evidence', ''),
-                            'request': instance.get('request', ''),
-                            'response': instance.get('response', ''),
-
-                            # OWASP ZAP specific metadata
-                            'scanner_confidence': 'High',
-                            'owasp_top_10': self.get_owasp_mapping(alert.get('name', '')),
-                            'tags': ['DAST', 'OWASP ZAP', 'Web Application']
-                        }
-
-                        findings.append(finding)
-
-            print(f"📊 Extracted {len(findings)} findings from ZAP DAST report")
+            # Findings stream from the report straight into the request body
+            findings = self.iter_zap_dast_findings(file_path, evidence=evidence)
+            first_finding = next(findings, None)
 
             # Upload transformed findings as DefectDojo import scan
-            if findings:
-                return self.upload_zap_findings(findings, engagement_id, file_path)
+            if first_finding is not None:
+                return self.upload_zap_findings(chain([first_finding], findings), engagement_id, file_path,
+                                                evidence)
             else:
                 print("⚠️  No findings found in ZAP DAST report")
-                return True
+                return self.record_empty_report(engagement_id, 'OWASP ZAP DAST Scan', os.path.basename(file_path))
 
         except Exception as e:
             print(f"❌ Error processing ZAP DAST report {file_path}: {str(e)}")
             return False
+        finally:
+            if evidence is not None:
+                evidence.close()
 
     def map_zap_risk_to_severity(self, zap_risk):
         """Map ZAP risk levels to DefectDojo severity levels"""
@@ -188,97 +674,141 @@ class DefectDojoUploader:
         }
         return risk_mapping.get(zap_risk, 'Low')
 
-    def get_owasp_mapping(self, alert_name):
-        """Map ZAP alert names to OWASP Top 10 categories"""
-        owasp_mapping = {
-            'Cross Site Scripting': 'A03:2021-Injection',
-            'SQL Injection': 'A03:2021-Injection',
-            'X-Content-Type-Options header missing': 'A05:2021-Security Misconfiguration',
-            'Cookie without SameSite Attribute': 'A05:2021-Security Misconfiguration',
-            'CSP Scanner: Content Security Policy Not Implemented': 'A05:2021-Security Misconfiguration',
-            'X-Frame-Options header not set': 'A05:2021-Security Misconfiguration',
-            'Absence of Anti-CSRF Tokens': 'A01:2021-Broken Access Control',
-            'Cross Domain Script Inclusion': 'A05:2021-Security Misconfiguration',
-            'Content Type Missing': 'A05:2021-Security Misconfiguration',
-            'Cookie without Secure Flag': 'A05:2021-Security Misconfiguration'
+    def get_owasp_mapping(self, alert_name, plugin_id=None, cwe=None):
+        """Map a ZAP alert to its OWASP Top 10 category (see defectdojo_classification)"""
+        return get_classifier().classify(plugin_id, cwe, alert_name)
+
+    def build_import_data(self, scan_type, engagement_id):
+        """Common import-scan fields shared by every upload"""
+        return {
+            'active': True,
+            'verified': False,  # Let DefectDojo auto-verify
+            'scan_type': scan_type,
+            'minimum_severity': 'Low',
+            'engagement': engagement_id,
+            'lead': 1,  # Default lead
+            'environment': os.getenv('CI_ENVIRONMENT_NAME', 'Development'),
+            'version': os.getenv('CI_COMMIT_SHORT_SHA', 'unknown'),
+            'build_id': os.getenv('CI_PIPELINE_ID', 'unknown'),
+            'commit_hash': os.getenv('CI_COMMIT_SHA', 'unknown'),
+            'branch_tag': os.getenv('CI_COMMIT_REF_NAME', 'main'),
+            'source_code_management_uri': os.getenv('CI_PROJECT_URL', ''),
+            'deduplication_on_engagement': True
         }
-        return owasp_mapping.get(alert_name, None)
 
-    def upload_zap_findings(self, findings, engagement_id, original_file_path):
-        """Upload ZAP findings as DefectDojo import scan"""
+    def import_body(self, findings, engagement_id, scan_type, report):
+        """Import-scan request body chunks for converted findings, and their Content-Type
+
+        ZAP findings are sent as import_findings JSON. DefectDojo reads the scan
+        types of the native adapters only from a report file in their own
+        format, so those findings are written as a Generic Findings Import file
+        titled with the scan type and posted as multipart, like a scanner report.
+        """
+        if scan_type not in ADAPTERS:
+            return iter_import_body(self.build_import_data(scan_type, engagement_id), findings), 'application/json'
+
+        data = self.build_import_data('Generic Findings Import', engagement_id)
+        data['test_title'] = scan_type
+        prefix, suffix, content_type = split_multipart(data, 'file', report, 'application/json')
+        return chain([prefix], iter_generic_findings_file(findings), [suffix]), content_type
+
+    def upload_zap_findings(self, findings, engagement_id, original_file_path, evidence=None):
+        """Upload ZAP findings as DefectDojo import scan, then their evidence attachments"""
+        return self.upload_findings(findings, engagement_id, 'OWASP ZAP DAST Scan', 'ZAP DAST findings', evidence,
+                                    report=os.path.basename(original_file_path))
+
+    def upload_findings(self, findings, engagement_id, scan_type, label, evidence=None, report=None):
+        """Upload converted findings as one DefectDojo import scan, then any evidence attachments
+
+        ``report`` names the source report in the delta ledger (default: ``label``).
+        In delta mode nothing is imported when every finding was sent before.
+        """
+        report = report or label
         try:
-            # Prepare DefectDojo import data
-            import_data = {
-                'active': True,
-                'verified': False,
-                'scan_type': 'OWASP ZAP DAST Scan',
-                'minimum_severity': 'Low',
-                'engagement': engagement_id,
-                'lead': 1,
-                'environment': os.getenv('CI_ENVIRONMENT_NAME', 'Development'),
-                'version': os.getenv('CI_COMMIT_SHORT_SHA', 'unknown'),
-                'build_id': os.getenv('CI_PIPELINE_ID', 'unknown'),
-                'commit_hash': os.getenv('CI_COMMIT_SHA', 'unknown'),
-                'branch_tag': os.getenv('CI_COMMIT_REF_NAME', 'main'),
-                'source_code_management_uri': os.getenv('CI_PROJECT_URL', ''),
-                'deduplication_on_engagement': True,
-
-                # Import findings as JSON
-                'import_findings': findings
-            }
+            deduplicator = self.new_deduplicator(scan_type, label, report)
+            if deduplicator is not None:
+                findings = deduplicator.iter_unique(findings)
+            if self.delta_upload:
+                first_finding = next(findings, None)
+                if first_finding is None:
+                    print(f"⏭️  No new findings in {label} since the last upload")
+                    return self.record_delta(engagement_id, scan_type, report, deduplicator)
+                findings = chain([first_finding], findings)
 
             upload_url = f"{self.base_url}/api/v2/import-scan/"
-            headers_upload = {'Authorization': f'Token {self.api_key}'}
+            body, content_type = self.import_body(findings, engagement_id, scan_type, report)
+            headers_upload = {'Authorization': f'Token {self.api_key}', 'Content-Type': content_type}
 
-            response = requests.post(upload_url, headers=headers_upload, json=import_data)
+            # Findings are encoded chunk by chunk into a spool that is rewound
+            # for each attempt, so a large report is never held in memory.
+            # Retrying an import is safe: deduplication_on_engagement merges any repeat
+            response = self.session.post_body(upload_url, body, headers=headers_upload, idempotent=True)
 
             if response.status_code == 201:
                 result = response.json()
-                print(f"✅ Successfully uploaded ZAP DAST findings (Test ID: {result.get('test', 'N/A')})")
-                return True
+                print(f"✅ Successfully uploaded {label} (Test ID: {result.get('test', 'N/A')})")
+                if evidence is not None and result.get('test'):
+                    self.upload_evidence(result['test'], evidence)
+                return self.record_delta(engagement_id, scan_type, report, deduplicator)
             else:
-                print(f"❌ Failed to upload ZAP DAST findings: {response.status_code} - {response.text}")
+                print(f"❌ Failed to upload {label}: {response.status_code} - {response.text}")
+                self.invalidate_if_stale(response.status_code, response.text)
                 return False
 
         except Exception as e:
-            print(f"❌ Exception uploading ZAP DAST findings: {str(e)}")
+            print(f"❌ Exception uploading {label}: {str(e)}")
             return False
 
+    def upload_evidence(self, test_id, evidence):
+        """Attach each distinct full request/response body to the imported test"""
+        print(f"📎 {evidence.format_stats()}")
+        upload_url = f"{self.base_url}/api/v2/tests/{test_id}/files/"
+        failed = 0
+        for name, path in evidence.attachments():
+            with open(path, 'rb') as f:
+                content = f.read()
+            body, content_type = encode_multipart({'title': name}, {'file': (name, content, 'text/plain')})
+            response = self.session.post_body(
+                upload_url, body, headers={'Authorization': f'Token {self.api_key}', 'Content-Type': content_type})
+            if response.status_code != 201:
+                failed += 1
+                print(f"⚠️  Failed to attach {name}: {response.status_code} - {response.text}")
+        if failed:
+            print(f"⚠️  {failed} evidence attachment(s) failed; the findings keep their truncated bodies")
+        return failed == 0
+
     def upload_report(self, file_path, engagement_id):
         """Upload a single report to DefectDojo"""
         if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
             print(f"⚠️  File not found or empty: {file_path}")
             return False
 
-        scan_type = self.get_scan_type(os.path.basename(file_path))
+        compression = detect_compression(file_path)
+        file_name = report_name(file_path, compression)
+        scan_type = self.get_scan_type(file_name)
         print(f"📤 Uploading {os.path.basename(file_path)} as {scan_type}")
 
+        adapter = ADAPTERS.get(scan_type) if self.native_adapters else None
+        if adapter is not None:
+            return self.process_native_report(file_path, scan_type, adapter, compression, engagement_id)
+
         # Prepare upload data
-        data = {
-            'active': True,
-            'verified': False,  # Let DefectDojo auto-verify
-            'scan_type': scan_type,
-            'minimum_severity': 'Low',
-            'engagement': engagement_id,
-            'lead': 1,  # Default lead
-            'environment': os.getenv('CI_ENVIRONMENT_NAME', 'Development'),
-            'version': os.getenv('CI_COMMIT_SHORT_SHA', 'unknown'),
-            'build_id': os.getenv('CI_PIPELINE_ID', 'unknown'),
-            'commit_hash': os.getenv('CI_COMMIT_SHA', 'unknown'),
-            'branch_tag': os.getenv('CI_COMMIT_REF_NAME', 'main'),
-            'source_code_management_uri': os.getenv('CI_PROJECT_URL', ''),
-            'deduplication_on_engagement': True
-        }
+        data = self.build_import_data(scan_type, engagement_id)
 
         # Upload file
         upload_url = f"{self.base_url}/api/v2/import-scan/"
 
         try:
-            with open(file_path, 'rb') as f:
-                files = {'file': (os.path.basename(file_path), f, 'application/json')}
-                headers_upload = {'Authorization': f'Token {self.api_key}'}
+            if compression:
+                response = self.upload_compressed_report(file_path, file_name, compression, data, upload_url)
+            else:
+                with open(file_path, 'rb') as f:
+                    files = {'file': (file_name, f, 'application/json')}
+                    body, content_type = encode_multipart(data, files)
+                    headers_upload = {'Authorization': f'Token {self.api_key}', 'Content-Type': content_type}
 
-                response = requests.post(upload_url, headers=headers_upload, data=data, files=files)
+                    # Retrying an import is safe: deduplication_on_engagement merges any repeat
+                    response = self.session.post_body(upload_url, body, headers=headers_upload, idempotent=True)
 
             if response.status_code == 201:
                 result = response.json()
@@ -286,68 +816,749 @@ class DefectDojoUploader:
                 return True
             else:
                 print(f"❌ Failed to upload {os.path.basename(file_path)}: {response.status_code} - {response.text}")
+                self.invalidate_if_stale(response.status_code, response.text)
                 return False
 
         except Exception as e:
             print(f"❌ Exception uploading {os.path.basename(file_path)}: {str(e)}")
             return False
 
-    def upload_all_reports(self, report_files):
-        """Upload multiple reports to DefectDojo with auto-created product/engagement"""
-        print(f"🚀 Starting DefectDojo upload for {len(report_files)} reports")
+    def upload_compressed_report(self, file_path, file_name, compression, data, upload_url):
+        """POST a gzip/bz2/xz report as multipart without writing it back to disk
 
-        # Create or get product
-        product_id = self.create_product_if_not_exists()
-        if not product_id:
-            print("❌ Failed to create/get product. Aborting uploads.")
+        A gzip report sent to a host that accepts gzip request bodies is passed
+        through as-is between gzip-compressed multipart framing. Otherwise the
+        report is decompressed into the session's rewindable body spool.
+        """
+        prefix, suffix, content_type = split_multipart(data, 'file', file_name, 'application/json')
+        headers_upload = {'Authorization': f'Token {self.api_key}', 'Content-Type': content_type}
+
+        if compression == 'gzip' and self.session.negotiate_encoding(upload_url) == 'gzip':
+            with open(file_path, 'rb') as f:
+                body = gzip_members(prefix) + f.read() + gzip_members(suffix)
+            print(f"🗜️  Passing {os.path.basename(file_path)} through compressed ({len(body):,} bytes)")
+            # Retrying an import is safe: deduplication_on_engagement merges any repeat
+            response = self.session.post_precompressed(upload_url, body, 'gzip', headers=headers_upload,
+                                                       idempotent=True)
+            if response is not None:
+                return response
+
+        body = chain([prefix], iter_report_chunks(file_path, compression), [suffix])
+        return self.session.post_body(upload_url, body, headers=headers_upload, idempotent=True)
+
+    def upload_single_report(self, report_file, engagement_id):
+        """Upload one report, routing ZAP DAST JSON through its special handler"""
+        try:
+            # Handle ZAP DAST report specially
+            if report_name(report_file) == 'gl-dast-report.json':
+                print("🕷️ Detected ZAP DAST report - processing with special handler")
+                return self.process_zap_dast_report(report_file, engagement_id)
+
+            # Handle other report types normally
+            return self.upload_report(report_file, engagement_id)
+
+        except Exception as e:
+            print(f"❌ Exception uploading {os.path.basename(report_file)}: {str(e)}")
             return False
 
-        # Create or get engagement
-        engagement_id = self.create_engagement_if_not_exists(product_id)
+    def resolve_engagement(self):
+        """Create or get the product and engagement; returns the engagement ID or None
+
+        When a cached ID turns out to be gone the cache entry is dropped and
+        both are looked up once more.
+        """
+        for attempt in (1, 2):
+            _stale_id_seen.set(False)
+            product_id = self.create_product_if_not_exists()
+            engagement_id = self.create_engagement_if_not_exists(product_id) if product_id else None
+            if engagement_id or attempt == 2 or not _stale_id_seen.get():
+                break
+            print("🔄 A cached DefectDojo ID no longer exists; looking product and engagement up again")
+
+        if not product_id:
+            print("❌ Failed to create/get product. Aborting uploads.")
+            return None
         if not engagement_id:
             print("❌ Failed to create/get engagement. Aborting uploads.")
-            return False
+            return None
 
         print(f"📋 Using Product ID: {product_id}, Engagement ID: {engagement_id}")
+        return engagement_id
+
+    def upload_tracking_stale_id(self, report_file, engagement_id):
+        """(upload_single_report result, whether it failed on an ID DefectDojo no longer has)"""
+        _stale_id_seen.set(False)
+        result = self.upload_single_report(report_file, engagement_id)
+        return result, not result and _stale_id_seen.get()
+
+    def upload_reports(self, report_files, engagement_id, workers):
+        """upload_tracking_stale_id for every report, on ``workers`` threads, in input order"""
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(
+                    lambda report_file: self.upload_tracking_stale_id(report_file, engagement_id),
+                    report_files
+                ))
+        return [self.upload_tracking_stale_id(report_file, engagement_id) for report_file in report_files]
+
+    def upload_all_reports(self, report_files, max_parallel=1):
+        """Upload multiple reports to DefectDojo with auto-created product/engagement
+
+        With ``max_parallel`` > 1 the independent imports run concurrently on a
+        bounded worker pool; results are still reported in input order.
+        """
+        print(f"🚀 Starting DefectDojo upload for {len(report_files)} reports")
+
+        engagement_id = self.resolve_engagement()
+        if not engagement_id:
+            return False
 
         # Upload all reports
-        successful_uploads = 0
-        failed_uploads = 0
+        workers = max(1, min(max_parallel, len(report_files)))
+        if workers > 1:
+            print(f"⚡ Uploading concurrently with {workers} workers")
+        outcomes = self.upload_reports(report_files, engagement_id, workers)
+        results = [result for result, _ in outcomes]
 
-        for report_file in report_files:
-            # Handle ZAP DAST report specially
-            if os.path.basename(report_file) == 'gl-dast-report.json':
-                print("🕷️ Detected ZAP DAST report - processing with special handler")
-                if self.process_zap_dast_report(report_file, engagement_id):
-                    successful_uploads += 1
-                else:
-                    failed_uploads += 1
+        # An import rejected for a cached ID that is gone already dropped the
+        # cache entry: look the IDs up again and retry those reports once
+        stale = [index for index, (_, stale_id) in enumerate(outcomes) if stale_id]
+        if stale:
+            print(f"🔄 {len(stale)} upload(s) referenced a DefectDojo ID that no longer exists; "
+                  f"retrying with fresh IDs")
+            engagement_id = self.resolve_engagement()
+            if engagement_id:
+                retried = self.upload_reports([report_files[index] for index in stale], engagement_id, workers)
+                for index, (result, _) in zip(stale, retried):
+                    results[index] = result
+
+        successful_uploads = sum(1 for result in results if result)
+        failed_uploads = len(results) - successful_uploads
+
+        print(f"\n📊 Upload Summary:")
+        for report_file, result in zip(report_files, results):
+            print(f"   {'✅' if result else '❌'} {os.path.basename(report_file)}")
+        print(f"   ✅ Successful uploads: {successful_uploads}")
+        print(f"   ❌ Failed uploads: {failed_uploads}")
+        print(f"   📈 Total files processed: {len(report_files)}")
+        self.print_filter_stats()
+        self.print_dedup_stats()
+        self.print_site_stats()
+        self.session.print_connection_stats()
+        self.session.print_compression_stats()
+
+        return successful_uploads > 0
+
+
+class AsyncDefectDojoUploader(DefectDojoUploader):
+    """asyncio implementation of the DefectDojoUploader workflow
+
+    Every report upload runs as a coroutine; a semaphore bounds how many
+    imports are in flight at once, so a single process can drive hundreds of
+    concurrent imports without a thread per request. Requires aiohttp.
+    Payload construction and ZAP conversion are shared with the sync class.
+    """
+
+    def __init__(self, base_url, api_key, product_name, engagement_name=None,
+                 http_session=None, semaphore=None, session=None, id_cache=None, parse_workers=DEFAULT_PARSE_WORKERS,
+                 evidence_max_bytes=DEFAULT_EVIDENCE_MAX_BYTES, native_adapters=DEFAULT_NATIVE_ADAPTERS,
+                 filter_config=None, deduplicate=DEFAULT_DEDUPLICATE, delta_upload=DEFAULT_DELTA_UPLOAD,
+                 ledger=None):
+        if aiohttp is None:
+            raise RuntimeError("aiohttp is required for async uploads: pip3 install aiohttp")
+        super().__init__(base_url, api_key, product_name, engagement_name=engagement_name, session=session,
+                         id_cache=id_cache, parse_workers=parse_workers, evidence_max_bytes=evidence_max_bytes,
+                         native_adapters=native_adapters, filter_config=filter_config,
+                         deduplicate=deduplicate, delta_upload=delta_upload, ledger=ledger)
+        self.http_session = http_session
+        self.semaphore = semaphore
+        self.retry_policy = RetryPolicy()
+        self.connection_stats = ConnectionStats()
+
+    def trace_config(self):
+        """aiohttp tracing that counts requests and newly opened connections in connection_stats
+
+        Sessions created by upload_all_reports use it; pass it in the
+        trace_configs of an injected session to have that one counted too.
+        """
+        async def on_request_start(session, context, params):
+            self.connection_stats.record_checkout()
+
+        async def on_connection_create_end(session, context, params):
+            self.connection_stats.record_new_connection()
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        return trace_config
+
+    async def _request(self, method, url, idempotent=None, before_retry=None, **kwargs):
+        """Send a request and return (status, parsed JSON or text)
+
+        Transient failures are retried with the same policy and idempotency
+        rules as DefectDojoSession.request; ``before_retry`` is a coroutine
+        function that may return a (status, body) to use instead of re-sending.
+        A file body is streamed from its start on every attempt.
+        """
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        policy = self.retry_policy
+        started = time.monotonic()
+        attempt = 0
+
+        while True:
+            attempt += 1
+            if attempt > 1 and before_retry is not None:
+                recovered = await before_retry()
+                if recovered is not None:
+                    return recovered
+
+            if isinstance(kwargs.get('data'), io.IOBase):
+                # A spooled body is read again from the start for every attempt
+                attempt_kwargs = dict(kwargs, data=_read_spool(kwargs['data']))
             else:
+                attempt_kwargs = kwargs
+
+            status = body = retry_after = error = None
+            try:
+                async with self.http_session.request(method, url, **attempt_kwargs) as response:
+                    status = response.status
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    if response.content_type == 'application/json':
+                        body = await response.json()
+                    else:
+                        body = await response.text()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                error = e
+
+            if error is None and not policy.is_retryable_status(status):
+                return status, body
+
+            if not (idempotent or before_retry is not None):
+                # A duplicate could be harmful: retry only if the app never saw it
+                if not (isinstance(error, aiohttp.ClientConnectorError) or status in UNPROCESSED_STATUSES):
+                    if error is not None:
+                        raise error
+                    return status, body
+
+            delay = policy.next_delay(attempt, time.monotonic() - started, retry_after)
+            if delay is None:
+                if error is not None:
+                    raise error
+                return status, body
+
+            reason = f"HTTP {status}" if error is None else type(error).__name__
+            print(f"🔁 {method.upper()} {url.split('?')[0]} failed ({reason}); "
+                  f"retrying in {delay:.1f}s (attempt {attempt + 1}/{policy.max_attempts})")
+            await asyncio.sleep(delay)
+
+    async def post_import(self, upload_url, headers, chunks):
+        """POST an import body, compressed like the sync session's, resending it plain if the host refuses
+
+        The byte chunks are drained into the sync session's spool (see
+        DefectDojoSession.spool_stream) on a worker thread, so lazily converted
+        findings are parsed and encoded off the event loop and the body is never
+        held whole in memory. Compression settings, per-host support and byte
+        counts are shared with the sync session. Returns (status, parsed JSON or text).
+        """
+        stats = self.session.compression_stats
+        data, encoding, sizes = await asyncio.to_thread(self.session.spool_stream, upload_url, chunks)
+        try:
+            if encoding is None:
+                stats.record(sizes.raw_bytes, sizes.sent_bytes, False)
+                return await self._request('POST', upload_url, headers=headers, data=data, idempotent=True)
+
+            # Retrying an import is safe: deduplication_on_engagement merges any repeat
+            status, response_body = await self._request(
+                'POST', upload_url, headers=dict(headers, **{'Content-Encoding': encoding}), data=data,
+                idempotent=True)
+            if self.session.record_encoding_support(upload_url, status, str(response_body)):
+                stats.record(sizes.raw_bytes, sizes.sent_bytes, True)
+                return status, response_body
+
+            stats.record(sizes.raw_bytes, sizes.raw_bytes, False)
+            plain = await asyncio.to_thread(self.session.decompress_spool, data, encoding)
+            try:
+                return await self._request('POST', upload_url, headers=headers, data=plain, idempotent=True)
+            finally:
+                _close_spool(plain)
+        finally:
+            _close_spool(data)
+
+    async def create_product_if_not_exists(self):
+        """Create product if it doesn't exist and return product ID"""
+        product_id = self.cached_product_id()
+        if product_id:
+            return product_id
+
+        # Check if product exists
+        status, body = await self._request('GET', self.product_search_url(), headers=self.headers)
+
+        if status == 200:
+            products = body.get('results', [])
+            if products:
+                product_id = products[0]['id']
+                print(f"✅ Found existing product: {self.product_name} (ID: {product_id})")
+                self.remember_product_id(product_id)
+                return product_id
+
+        async def recover_created_product():
+            # Before re-POSTing, check whether a timed-out attempt already created it
+            status, body = await self._request('GET', self.product_search_url(), headers=self.headers)
+            if status == 200 and body.get('results'):
+                return status, body
+            return None
+
+        # Create new product
+        create_url = f"{self.base_url}/api/v2/products/"
+        status, body = await self._request('POST', create_url, headers=self.headers, json=self.product_data(),
+                                           before_retry=recover_created_product)
+
+        if status == 200:
+            product_id = body['results'][0]['id']
+            print(f"✅ Found product created by an earlier attempt: {self.product_name} (ID: {product_id})")
+            self.remember_product_id(product_id)
+            return product_id
+        elif status == 201:
+            product_id = body['id']
+            print(f"✅ Created new product: {self.product_name} (ID: {product_id})")
+            self.remember_product_id(product_id)
+            return product_id
+        else:
+            print(f"❌ Failed to create product: {body}")
+            return None
+
+    async def iter_engagement_pages(self, url):
+        """Yield engagement result pages, requesting the next page only on demand"""
+        while url:
+            status, body = await self._request('GET', url, headers=self.headers)
+            if status != 200:
+                return
+            yield body.get('results', [])
+            url = body.get('next')
+
+    async def create_engagement_if_not_exists(self, product_id):
+        """Create engagement if it doesn't exist and return engagement ID"""
+        engagement_id = self.cached_engagement_id()
+        if engagement_id:
+            return engagement_id
+
+        # Check if engagement exists for this pipeline run
+        async for engagements in self.iter_engagement_pages(self.engagement_search_url(product_id)):
+            engagement_id = self.find_todays_engagement(engagements)
+            if engagement_id:
+                self.remember_engagement_id(engagement_id)
+                return engagement_id
+
+        async def recover_created_engagement():
+            # Before re-POSTing, check whether a timed-out attempt already created it
+            status, body = await self._request('GET', self.engagement_search_url(product_id), headers=self.headers)
+            if status == 200 and self.todays_engagements(body.get('results', [])):
+                return status, body
+            return None
+
+        # Create new engagement
+        create_url = f"{self.base_url}/api/v2/engagements/"
+        status, body = await self._request('POST', create_url, headers=self.headers,
+                                           json=self.engagement_data(product_id),
+                                           before_retry=recover_created_engagement)
+
+        if status == 200:
+            engagement_id = self.find_todays_engagement(body['results'])
+            self.remember_engagement_id(engagement_id)
+            return engagement_id
+        elif status == 201:
+            engagement_id = body['id']
+            print(f"✅ Created new engagement: {self.engagement_name} (ID: {engagement_id})")
+            self.remember_engagement_id(engagement_id)
+            return engagement_id
+        else:
+            print(f"❌ Failed to create engagement: {body}")
+            self.invalidate_if_stale(status, str(body))
+            return None
+
+    async def process_zap_dast_report(self, file_path, engagement_id):
+        """Process ZAP DAST report and convert to DefectDojo format"""
+        evidence = self.new_evidence_store()
+        try:
+            # Findings stream from the report into the request body spool.
+            # Parsing is blocking file/CPU work; keep it off the event loop
+            findings = self.iter_zap_dast_findings(file_path, evidence=evidence)
+            first_finding = await asyncio.to_thread(next, findings, None)
+
+            # Upload transformed findings as DefectDojo import scan
+            if first_finding is not None:
+                return await self.upload_zap_findings(chain([first_finding], findings), engagement_id, file_path,
+                                                      evidence)
+            else:
+                print("⚠️  No findings found in ZAP DAST report")
+                return await self.record_empty_report(engagement_id, 'OWASP ZAP DAST Scan',
+                                                      os.path.basename(file_path))
+
+        except Exception as e:
+            print(f"❌ Error processing ZAP DAST report {file_path}: {str(e)}")
+            return False
+        finally:
+            if evidence is not None:
+                evidence.close()
+
+    async def process_native_report(self, file_path, scan_type, adapter, compression, engagement_id):
+        """Convert a scanner report on our side and import its findings"""
+        try:
+            findings = self.iter_native_findings(file_path, adapter, compression, self.finding_filter(scan_type))
+            # Parsing is blocking file/CPU work; keep it off the event loop
+            first_finding = await asyncio.to_thread(next, findings, None)
+            if first_finding is None:
+                print(f"⚠️  No findings found in {os.path.basename(file_path)}")
+                return await self.record_empty_report(engagement_id, scan_type, os.path.basename(file_path))
+            return await self.upload_findings(chain([first_finding], findings), engagement_id, scan_type,
+                                              os.path.basename(file_path))
+
+        except Exception as e:
+            print(f"❌ Error processing {file_path}: {str(e)}")
+            return False
+
+    async def upload_zap_findings(self, findings, engagement_id, original_file_path, evidence=None):
+        """Upload ZAP findings as DefectDojo import scan, then their evidence attachments"""
+        return await self.upload_findings(findings, engagement_id, 'OWASP ZAP DAST Scan', 'ZAP DAST findings',
+                                          evidence, report=os.path.basename(original_file_path))
+
+    async def upload_findings(self, findings, engagement_id, scan_type, label, evidence=None, report=None):
+        """Upload converted findings as one DefectDojo import scan, then any evidence attachments"""
+        report = report or label
+        try:
+            deduplicator = self.new_deduplicator(scan_type, label, report)
+            if deduplicator is not None:
+                findings = deduplicator.iter_unique(findings)
+
+            if self.delta_upload:
+                first_finding = await asyncio.to_thread(next, findings, None)
+                if first_finding is None:
+                    print(f"⏭️  No new findings in {label} since the last upload")
+                    return await self.record_delta(engagement_id, scan_type, report, deduplicator)
+                findings = chain([first_finding], findings)
+
+            upload_url = f"{self.base_url}/api/v2/import-scan/"
+            # Findings are encoded chunk by chunk into a spool, never as a list or one bytes body
+            chunks, content_type = self.import_body(findings, engagement_id, scan_type, report)
+            headers_upload = {'Authorization': f'Token {self.api_key}', 'Content-Type': content_type}
+
+            status, body = await self.post_import(upload_url, headers_upload, chunks)
+
+            if status == 201:
+                print(f"✅ Successfully uploaded {label} (Test ID: {body.get('test', 'N/A')})")
+                if evidence is not None and body.get('test'):
+                    await self.upload_evidence(body['test'], evidence)
+                return await self.record_delta(engagement_id, scan_type, report, deduplicator)
+            else:
+                print(f"❌ Failed to upload {label}: {status} - {body}")
+                self.invalidate_if_stale(status, str(body))
+                return False
+
+        except Exception as e:
+            print(f"❌ Exception uploading {label}: {str(e)}")
+            return False
+
+    async def record_delta(self, engagement_id, scan_type, report, deduplicator):
+        """After a successful delta upload: note disappeared fingerprints, then update the ledger"""
+        if not self.delta_upload:
+            return True
+        disappeared = deduplicator.disappeared()
+        if disappeared:
+            status, body = await self._request('POST', self.engagement_notes_url(engagement_id), headers=self.headers,
+                                               json=self.disappeared_note_data(scan_type, report, disappeared))
+            if status != 201:
+                print(f"❌ Failed to record disappeared findings of {report}: {status} - {body}")
+                return False
+            print(f"🔕 {len(disappeared)} finding(s) of {report} no longer reported; listed in an engagement note")
+        await asyncio.to_thread(self.ledger.set, self.ledger_key(scan_type, report), deduplicator.fingerprints())
+        return True
+
+    async def record_empty_report(self, engagement_id, scan_type, report):
+        """A report without findings: in delta mode every previously uploaded finding disappeared"""
+        if not self.delta_upload:
+            return True
+        return await self.record_delta(engagement_id, scan_type, report,
+                                       self.new_deduplicator(scan_type, report, report))
+
+    async def upload_evidence(self, test_id, evidence):
+        """Attach each distinct full request/response body to the imported test"""
+        print(f"📎 {evidence.format_stats()}")
+        upload_url = f"{self.base_url}/api/v2/tests/{test_id}/files/"
+        failed = 0
+        for name, path in evidence.attachments():
+            content = await asyncio.to_thread(_read_file_bytes, path)
+            # Pre-encoded bytes rather than aiohttp.FormData, which cannot be re-sent on retry
+            form, content_type = encode_multipart({'title': name}, {'file': (name, content, 'text/plain')})
+            status, body = await self._request(
+                'POST', upload_url, headers={'Authorization': f'Token {self.api_key}', 'Content-Type': content_type},
+                data=form)
+            if status != 201:
+                failed += 1
+                print(f"⚠️  Failed to attach {name}: {status} - {body}")
+        if failed:
+            print(f"⚠️  {failed} evidence attachment(s) failed; the findings keep their truncated bodies")
+        return failed == 0
+
+    async def upload_report(self, file_path, engagement_id):
+        """Upload a single report to DefectDojo"""
+        if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
+            print(f"⚠️  File not found or empty: {file_path}")
+            return False
+
+        compression = detect_compression(file_path)
+        file_name = report_name(file_path, compression)
+        scan_type = self.get_scan_type(file_name)
+        print(f"📤 Uploading {os.path.basename(file_path)} as {scan_type}")
+
+        adapter = ADAPTERS.get(scan_type) if self.native_adapters else None
+        if adapter is not None:
+            return await self.process_native_report(file_path, scan_type, adapter, compression, engagement_id)
+
+        # Upload file
+        upload_url = f"{self.base_url}/api/v2/import-scan/"
+
+        try:
+            # The (decompressed) report is spooled between its multipart framing,
+            # so a retry resends identical bytes without holding the report in memory
+            prefix, suffix, content_type = split_multipart(self.build_import_data(scan_type, engagement_id), 'file',
+                                                           file_name, 'application/json')
+            headers_upload = {'Authorization': f'Token {self.api_key}', 'Content-Type': content_type}
+            form_body = chain([prefix], iter_report_chunks(file_path, compression), [suffix])
+
+            status, body = await self.post_import(upload_url, headers_upload, form_body)
+
+            if status == 201:
+                print(f"✅ Successfully uploaded {os.path.basename(file_path)} (Test ID: {body.get('test', 'N/A')})")
+                return True
+            else:
+                print(f"❌ Failed to upload {os.path.basename(file_path)}: {status} - {body}")
+                self.invalidate_if_stale(status, str(body))
+                return False
+
+        except Exception as e:
+            print(f"❌ Exception uploading {os.path.basename(file_path)}: {str(e)}")
+            return False
+
+    async def upload_single_report(self, report_file, engagement_id):
+        """Upload one report once a semaphore slot is free"""
+        async with self.semaphore:
+            try:
+                # Handle ZAP DAST report specially
+                if report_name(report_file) == 'gl-dast-report.json':
+                    print("🕷️ Detected ZAP DAST report - processing with special handler")
+                    return await self.process_zap_dast_report(report_file, engagement_id)
+
                 # Handle other report types normally
-                if self.upload_report(report_file, engagement_id):
-                    successful_uploads += 1
-                else:
-                    failed_uploads += 1
+                return await self.upload_report(report_file, engagement_id)
+
+            except Exception as e:
+                print(f"❌ Exception uploading {os.path.basename(report_file)}: {str(e)}")
+                return False
+
+    async def resolve_engagement(self):
+        """Create or get the product and engagement, looking both up again once if a cached ID is gone"""
+        for attempt in (1, 2):
+            _stale_id_seen.set(False)
+            product_id = await self.create_product_if_not_exists()
+            engagement_id = await self.create_engagement_if_not_exists(product_id) if product_id else None
+            if engagement_id or attempt == 2 or not _stale_id_seen.get():
+                break
+            print("🔄 A cached DefectDojo ID no longer exists; looking product and engagement up again")
+
+        if not product_id:
+            print("❌ Failed to create/get product. Aborting uploads.")
+            return None
+        if not engagement_id:
+            print("❌ Failed to create/get engagement. Aborting uploads.")
+            return None
+
+        print(f"📋 Using Product ID: {product_id}, Engagement ID: {engagement_id}")
+        return engagement_id
+
+    async def upload_tracking_stale_id(self, report_file, engagement_id):
+        """(upload_single_report result, whether it failed on an ID DefectDojo no longer has)"""
+        # Runs as its own gather task, so the flag is local to this report
+        _stale_id_seen.set(False)
+        result = await self.upload_single_report(report_file, engagement_id)
+        return result, not result and _stale_id_seen.get()
+
+    async def upload_reports(self, report_files, engagement_id):
+        return await asyncio.gather(*(
+            self.upload_tracking_stale_id(report_file, engagement_id) for report_file in report_files
+        ))
+
+    async def upload_all_reports(self, report_files, max_parallel=10):
+        """Upload multiple reports concurrently with a semaphore-limited fan-out
+
+        When no aiohttp session or semaphore was injected, one is created for
+        this call; pass shared ones to fan out across several products.
+        """
+        owns_session = self.http_session is None
+        if owns_session:
+            connector = aiohttp.TCPConnector(limit_per_host=max_parallel)
+            self.http_session = aiohttp.ClientSession(connector=connector, trace_configs=[self.trace_config()])
+        if self.semaphore is None:
+            self.semaphore = asyncio.Semaphore(max_parallel)
+
+        try:
+            print(f"🚀 Starting async DefectDojo upload for {len(report_files)} reports")
+
+            engagement_id = await self.resolve_engagement()
+            if not engagement_id:
+                return False
+
+            # Upload all reports; gather preserves input order
+            outcomes = await self.upload_reports(report_files, engagement_id)
+            results = [result for result, _ in outcomes]
+
+            # Retry the reports rejected for a cached ID that is gone once, with fresh IDs
+            stale = [index for index, (_, stale_id) in enumerate(outcomes) if stale_id]
+            if stale:
+                print(f"🔄 {len(stale)} upload(s) referenced a DefectDojo ID that no longer exists; "
+                      f"retrying with fresh IDs")
+                engagement_id = await self.resolve_engagement()
+                if engagement_id:
+                    retried = await self.upload_reports([report_files[index] for index in stale], engagement_id)
+                    for index, (result, _) in zip(stale, retried):
+                        results[index] = result
+
+        finally:
+            if owns_session:
+                await self.http_session.close()
+                self.http_session = None
+
+        successful_uploads = sum(1 for result in results if result)
+        failed_uploads = len(results) - successful_uploads
 
         print(f"\n📊 Upload Summary:")
+        for report_file, result in zip(report_files, results):
+            print(f"   {'✅' if result else '❌'} {os.path.basename(report_file)}")
         print(f"   ✅ Successful uploads: {successful_uploads}")
         print(f"   ❌ Failed uploads: {failed_uploads}")
         print(f"   📈 Total files processed: {len(report_files)}")
+        self.print_filter_stats()
+        self.print_dedup_stats()
+        self.print_site_stats()
+        print(f"🔌 {self.connection_stats.format_stats()}")
+        self.session.print_compression_stats()
 
         return successful_uploads > 0
 
-def main():
-    if len(sys.argv) < 4:
-        print("Usage: python3 upload-reports-enhanced.py <base_url> <api_key> <product_name> [report_files...]")
-        print("\nEnvironment variables available:")
-        print("   CI_PROJECT_NAME, CI_COMMIT_REF_NAME, CI_PIPELINE_ID")
-        print("   CI_COMMIT_SHA, CI_COMMIT_SHORT_SHA, CI_PROJECT_URL")
-        print("   CI_ENVIRONMENT_NAME")
-        sys.exit(1)
 
-    base_url = sys.argv[1]
-    api_key = sys.argv[2]
-    product_name = sys.argv[3]
+def new_site_stats(offset):
+    return {'site': '', 'alerts': 0, 'findings': 0, 'bytes': offset, 'seconds': time.perf_counter(),
+            'peak_rss_mib': None}
+
+
+def finish_site_stats(site_stats, end_offset):
+    """Turn the start offset/time recorded by new_site_stats into size and duration"""
+    site_stats['bytes'] = end_offset - site_stats['bytes']
+    site_stats['seconds'] = time.perf_counter() - site_stats['seconds']
+    if resource is not None:
+        # High-water mark of the converting process (ru_maxrss is KiB on Linux)
+        site_stats['peak_rss_mib'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _read_file_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+async def _read_spool(spool, chunk_size=1024 * 1024):
+    """Stream a spooled request body from its start, reading off the event loop"""
+    spool.seek(0)
+    while True:
+        chunk = await asyncio.to_thread(spool.read, chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def _close_spool(spool):
+    if not isinstance(spool, bytes):
+        spool.close()
+
+
+# Per-process converter, evidence store and source filter used by the site pool in iter_zap_dast_findings
+_site_worker = None
+_site_evidence = None
+_site_filter = None
+
+
+def _init_site_worker(evidence_directory, evidence_max_chars, finding_filter=None):
+    global _site_worker, _site_evidence, _site_filter
+    # Compiled once per worker; its drop counts go back in the site stats
+    _site_filter = finding_filter
+    with contextlib.redirect_stdout(io.StringIO()):
+        _site_worker = DefectDojoUploader('http://localhost', '', '', id_cache=DefectDojoIDCache(ttl=0))
+    if evidence_directory is not None:
+        # Shares the parent's store directory; counters go back in the site stats
+        _site_evidence = EvidenceStore(evidence_max_chars, evidence_directory)
+
+
+def _convert_zap_site(task):
+    """Convert one site of a ZAP JSON report in a worker; findings return as one batch"""
+    file_path, offset, length = task
+    site_stats = new_site_stats(offset)
+    with open(file_path, 'rb') as stream:
+        reader = JSONStreamReader(stream)
+        reader.seek(offset)
+        evidence_before = (_site_evidence.truncated, _site_evidence.removed_chars) if _site_evidence else (0, 0)
+        findings = list(_site_worker.iter_zap_site_findings(reader, True, site_stats, _site_evidence,
+                                                            _site_filter))
+    finish_site_stats(site_stats, offset + length)
+    evidence_after = (_site_evidence.truncated, _site_evidence.removed_chars) if _site_evidence else (0, 0)
+    site_stats['evidence'] = (evidence_after[0] - evidence_before[0], evidence_after[1] - evidence_before[1])
+    site_stats['filtered'] = _site_filter.take_counts() if _site_filter is not None else None
+    return findings, site_stats
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Upload security reports to DefectDojo with auto-created product/engagement",
+        epilog="Environment variables available:\n"
+               "   CI_PROJECT_NAME, CI_COMMIT_REF_NAME, CI_PIPELINE_ID\n"
+               "   CI_COMMIT_SHA, CI_COMMIT_SHORT_SHA, CI_PROJECT_URL\n"
+               "   CI_ENVIRONMENT_NAME, DEFECTDOJO_MAX_PARALLEL, DEFECTDOJO_PARSE_WORKERS\n"
+               "   DEFECTDOJO_EVIDENCE_MAX_BYTES (0 keeps ZAP request/response bodies inline)\n"
+               "   DEFECTDOJO_NATIVE_ADAPTERS (1 converts non-ZAP reports here, see --native-adapters)\n"
+               "   DEFECTDOJO_FILTER_CONFIG (source filter rules, default scripts/upload-filters.json)\n"
+               "   DEFECTDOJO_DEDUPLICATE (0 uploads findings with repeated fingerprints too)\n"
+               "   DEFECTDOJO_DELTA_UPLOAD, DEFECTDOJO_LEDGER_FILE, DEFECTDOJO_LEDGER_TTL\n"
+               "   DEFECTDOJO_CACHE_FILE, DEFECTDOJO_CACHE_TTL (0 disables the ID cache)\n"
+               "   DEFECTDOJO_COMPRESSION (gzip|deflate), DEFECTDOJO_COMPRESSION_MIN_BYTES",
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('base_url')
+    parser.add_argument('api_key')
+    parser.add_argument('product_name')
+    parser.add_argument('report_files', nargs='*')
+    parser.add_argument('--max-parallel', type=int,
+                        default=int(os.getenv('DEFECTDOJO_MAX_PARALLEL', '1')),
+                        help="Number of reports to import concurrently (default: 1, sequential)")
+    parser.add_argument('--async', dest='use_async', action='store_true',
+                        help="Use the asyncio backend (requires aiohttp)")
+    parser.add_argument('--parse-workers', type=int, default=DEFAULT_PARSE_WORKERS,
+                        help="Processes converting the sites of a ZAP DAST report (default: CPU count)")
+    parser.add_argument('--evidence-max-bytes', type=int, default=DEFAULT_EVIDENCE_MAX_BYTES,
+                        help="Truncate ZAP request/response bodies beyond this many characters and attach "
+                             "each distinct full body to the test (0 keeps bodies inline)")
+    parser.add_argument('--native-adapters', dest='native_adapters', action='store_true',
+                        default=DEFAULT_NATIVE_ADAPTERS,
+                        help="Convert Gitleaks/Semgrep/Trivy/SARIF/Dependency-Track reports here (applying the "
+                             "filters, deduplication and delta) and import them as Generic Findings Import")
+    parser.add_argument('--opaque-upload', dest='native_adapters', action='store_false',
+                        help="Post those reports as files for DefectDojo's own parser (default)")
+    parser.add_argument('--filter-config', default=None,
+                        help="Per-scanner source filter rules applied before upload "
+                             "(default: $DEFECTDOJO_FILTER_CONFIG or scripts/upload-filters.json)")
+    parser.add_argument('--no-dedupe', dest='deduplicate', action='store_false', default=DEFAULT_DEDUPLICATE,
+                        help="Upload every finding instead of one per fingerprint within a report")
+    parser.add_argument('--delta', dest='delta_upload', action='store_true', default=DEFAULT_DELTA_UPLOAD,
+                        help="Send only findings new since the last successful upload of each report and "
+                             "note the ones that disappeared (fingerprints kept in $DEFECTDOJO_LEDGER_FILE)")
+    args = parser.parse_args()
 
     # Default report files if none provided
     default_reports = [
@@ -360,17 +1571,44 @@ def main():
         'security_summary.json'
     ]
 
-    report_files = sys.argv[4:] if len(sys.argv) > 4 else default_reports
+    report_files = args.report_files or default_reports
 
-    # Initialize uploader
-    uploader = DefectDojoUploader(
-        base_url=base_url,
-        api_key=api_key,
-        product_name=product_name
-    )
+    if args.use_async:
+        # Event-loop fan-out: --max-parallel bounds in-flight imports
+        uploader = AsyncDefectDojoUploader(
+            base_url=args.base_url,
+            api_key=args.api_key,
+            product_name=args.product_name,
+            parse_workers=args.parse_workers,
+            evidence_max_bytes=args.evidence_max_bytes,
+            native_adapters=args.native_adapters,
+            filter_config=FilterConfig(args.filter_config),
+            deduplicate=args.deduplicate,
+            delta_upload=args.delta_upload
+        )
+        success = asyncio.run(uploader.upload_all_reports(report_files, max_parallel=max(args.max_parallel, 1)))
+    else:
+        # Keep one pooled connection per concurrent upload
+        session = get_session()
+        if args.max_parallel > session.pool_maxsize:
+            session = configure_session(pool_maxsize=args.max_parallel)
+
+        # Initialize uploader
+        uploader = DefectDojoUploader(
+            base_url=args.base_url,
+            api_key=args.api_key,
+            product_name=args.product_name,
+            session=session,
+            parse_workers=args.parse_workers,
+            evidence_max_bytes=args.evidence_max_bytes,
+            native_adapters=args.native_adapters,
+            filter_config=FilterConfig(args.filter_config),
+            deduplicate=args.deduplicate,
+            delta_upload=args.delta_upload
+        )
 
-    # Upload reports
-    success = uploader.upload_all_reports(report_files)
+        # Upload reports
+        success = uploader.upload_all_reports(report_files, max_parallel=args.max_parallel)
 
     if success:
         print("🎉 DefectDojo upload completed successfully!")
@@ -380,4 +1618,4 @@ def main():
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
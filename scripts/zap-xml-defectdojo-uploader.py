@@ -8,23 +8,268 @@ Author: Security Team
 Version: 1.0.0
 Last Updated: 2025-01-01
 
-Usage: python3 zap-xml-defectdojo-uploader.py <base_url> <api_key> <product_name> <xml_report_file>
+Usage: python3 zap-xml-defectdojo-uploader.py [--chunk-findings N] [--chunk-bytes N] [--per-instance]
+           [--workers N] [--test-per-report] [--split] [--filter-config PATH] [--no-dedupe] [--delta]
+           <base_url> <api_key> <product_name> <xml_report_file>...
 Integration: Designed for GitLab CI/CD and standalone execution
 
 This script specifically handles OWASP ZAP XML format with proper namespace handling,
 rich metadata extraction, and OWASP Top 10 2021 mapping.
 """
 
+import argparse
+import contextlib
+import io
+import mmap
+import re
 import sys
 import json
+import time
 import xml.etree.ElementTree as ET
-import requests
 import os
-import re
+from concurrent.futures import as_completed
 from datetime import datetime
+from itertools import chain
+from urllib.parse import urlencode
+from xml.sax.saxutils import unescape
+
+from defectdojo_cache import DefectDojoIDCache, is_stale_id_response
+from defectdojo_classification import get_classifier
+from defectdojo_client import get_session
+from defectdojo_filters import FilterConfig, get_filter_config
+from defectdojo_findings import (
+    ZAP_CONFIDENCE_LEVELS,
+    ZAP_RISK_LEVELS,
+    Finding,
+    encode_finding,
+    import_body_prefix,
+    iter_import_body,
+)
+from defectdojo_fingerprints import DEFAULT_DEDUPLICATE, FindingDeduplicator
+from defectdojo_ledger import DEFAULT_DELTA_UPLOAD, FingerprintLedger
+from defectdojo_processes import new_process_pool
+from defectdojo_reports import detect_compression, open_report
+
+# Page size requested from the engagements API during lookup
+ENGAGEMENT_LOOKUP_LIMIT = 10
+
+# Chunked import limits; 0 disables a limit, both 0 sends one streamed request
+DEFAULT_CHUNK_FINDINGS = int(os.getenv('DEFECTDOJO_CHUNK_FINDINGS', '0'))
+DEFAULT_CHUNK_BYTES = int(os.getenv('DEFECTDOJO_CHUNK_BYTES', '0'))
+
+# Child elements read from each <alertitem> and from its first <instance>
+ALERT_FIELDS = frozenset(('pluginid', 'name', 'alert', 'riskcode', 'confidence', 'desc',
+                          'solution', 'reference', 'cweid', 'wascid'))
+INSTANCE_FIELDS = frozenset(('uri', 'method', 'param', 'attack', 'evidence'))
+
+# DefectDojo scan type of the import, also the key of this uploader's source filter rules
+ZAP_XML_SCAN_TYPE = 'OWASP ZAP DAST Scan (XML)'
+
+# Long alert text ZAP repeats verbatim for every alert of the same pluginid
+ALERT_TEXT_FIELDS = ('desc', 'solution', 'reference')
+
+# Emit one finding per <instance> instead of one per alert (opt-in)
+DEFAULT_PER_INSTANCE = os.getenv('DEFECTDOJO_PER_INSTANCE', '').lower() in ('1', 'true', 'yes')
+
+# Parser processes used when several reports are given (default: one per CPU)
+DEFAULT_PARSE_WORKERS = int(os.getenv('DEFECTDOJO_PARSE_WORKERS', '0')) or os.cpu_count() or 1
+
+# Split a single report into byte ranges parsed in parallel (opt-in)
+DEFAULT_SPLIT_PARSE = os.getenv('DEFECTDOJO_SPLIT_PARSE', '').lower() in ('1', 'true', 'yes')
+# Smallest byte range handed to a worker; smaller reports are parsed serially
+SPLIT_SLICE_BYTES = 1024 * 1024
+
+
+def local_name(tag):
+    """Strip the '{namespace}' prefix ElementTree puts on qualified tags"""
+    return tag[tag.index('}') + 1:] if tag[0] == '{' else tag
+
+
+def collect_child_text(element, fields):
+    """Single pass over element's direct children
+
+    Returns ({local tag: text} for the wanted fields, first <instance> or None).
+    Each child is visited once, so the cost is linear in the size of the alert
+    rather than one subtree walk per field.
+    """
+    values = {}
+    instance = None
+    for child in element:
+        tag = local_name(child.tag)
+        if tag in fields:
+            if tag not in values and child.text:
+                values[tag] = child.text
+        elif tag == 'instances' and instance is None:
+            for candidate in child:
+                if local_name(candidate.tag) == 'instance':
+                    instance = candidate
+                    break
+        elif tag == 'instance' and instance is None:
+            instance = child
+    return values, instance
+
+
+def element_text_size(element):
+    """Approximate report bytes of an element: the length of all the text inside it"""
+    return sum(len(text) for text in element.itertext())
+
+
+def as_paths(report_paths):
+    """A single report path or a sequence of them, as a list"""
+    return [report_paths] if isinstance(report_paths, str) else list(report_paths)
+
+
+def share_alert_text(text_cache, plugin_id, fields):
+    """Return (desc, solution, reference), reusing the copies cached for plugin_id
+
+    The first alert of a pluginid stores its text bodies in the parse-scoped
+    cache; later alerts with identical text reference those strings instead of
+    keeping their own copies. Text that differs is kept as parsed.
+    """
+    texts = tuple(fields.get(tag, '') for tag in ALERT_TEXT_FIELDS)
+    cached = text_cache.get(plugin_id)
+    if cached is None:
+        text_cache[plugin_id] = texts
+    elif cached == texts:
+        return cached
+    return texts
+
+
+def iter_alert_instances(alert):
+    """Yield every <instance> of an alert, under <instances> or directly below it"""
+    for child in alert:
+        tag = local_name(child.tag)
+        if tag == 'instances':
+            for instance in child:
+                if local_name(instance.tag) == 'instance':
+                    yield instance
+        elif tag == 'instance':
+            yield child
+
+
+def _find_tag(data, prefix, name, start, end=None):
+    """Offset of the next '<prefix:name' start tag (not '<prefix:name...longer'), or -1"""
+    needle = b'<' + prefix + name
+    end = len(data) if end is None else end
+    position = data.find(needle, start, end)
+    while position != -1:
+        following = data[position + len(needle):position + len(needle) + 1]
+        if following in (b'>', b'/', b' ', b'\t', b'\r', b'\n'):
+            return position
+        position = data.find(needle, position + 1, end)
+    return -1
+
+
+def scan_report_slices(xml_file_path, slice_bytes=SPLIT_SLICE_BYTES):
+    """Split a ZAP XML report into byte ranges of whole <alertitem> elements
+
+    Memory-maps the file and locates <site> and <alertitem> boundaries with
+    plain byte searches; within each site, cut points are found by jumping
+    ``slice_bytes`` ahead and searching for the next <alertitem> (alert items
+    never nest, so any such match is a valid boundary).
+
+    Returns (site names, slices) where each slice is (prefix, start, end,
+    suffix): parsing ``prefix + file[start:end] + suffix`` as a document gives
+    the prolog, root element (and its namespace declarations) and enclosing
+    <site>/<alerts> tags verbatim, so namespace and site context carry over.
+    Returns (names, []) when no alert items are found.
+    """
+    if detect_compression(xml_file_path):
+        # A compressed stream has no byte offsets to split on
+        return [], []
+    with open(xml_file_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return [], []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            # Root start tag: first '<' not opening a declaration, PI or comment
+            root_start = data.find(b'<')
+            while root_start != -1 and data[root_start + 1:root_start + 2] in (b'?', b'!'):
+                root_start = data.find(b'<', root_start + 1)
+            if root_start == -1:
+                return [], []
+            root_end = data.find(b'>', root_start) + 1
+            root_name = re.match(rb'<([^\s/>]+)', data[root_start:root_end]).group(1)
+            prefix = root_name[:root_name.index(b':') + 1] if b':' in root_name else b''
+            prolog = data[:root_end]
+            root_close = b'</' + root_name + b'>'
+
+            site_names = []
+            slices = []
+            position = root_end
+            while True:
+                site_start = _find_tag(data, prefix, b'site', position)
+                if site_start == -1:
+                    break
+                site_tag_end = data.find(b'>', site_start) + 1
+                site_tag = data[site_start:site_tag_end]
+                if site_tag.endswith(b'/>'):
+                    position = site_tag_end
+                    continue
+                site_end = data.find(b'</' + prefix + b'site>', site_tag_end)
+                if site_end == -1:
+                    break
+                position = site_end
+
+                name = re.search(rb'\sname\s*=\s*(["\'])(.*?)\1', site_tag)
+                site_names.append(
+                    unescape(name.group(2).decode('utf-8', 'replace'), {'&quot;': '"', '&apos;': "'"}) if name else '')
+
+                first_alert = _find_tag(data, prefix, b'alertitem', site_tag_end, site_end)
+                if first_alert == -1:
+                    continue
+                alerts_tag = _find_tag(data, prefix, b'alerts', site_tag_end, first_alert)
+                alerts_end = data.rfind(b'</' + prefix + b'alerts>', first_alert, site_end)
+                if alerts_tag == -1 or alerts_end == -1:
+                    continue
+
+                head = prolog + site_tag + data[alerts_tag:data.find(b'>', alerts_tag) + 1]
+                tail = b'</' + prefix + b'alerts></' + prefix + b'site>' + root_close
+                start = first_alert
+                while start < alerts_end:
+                    cut = _find_tag(data, prefix, b'alertitem', start + slice_bytes, alerts_end)
+                    end = alerts_end if cut == -1 else cut
+                    slices.append((head, start, end, tail))
+                    start = end
+
+            return site_names, slices
+
+
+class ZAPXMLFinding(Finding):
+    """Finding parsed from a ZAP XML report"""
+
+    __slots__ = ()
+    tags = ('DAST', 'OWASP ZAP', 'XML Import', 'Web Application')
+
+
+class UploadStats:
+    """Running finding statistics collected while the stream passes through"""
+
+    def __init__(self):
+        self.total_findings = 0
+        self.severity_counts = {'Critical': 0, 'High': 0, 'Medium': 0, 'Low': 0, 'Info': 0}
+        self.owasp_counts = {}
+
+    def record(self, finding):
+        self.total_findings += 1
+
+        severity = finding.severity
+        self.severity_counts[severity] = self.severity_counts.get(severity, 0) + 1
+
+        owasp_cat = finding.owasp_top_10
+        if owasp_cat:
+            self.owasp_counts[owasp_cat] = self.owasp_counts.get(owasp_cat, 0) + 1
+
+    def track(self, findings):
+        """Pass findings through unchanged while recording each one"""
+        for finding in findings:
+            self.record(finding)
+            yield finding
+
 
 class ZAPXMLDefectDojoUploader:
-    def __init__(self, base_url, api_key, product_name, engagement_name=None):
+    def __init__(self, base_url, api_key, product_name, engagement_name=None, session=None, id_cache=None,
+                 per_instance=DEFAULT_PER_INSTANCE, classifier=None, filter_config=None,
+                 deduplicate=DEFAULT_DEDUPLICATE, delta_upload=DEFAULT_DELTA_UPLOAD, ledger=None):
         self.base_url = base_url.rstrip('/')
         self.api_key = api_key
         self.product_name = product_name
@@ -33,53 +278,24 @@ class ZAPXMLDefectDojoUploader:
             'Authorization': f'Token {api_key}',
             'Content-Type': 'application/json'
         }
-
-        # OWASP Top 10 2021 Mapping
-        self.owasp_mapping = {
-            # A01: Broken Access Control
-            'Cross Site Scripting': 'A01:2021-Broken Access Control',
-            'Cross Domain Script Inclusion': 'A01:2021-Broken Access Control',
-            'Absence of Anti-CSRF Tokens': 'A01:2021-Broken Access Control',
-            'CSP Scanner: Content Security Policy Not Implemented': 'A01:2021-Broken Access Control',
-            'Cookie without SameSite Attribute': 'A01:2021-Broken Access Control',
-
-            # A03: Injection
-            'SQL Injection': 'A03:2021-Injection',
-            'Command Injection': 'A03:2021-Injection',
-            'LDAP Injection': 'A03:2021-Injection',
-            'XPath Injection': 'A03:2021-Injection',
-            'Server Side Include': 'A03:2021-Injection',
-
-            # A04: Insecure Design
-            'Insecure Design': 'A04:2021-Insecure Design',
-
-            # A05: Security Misconfiguration
-            'X-Content-Type-Options header missing': 'A05:2021-Security Misconfiguration',
-            'X-Frame-Options header not set': 'A05:2021-Security Misconfiguration',
-            'Content Type Missing': 'A05:2021-Security Misconfiguration',
-            'Cookie without Secure Flag': 'A05:2021-Security Misconfiguration',
-            'Reverse Tabnabbing': 'A05:2021-Security Misconfiguration',
-            'Cookie without HttpOnly Flag': 'A05:2021-Security Misconfiguration',
-
-            # A06: Vulnerable and Outdated Components
-            'Outdated Component': 'A06:2021-Vulnerable and Outdated Components',
-            'Vulnerable Component': 'A06:2021-Vulnerable and Outdated Components',
-
-            # A07: Identification and Authentication Failures
-            'Authentication Bypass': 'A07:2021-Identification and Authentication Failures',
-            'Weak Authentication': 'A07:2021-Identification and Authentication Failures',
-            'Session Fixation': 'A07:2021-Identification and Authentication Failures',
-
-            # A08: Software and Data Integrity Failures
-            'Software and Data Integrity Failures': 'A08:2021-Software and Data Integrity Failures',
-            'Insecure Deserialization': 'A08:2021-Software and Data Integrity Failures',
-
-            # A09: Security Logging and Monitoring Failures
-            'Security Logging and Monitoring Failures': 'A09:2021-Security Logging and Monitoring Failures',
-
-            # A10: Server-Side Request Forgery (SSRF)
-            'Server Side Request Forgery': 'A10:2021-Server-Side Request Forgery'
-        }
+        # Shared keep-alive connection pool for all DefectDojo API calls
+        self.session = session or get_session()
+        # Persistent product/engagement ID cache shared across pipeline runs
+        self.id_cache = id_cache or DefectDojoIDCache()
+        # Set when DefectDojo rejected a request because a cached ID is gone
+        self.stale_id_seen = False
+        self.per_instance = per_instance
+
+        # Shared OWASP Top 10 2021 classifier (CWE, pluginid, then alert name)
+        self.classifier = classifier or get_classifier()
+
+        # Severity/confidence/CWE/URL rules checked before findings are built (None: keep all)
+        self.finding_filter = (filter_config or get_filter_config()).for_scan_type(ZAP_XML_SCAN_TYPE)
+        # Drop repeats of a finding fingerprint (alert, URL, parameter) within an upload
+        self.deduplicate = deduplicate
+        # Send only findings whose fingerprint the last successful upload of the report(s) lacked
+        self.delta_upload = delta_upload
+        self.ledger = ledger or FingerprintLedger()
 
         # Severity mapping from ZAP risk levels to DefectDojo
         self.severity_mapping = {
@@ -100,34 +316,7 @@ class ZAPXMLDefectDojoUploader:
         try:
             print(f"📄 Parsing ZAP XML report: {os.path.basename(xml_file_path)}")
 
-            # Parse XML with namespace handling
-            tree = ET.parse(xml_file_path)
-            root = tree.getroot()
-
-            # Handle ZAP XML namespace
-            namespace = {'zap': ''}
-            if root.tag.startswith('{'):
-                # Extract namespace from root tag
-                namespace_match = re.match(r'\{(.*)\}', root.tag)
-                if namespace_match:
-                    namespace['zap'] = namespace_match.group(1)
-
-            findings = []
-            sites = root.findall('.//zap:site', namespace)
-
-            print(f"🔍 Found {len(sites)} site(s) in XML report")
-
-            for site in sites:
-                site_name = site.get('name', '')
-                print(f"🌐 Processing site: {site_name}")
-
-                alerts = site.findall('.//zap:alertitem', namespace)
-                print(f"⚠️  Found {len(alerts)} alerts for site {site_name}")
-
-                for alert in alerts:
-                    finding = self._extract_finding_from_alert(alert, site_name, namespace)
-                    if finding:
-                        findings.append(finding)
+            findings = list(self.iter_zap_xml_findings(xml_file_path))
 
             print(f"✅ Successfully extracted {len(findings)} findings from XML report")
             return findings
@@ -139,150 +328,248 @@ class ZAPXMLDefectDojoUploader:
             print(f"❌ Error parsing XML report: {str(e)}")
             return None
 
-    def _extract_finding_from_alert(self, alert, site_name, namespace):
+    def iter_zap_xml_findings(self, xml_file_path):
+        """Stream findings from a ZAP XML report, one per closed <alertitem>
+
+        With ``per_instance`` enabled each alert yields one finding per
+        <instance> instead, all sharing the alert's template.
+
+        Uses incremental parsing so only the alert currently being extracted is
+        held in memory; processed elements are cleared and detached from their
+        parent as soon as they close. Parse errors propagate to the caller.
+        """
+        site_name = ''
+        site_count = 0
+        site_alerts = 0
+        stack = []
+        # Alert text bodies seen so far in this report, keyed by pluginid
+        text_cache = {}
+
+        # gzip/bz2/xz reports are decompressed on the fly; file objects are read as-is
+        opened = isinstance(xml_file_path, (str, os.PathLike))
+        source = open_report(xml_file_path) if opened else xml_file_path
+        with source if opened else contextlib.nullcontext(source):
+            for event, elem in ET.iterparse(source, events=('start', 'end')):
+                # Namespaced and plain ZAP reports are matched on the local tag name
+                tag = local_name(elem.tag)
+
+                if event == 'start':
+                    if stack and tag == 'site':
+                        site_name = sys.intern(elem.get('name', ''))
+                        site_count += 1
+                        site_alerts = 0
+                        print(f"🌐 Processing site: {site_name}")
+                    stack.append(elem)
+                    continue
+
+                stack.pop()
+
+                if tag == 'alertitem':
+                    site_alerts += 1
+                    if self.per_instance:
+                        findings = self._expand_alert_instances(elem, site_name, text_cache)
+                    else:
+                        finding = self._extract_finding_from_alert(elem, site_name, text_cache)
+                        findings = [finding] if finding else []
+                elif tag == 'site':
+                    print(f"⚠️  Found {site_alerts} alerts for site {site_name}")
+                    findings = []
+                else:
+                    continue
+
+                # Drop the processed subtree so memory stays flat on huge reports
+                elem.clear()
+                if stack:
+                    stack[-1].remove(elem)
+
+                yield from findings
+
+        print(f"🔍 Found {site_count} site(s) in XML report")
+
+    def iter_zap_xml_findings_split(self, xml_file_path, workers=DEFAULT_PARSE_WORKERS):
+        """Parse one large report as byte ranges across worker processes
+
+        Yields the same findings in the same order as iter_zap_xml_findings.
+        Ranges hold whole <alertitem> elements (see scan_report_slices) and
+        are parsed independently; results are consumed in file order.
+        Reports too small to split are parsed serially.
+        """
+        slice_bytes = max(SPLIT_SLICE_BYTES, os.path.getsize(xml_file_path) // (max(workers, 1) * 4))
+        site_names, slices = scan_report_slices(xml_file_path, slice_bytes)
+        if workers < 2 or len(slices) < 2:
+            yield from self.iter_zap_xml_findings(xml_file_path)
+            return
+
+        for site_name in site_names:
+            print(f"🌐 Processing site: {site_name}")
+        workers = min(workers, len(slices))
+        print(f"⚙️  Parsing {len(slices)} byte ranges with {workers} worker process(es)")
+
+        tasks = [(xml_file_path, head, start, end, tail) for head, start, end, tail in slices]
+        with new_process_pool(workers, _init_parse_worker, (self.per_instance, self.finding_filter)) as pool:
+            for batch, filtered in pool.map(_parse_report_slice, tasks):
+                self._add_filter_counts(filtered)
+                yield from batch
+
+        print(f"🔍 Found {len(site_names)} site(s) in XML report")
+
+    def _extract_finding_from_alert(self, alert, site_name, text_cache=None):
         """Extract individual finding from ZAP alert XML element"""
         try:
-            # Basic alert information
-            plugin_id = self._get_xml_text(alert, 'pluginid')
-            alert_name = self._get_xml_text(alert, 'name')
-            risk_code = self._get_xml_text(alert, 'riskcode')
-            confidence = self._get_xml_text(alert, 'confidence')
-            description = self._get_xml_text(alert, 'desc')
-            solution = self._get_xml_text(alert, 'solution')
-            reference = self._get_xml_text(alert, 'reference')
-            cwe_id = self._get_xml_text(alert, 'cweid')
-            wasc_id = self._get_xml_text(alert, 'wascid')
-
-            if not alert_name or not plugin_id:
+            template, instance = self._alert_template(alert, site_name, text_cache)
+            if template is None:
                 return None
 
-            # Map risk code to readable risk level
-            risk_level = self._map_risk_code_to_level(risk_code)
-            severity = self.severity_mapping.get(risk_level, 'Low')
-
-            # Extract instance information (first instance)
-            instance = alert.find('.//zap:instance', namespace)
             if instance is None:
-                # Create basic finding without instance details
-                return {
-                    'title': alert_name,
-                    'description': description or alert_name,
-                    'severity': severity,
-                    'cwe': int(cwe_id) if cwe_id and cwe_id.isdigit() else None,
-                    'references': reference,
-                    'solution': solution,
-                    'false_positive': False,
-                    'duplicate': False,
-                    'out_of_scope': False,
-                    'mitigated': None,
-                    'impact': risk_level,
-                    'confidence': self._map_confidence_to_level(confidence),
-                    'finding_type': 'Vulnerability',
-                    'test_type': 'DAST',
-                    'static_finding': False,
-                    'dynamic_finding': True,
-                    'active': True,
-                    'verified': False,
-                    'scanner_confidence': self._map_confidence_to_level(confidence),
-                    'owasp_top_10': self.owasp_mapping.get(alert_name),
-                    'tags': ['DAST', 'OWASP ZAP', 'XML Import', 'Web Application'],
-
-                    # Site and scan information
-                    'url': site_name,
-                    'plugin_id': int(plugin_id) if plugin_id.isdigit() else plugin_id,
-                    'wasc_id': int(wasc_id) if wasc_id and wasc_id.isdigit() else None,
-                }
+                # Basic finding without instance details
+                return template
 
-            # Extract detailed instance information
-            uri = self._get_xml_text(instance, 'uri', site_name)
-            method = self._get_xml_text(instance, 'method')
-            param = self._get_xml_text(instance, 'param')
-            attack = self._get_xml_text(instance, 'attack')
-            evidence = self._get_xml_text(instance, 'evidence')
-
-            return {
-                'title': alert_name,
-                'description': description or alert_name,
-                'severity': severity,
-                'cwe': int(cwe_id) if cwe_id and cwe_id.isdigit() else None,
-                'references': reference,
-                'solution': solution,
-                'false_positive': False,
-                'duplicate': False,
-                'out_of_scope': False,
-                'mitigated': None,
-                'impact': risk_level,
-                'confidence': self._map_confidence_to_level(confidence),
-                'finding_type': 'Vulnerability',
-                'test_type': 'DAST',
-                'static_finding': False,
-                'dynamic_finding': True,
-                'active': True,
-                'verified': False,
-                'scanner_confidence': self._map_confidence_to_level(confidence),
-                'owasp_top_10': self.owasp_mapping.get(alert_name),
-                'tags': ['DAST', 'OWASP ZAP', 'XML Import', 'Web Application'],
-
-                # URL and instance information
-                'url': uri,
-                'param': param,
-                'attack': attack,
-                'evidence': evidence,
-                'method': method,
-                'plugin_id': int(plugin_id) if plugin_id.isdigit() else plugin_id,
-                'wasc_id': int(wasc_id) if wasc_id and wasc_id.isdigit() else None,
-            }
+            # URL and instance information (first instance); the template is not shared here
+            fields = self._instance_fields(instance, site_name)
+            if self._rejects_instance(fields, alert):
+                return None
+            template.update(fields)
+            return template
 
         except Exception as e:
             print(f"⚠️  Error extracting finding from alert: {str(e)}")
             return None
 
-    def _get_xml_text(self, element, tag, default=''):
-        """Safely extract text from XML element"""
-        found = element.find(f'.//zap:{tag}', {'zap': element.nsmap.get('zap', '')})
-        return found.text if found is not None and found.text else default
+    def _expand_alert_instances(self, alert, site_name, text_cache=None):
+        """Extract one finding per <instance> of a ZAP alert
 
-    def _map_risk_code_to_level(self, risk_code):
-        """Map ZAP risk code to readable risk level"""
+        Alert-level fields are parsed once into a template finding; each
+        instance record references the template's values and stores only its
+        own few fields, so memory grows with the per-instance data rather
+        than instances times the full alert text.
+        """
         try:
-            code = int(risk_code)
-            if code >= 4:
-                return 'High'
-            elif code == 3:
-                return 'Medium'
-            elif code == 2:
-                return 'Low'
-            else:
-                return 'Informational'
-        except (ValueError, TypeError):
-            return 'Low'
+            template, first_instance = self._alert_template(alert, site_name, text_cache)
+            if template is None:
+                return []
+            if first_instance is None:
+                return [template]
+
+            findings = []
+            for instance in iter_alert_instances(alert):
+                fields = self._instance_fields(instance, site_name)
+                if not self._rejects_instance(fields, instance):
+                    findings.append(template.replace(**fields))
+            return findings
+
+        except Exception as e:
+            print(f"⚠️  Error extracting findings from alert instances: {str(e)}")
+            return []
+
+    def _alert_template(self, alert, site_name, text_cache=None):
+        """Alert-level finding and the first <instance> element, or (None, None)"""
+        # Basic alert information, gathered in one pass over the alert's children
+        fields, instance = collect_child_text(alert, ALERT_FIELDS)
+        plugin_id = sys.intern(fields.get('pluginid', ''))
+        # ZAP writes the title as <name> and/or <alert> depending on version
+        alert_name = sys.intern(fields.get('name') or fields.get('alert', ''))
+        risk_code = fields.get('riskcode', '')
+        confidence = fields.get('confidence', '')
+        if text_cache is None:
+            description, solution, reference = (fields.get(tag, '') for tag in ALERT_TEXT_FIELDS)
+        else:
+            description, solution, reference = share_alert_text(text_cache, plugin_id, fields)
+        cwe_id = fields.get('cweid', '')
+        wasc_id = fields.get('wascid', '')
+
+        if not alert_name or not plugin_id:
+            return None, None
+
+        # Map risk code to readable risk level
+        risk_level = self._map_risk_code_to_level(risk_code)
+        severity = self.severity_mapping.get(risk_level, 'Low')
+
+        confidence_level = self._map_confidence_to_level(confidence)
+        cwe = int(cwe_id) if cwe_id and cwe_id.isdigit() else None
+        if self.finding_filter is not None:
+            reason = self.finding_filter.reason(severity, confidence_level, cwe)
+            if reason is not None:
+                count = (sum(1 for _ in iter_alert_instances(alert)) or 1) if self.per_instance else 1
+                self.finding_filter.drop(reason, count, element_text_size(alert))
+                return None, None
+
+        template = ZAPXMLFinding(
+            title=alert_name,
+            description=description or alert_name,
+            severity=severity,
+            cwe=cwe,
+            references=reference,
+            solution=solution,
+            impact=risk_level,
+            confidence=confidence_level,
+            scanner_confidence=confidence_level,
+            owasp_top_10=self.classifier.classify(plugin_id, cwe, alert_name),
+
+            # Site and scan information
+            url=site_name,
+            plugin_id=int(plugin_id) if plugin_id.isdigit() else plugin_id,
+            wasc_id=int(wasc_id) if wasc_id and wasc_id.isdigit() else None,
+        )
+        return template, instance
+
+    def _rejects_instance(self, fields, element):
+        """True (and counted) when the source filter drops an instance's URL or parameter"""
+        if self.finding_filter is None:
+            return False
+        reason = self.finding_filter.location_reason(fields['url'], fields['param'])
+        if reason is None:
+            return False
+        self.finding_filter.drop(reason, 1, element_text_size(element))
+        return True
+
+    def _add_filter_counts(self, counts):
+        """Merge source filter counts a parse worker reported back"""
+        if counts is not None and self.finding_filter is not None:
+            self.finding_filter.add_counts(counts)
+
+    def _instance_fields(self, instance, site_name):
+        """Per-instance finding fields of one <instance> element"""
+        fields, _ = collect_child_text(instance, INSTANCE_FIELDS)
+        # method and param repeat across thousands of instances; keep one copy each
+        return {
+            'url': fields.get('uri', site_name),
+            'param': sys.intern(fields.get('param', '')),
+            'attack': fields.get('attack', ''),
+            'evidence': fields.get('evidence', ''),
+            'method': sys.intern(fields.get('method', '')),
+        }
+
+    def _map_risk_code_to_level(self, risk_code):
+        """Map ZAP risk code (0 Informational .. 3 High) to readable risk level"""
+        return ZAP_RISK_LEVELS.get(str(risk_code).strip(), 'Low')
 
     def _map_confidence_to_level(self, confidence):
-        """Map ZAP confidence to readable level"""
-        try:
-            conf = int(confidence)
-            if conf >= 4:
-                return 'High'
-            elif conf == 3:
-                return 'Medium'
-            elif conf == 2:
-                return 'Low'
-            else:
-                return 'Low'
-        except (ValueError, TypeError):
-            return 'Low'
+        """Map ZAP confidence (0 False Positive .. 4 Confirmed) to readable level"""
+        return ZAP_CONFIDENCE_LEVELS.get(str(confidence).strip(), 'Low')
+
+    def _invalidate_if_stale(self, response):
+        """Forget cached IDs when DefectDojo reports a referenced ID is gone"""
+        if is_stale_id_response(response.status_code, response.text):
+            self.id_cache.invalidate_product(self.base_url, self.product_name)
+            self.stale_id_seen = True
 
     def create_product_if_not_exists(self):
         """Create product if it doesn't exist and return product ID"""
+        product_id = self.id_cache.get_product_id(self.base_url, self.product_name)
+        if product_id:
+            print(f"⚡ Using cached product: {self.product_name} (ID: {product_id})")
+            return product_id
+
         # Check if product exists
         search_url = f"{self.base_url}/api/v2/products/?name={self.product_name}"
-        response = requests.get(search_url, headers=self.headers)
+        response = self.session.get(search_url, headers=self.headers)
 
         if response.status_code == 200:
             products = response.json().get('results', [])
             if products:
                 product_id = products[0]['id']
                 print(f"✅ Found existing product: {self.product_name} (ID: {product_id})")
+                self.id_cache.set_product_id(self.base_url, self.product_name, product_id)
                 return product_id
 
         # Create new product
@@ -293,12 +580,26 @@ class ZAPXMLDefectDojoUploader:
             "tags": ["ci-cd", "automated", "dast", "zap-xml", os.getenv('CI_PROJECT_NAME', 'unknown')]
         }
 
+        def recover_created_product():
+            # Before re-POSTing, check whether a timed-out attempt already created it
+            response = self.session.get(search_url, headers=self.headers)
+            if response.status_code == 200 and response.json().get('results'):
+                return response
+            return None
+
         create_url = f"{self.base_url}/api/v2/products/"
-        response = requests.post(create_url, headers=self.headers, json=product_data)
+        response = self.session.post(create_url, headers=self.headers, json=product_data,
+                                     before_retry=recover_created_product)
 
-        if response.status_code == 201:
+        if response.status_code == 200:
+            product_id = response.json()['results'][0]['id']
+            print(f"✅ Found product created by an earlier attempt: {self.product_name} (ID: {product_id})")
+            self.id_cache.set_product_id(self.base_url, self.product_name, product_id)
+            return product_id
+        elif response.status_code == 201:
             product_id = response.json()['id']
             print(f"✅ Created new product: {self.product_name} (ID: {product_id})")
+            self.id_cache.set_product_id(self.base_url, self.product_name, product_id)
             return product_id
         else:
             print(f"❌ Failed to create product: {response.text}")
@@ -306,18 +607,37 @@ class ZAPXMLDefectDojoUploader:
 
     def create_engagement_if_not_exists(self, product_id):
         """Create engagement if it doesn't exist and return engagement ID"""
-        # Check if engagement exists for this pipeline run
         engagement_date = datetime.now().strftime('%Y-%m-%d')
-        search_url = f"{self.base_url}/api/v2/engagements/?name={self.engagement_name}&product={product_id}"
-        response = requests.get(search_url, headers=self.headers)
+        engagement_id = self.id_cache.get_engagement_id(
+            self.base_url, self.product_name, self.engagement_name, engagement_date)
+        if engagement_id:
+            print(f"⚡ Using cached engagement: {self.engagement_name} (ID: {engagement_id})")
+            return engagement_id
 
-        if response.status_code == 200:
-            engagements = response.json().get('results', [])
+        # Check if engagement exists for this pipeline run, filtering by date
+        # server-side and following pagination only while nothing matches
+        query = urlencode({
+            'name': self.engagement_name,
+            'product': product_id,
+            'target_start': engagement_date,
+            'limit': ENGAGEMENT_LOOKUP_LIMIT
+        })
+        first_page_url = f"{self.base_url}/api/v2/engagements/?{query}"
+        search_url = first_page_url
+        while search_url:
+            response = self.session.get(search_url, headers=self.headers)
+            if response.status_code != 200:
+                break
+
+            body = response.json()
             # Check for engagement with today's date
-            for eng in engagements:
+            for eng in body.get('results', []):
                 if eng['target_start'].startswith(engagement_date):
                     print(f"✅ Found existing engagement: {self.engagement_name} (ID: {eng['id']})")
+                    self.id_cache.set_engagement_id(
+                        self.base_url, self.product_name, self.engagement_name, engagement_date, eng['id'])
                     return eng['id']
+            search_url = body.get('next')
 
         # Create new engagement
         engagement_data = {
@@ -331,53 +651,52 @@ class ZAPXMLDefectDojoUploader:
             "tags": ["automated", "ci-cd", "dast", "zap-xml", os.getenv('CI_PIPELINE_ID', 'unknown')]
         }
 
+        def recover_created_engagement():
+            # Before re-POSTing, check whether a timed-out attempt already created it
+            response = self.session.get(first_page_url, headers=self.headers)
+            if response.status_code == 200 and any(
+                    eng['target_start'].startswith(engagement_date) for eng in response.json().get('results', [])):
+                return response
+            return None
+
         create_url = f"{self.base_url}/api/v2/engagements/"
-        response = requests.post(create_url, headers=self.headers, json=engagement_data)
+        response = self.session.post(create_url, headers=self.headers, json=engagement_data,
+                                     before_retry=recover_created_engagement)
 
-        if response.status_code == 201:
+        if response.status_code == 200:
+            engagement_id = next(
+                eng['id'] for eng in response.json()['results'] if eng['target_start'].startswith(engagement_date))
+            print(f"✅ Found engagement created by an earlier attempt: {self.engagement_name} (ID: {engagement_id})")
+            self.id_cache.set_engagement_id(
+                self.base_url, self.product_name, self.engagement_name, engagement_date, engagement_id)
+            return engagement_id
+        elif response.status_code == 201:
             engagement_id = response.json()['id']
             print(f"✅ Created new engagement: {self.engagement_name} (ID: {engagement_id})")
+            self.id_cache.set_engagement_id(
+                self.base_url, self.product_name, self.engagement_name, engagement_date, engagement_id)
             return engagement_id
         else:
             print(f"❌ Failed to create engagement: {response.text}")
+            self._invalidate_if_stale(response)
             return None
 
-    def upload_zap_xml_findings(self, findings, engagement_id, original_file_path):
-        """Upload ZAP XML findings to DefectDojo as import scan"""
+    def upload_zap_xml_findings(self, findings, engagement_id, original_file_path, test_title=None):
+        """Upload ZAP XML findings to DefectDojo as import scan
+
+        ``findings`` may be any iterable; it is consumed once, as the body is
+        encoded into the session's spool, so the full finding list is never
+        held in memory and the spooled body is replayed when the import is retried.
+        """
         try:
-            print(f"📤 Uploading {len(findings)} ZAP XML findings to DefectDojo...")
-
-            # Prepare DefectDojo import data with rich metadata
-            import_data = {
-                'active': True,
-                'verified': False,  # Let DefectDojo auto-verify
-                'scan_type': 'OWASP ZAP DAST Scan (XML)',
-                'minimum_severity': 'Low',
-                'engagement': engagement_id,
-                'lead': 1,  # Default lead
-                'environment': os.getenv('CI_ENVIRONMENT_NAME', 'Development'),
-                'version': os.getenv('CI_COMMIT_SHORT_SHA', 'unknown'),
-                'build_id': os.getenv('CI_PIPELINE_ID', 'unknown'),
-                'commit_hash': os.getenv('CI_COMMIT_SHA', 'unknown'),
-                'branch_tag': os.getenv('CI_COMMIT_REF_NAME', 'main'),
-                'source_code_management_uri': os.getenv('CI_PROJECT_URL', ''),
-                'deduplication_on_engagement': True,
-
-                # Enhanced metadata for XML upload
-                'scan_date': datetime.now().isoformat(),
-                'import_findings': findings,
-                'import_source': 'OWASP ZAP XML Report',
-                'import_metadata': {
-                    'file_name': os.path.basename(original_file_path),
-                    'file_size': os.path.getsize(original_file_path),
-                    'scan_type': 'DAST (OWASP ZAP XML)',
-                    'parser_version': '1.0.0',
-                    'import_timestamp': datetime.now().isoformat()
-                }
-            }
+            print(f"📤 Uploading ZAP XML findings to DefectDojo...")
+
+            import_data = self._build_import_data(engagement_id, original_file_path, test_title)
 
             upload_url = f"{self.base_url}/api/v2/import-scan/"
-            response = requests.post(upload_url, headers=self.headers, json=import_data)
+            # Retrying an import is safe: deduplication_on_engagement merges any repeat
+            body = iter_import_body(import_data, findings)
+            response = self.session.post_body(upload_url, body, headers=self.headers, idempotent=True)
 
             if response.status_code == 201:
                 result = response.json()
@@ -385,79 +704,402 @@ class ZAPXMLDefectDojoUploader:
                 return True
             else:
                 print(f"❌ Failed to upload ZAP XML findings: {response.status_code} - {response.text}")
+                self._invalidate_if_stale(response)
                 return False
 
         except Exception as e:
             print(f"❌ Exception uploading ZAP XML findings: {str(e)}")
             return False
 
-    def process_zap_xml_upload(self, xml_file_path):
-        """Complete workflow to process ZAP XML and upload to DefectDojo"""
+    def _build_import_data(self, engagement_id, original_file_path, test_title=None):
+        """Import-scan fields sent alongside the findings
+
+        ``original_file_path`` may list several reports merged into one import.
+        """
+        report_paths = as_paths(original_file_path)
+        # Prepare DefectDojo import data with rich metadata
+        import_data = {
+            'active': True,
+            'verified': False,  # Let DefectDojo auto-verify
+            'scan_type': ZAP_XML_SCAN_TYPE,
+            'minimum_severity': 'Low',
+            'engagement': engagement_id,
+            'lead': 1,  # Default lead
+            'environment': os.getenv('CI_ENVIRONMENT_NAME', 'Development'),
+            'version': os.getenv('CI_COMMIT_SHORT_SHA', 'unknown'),
+            'build_id': os.getenv('CI_PIPELINE_ID', 'unknown'),
+            'commit_hash': os.getenv('CI_COMMIT_SHA', 'unknown'),
+            'branch_tag': os.getenv('CI_COMMIT_REF_NAME', 'main'),
+            'source_code_management_uri': os.getenv('CI_PROJECT_URL', ''),
+            'deduplication_on_engagement': True,
+
+            # Enhanced metadata for XML upload
+            'scan_date': datetime.now().isoformat(),
+            'import_source': 'OWASP ZAP XML Report',
+            'import_metadata': {
+                'file_name': ', '.join(os.path.basename(path) for path in report_paths),
+                'file_size': sum(os.path.getsize(path) for path in report_paths),
+                'scan_type': 'DAST (OWASP ZAP XML)',
+                'parser_version': '1.0.0',
+                'import_timestamp': datetime.now().isoformat()
+            }
+        }
+        if test_title:
+            import_data['test_title'] = test_title
+        return import_data
+
+    def _iter_finding_chunks(self, findings, max_findings=0, max_bytes=0):
+        """Group findings into lists of encoded JSON bounded by count and size
+
+        Each finding is encoded exactly once; a single finding larger than
+        ``max_bytes`` still goes out on its own rather than being dropped.
+        """
+        chunk = []
+        chunk_bytes = 0
+        for finding in findings:
+            # json.dumps escapes non-ASCII by default, so len() is the byte size
+            encoded = encode_finding(finding)
+            size = len(encoded) + 2  # plus ', ' separator
+            if chunk and ((max_findings and len(chunk) >= max_findings)
+                          or (max_bytes and chunk_bytes + size > max_bytes)):
+                yield chunk
+                chunk = []
+                chunk_bytes = 0
+            chunk.append(encoded)
+            chunk_bytes += size
+        if chunk:
+            yield chunk
+
+    def upload_zap_xml_findings_chunked(self, findings, engagement_id, original_file_path,
+                                        max_findings=0, max_bytes=0, test_title=None):
+        """Upload findings in bounded chunks: import-scan first, then reimport-scan
+
+        The first chunk creates the test; every later chunk is appended to it
+        through reimport with ``close_old_findings`` disabled so earlier chunks
+        stay open. Progress and throughput are reported per chunk.
+        """
+        try:
+            limits = ', '.join(filter(None, [
+                f"{max_findings:,} findings" if max_findings else '',
+                f"{max_bytes:,} bytes" if max_bytes else ''
+            ]))
+            print(f"📤 Uploading ZAP XML findings to DefectDojo in chunks of at most {limits}...")
+
+            import_data = self._build_import_data(engagement_id, original_file_path, test_title)
+
+            # Keep the byte limit for the whole body, including the (larger)
+            # reimport metadata that precedes the findings array
+            findings_budget = 0
+            if max_bytes:
+                reimport_prefix = import_body_prefix(
+                    dict(import_data, test=10 ** 12, close_old_findings=False))
+                findings_budget = max(max_bytes - len(reimport_prefix.encode('utf-8')) - 2, 1)
+
+            test_id = None
+            total_findings = 0
+            total_bytes = 0
+            started = time.perf_counter()
+
+            for number, chunk in enumerate(self._iter_finding_chunks(findings, max_findings, findings_budget), 1):
+                if test_id is None:
+                    upload_url = f"{self.base_url}/api/v2/import-scan/"
+                    chunk_data = import_data
+                else:
+                    upload_url = f"{self.base_url}/api/v2/reimport-scan/"
+                    chunk_data = dict(import_data, test=test_id, close_old_findings=False)
+
+                body = (import_body_prefix(chunk_data) + ', '.join(chunk) + ']}').encode('utf-8')
+
+                chunk_started = time.perf_counter()
+                # Retrying an import is safe: deduplication_on_engagement merges any repeat
+                response = self.session.post_body(upload_url, body, headers=self.headers, idempotent=True)
+                elapsed = max(time.perf_counter() - chunk_started, 1e-6)
+
+                if response.status_code not in (200, 201):
+                    print(f"❌ Failed to upload chunk {number}: {response.status_code} - {response.text}")
+                    self._invalidate_if_stale(response)
+                    return False
+
+                if test_id is None:
+                    test_id = response.json().get('test')
+                    if test_id is None:
+                        print("❌ import-scan response did not include a test ID; cannot append further chunks")
+                        return False
+
+                total_findings += len(chunk)
+                total_bytes += len(body)
+                print(f"   📦 Chunk {number}: {len(chunk):,} findings, {len(body):,} bytes in {elapsed:.2f}s "
+                      f"({len(chunk) / elapsed:,.0f} findings/s, {len(body) / elapsed / 1024:,.1f} KiB/s) "
+                      f"- {total_findings:,} findings sent")
+
+            elapsed = max(time.perf_counter() - started, 1e-6)
+            print(f"✅ Successfully uploaded ZAP XML findings (Test ID: {test_id if test_id is not None else 'N/A'})")
+            print(f"   ⏱️  {total_findings:,} findings, {total_bytes:,} bytes in {elapsed:.2f}s "
+                  f"({total_findings / elapsed:,.0f} findings/s)")
+            return True
+
+        except Exception as e:
+            print(f"❌ Exception uploading ZAP XML findings: {str(e)}")
+            return False
+
+    def process_zap_xml_upload(self, xml_file_path, chunk_findings=DEFAULT_CHUNK_FINDINGS,
+                               chunk_bytes=DEFAULT_CHUNK_BYTES, split_workers=0):
+        """Complete workflow to process ZAP XML and upload to DefectDojo
+
+        Findings flow through a staged generator pipeline: parse -> tally ->
+        chunked serialise and send. Statistics for the summary are collected
+        as findings stream past rather than in a second pass. With
+        ``split_workers`` > 1 the report is parsed as parallel byte ranges.
+        """
         try:
             print(f"🚀 Starting ZAP XML to DefectDojo upload workflow...")
             print(f"📄 XML File: {os.path.basename(xml_file_path)}")
-            print(f"📊 File Size: {os.path.getsize(xml_file_path):,} bytes")
 
             # Validate XML file exists and is readable
             if not os.path.exists(xml_file_path):
                 print(f"❌ XML file not found: {xml_file_path}")
                 return False
 
+            print(f"📊 File Size: {os.path.getsize(xml_file_path):,} bytes")
+
             if os.path.getsize(xml_file_path) == 0:
                 print(f"❌ XML file is empty: {xml_file_path}")
                 return False
 
-            # Parse XML report
-            findings = self.parse_zap_xml_report(xml_file_path)
-            if not findings:
-                print("⚠️  No findings found in XML report")
-                return True  # Not an error, just no findings
+            # Parse XML report lazily; peek so empty reports skip the upload
+            print(f"📄 Parsing ZAP XML report: {os.path.basename(xml_file_path)}")
 
-            # Create or get product
-            product_id = self.create_product_if_not_exists()
-            if not product_id:
-                print("❌ Failed to create/get product. Aborting upload.")
+            def parse():
+                if split_workers > 1:
+                    return self.iter_zap_xml_findings_split(xml_file_path, split_workers)
+                return self.iter_zap_xml_findings(xml_file_path)
+
+            findings = parse()
+            try:
+                first_finding = next(findings)
+            except StopIteration:
+                print("⚠️  No findings found in XML report")
+                if not self.delta_upload:
+                    return True  # Not an error, just no findings
+                # Delta mode still records that every previously uploaded finding is gone
+                first_finding = None
+            except ET.ParseError as e:
+                print(f"❌ XML Parse Error: {str(e)}")
                 return False
 
-            # Create or get engagement
-            engagement_id = self.create_engagement_if_not_exists(product_id)
+            engagement_id = self._ensure_engagement()
             if not engagement_id:
-                print("❌ Failed to create/get engagement. Aborting upload.")
                 return False
 
-            print(f"📋 Using Product ID: {product_id}, Engagement ID: {engagement_id}")
+            if first_finding is not None:
+                findings = chain([first_finding], findings)
+            uploaded, _ = self._upload_retrying_stale_ids(findings, engagement_id, xml_file_path, chunk_findings,
+                                                          chunk_bytes, reparse=parse)
+            return uploaded
 
-            # Upload findings
-            upload_success = self.upload_zap_xml_findings(findings, engagement_id, xml_file_path)
+        except Exception as e:
+            print(f"❌ Fatal error in ZAP XML upload workflow: {str(e)}")
+            return False
 
-            if upload_success:
-                # Generate summary report
-                self._generate_upload_summary(findings, xml_file_path, engagement_id)
+    def process_zap_xml_uploads(self, xml_file_paths, workers=DEFAULT_PARSE_WORKERS, merge=True,
+                                chunk_findings=DEFAULT_CHUNK_FINDINGS, chunk_bytes=DEFAULT_CHUNK_BYTES):
+        """Parse several ZAP XML reports in parallel and upload them
 
-            return upload_success
+        Reports are parsed across a process pool, so wall-clock parse time
+        scales with the number of cores rather than the number of files. With
+        ``merge`` the findings of all reports go out as a single import in
+        input order; otherwise each report becomes its own DefectDojo test,
+        uploaded as soon as its parse finishes.
+        """
+        try:
+            print(f"🚀 Starting ZAP XML to DefectDojo upload workflow for {len(xml_file_paths)} reports...")
+
+            for xml_file_path in xml_file_paths:
+                if not os.path.exists(xml_file_path):
+                    print(f"❌ XML file not found: {xml_file_path}")
+                    return False
+                if os.path.getsize(xml_file_path) == 0:
+                    print(f"❌ XML file is empty: {xml_file_path}")
+                    return False
+                print(f"📄 XML File: {os.path.basename(xml_file_path)} ({os.path.getsize(xml_file_path):,} bytes)")
+
+            workers = max(1, min(workers, len(xml_file_paths)))
+            print(f"⚙️  Parsing with {workers} worker process(es); "
+                  f"{'merged into one test' if merge else 'one test per report'}")
+
+            engagement_id = None
+            success = True
+            with new_process_pool(workers, _init_parse_worker, (self.per_instance, self.finding_filter)) as pool:
+                futures = {pool.submit(_parse_report, path): path for path in xml_file_paths}
+
+                if merge:
+                    # Wait for every report, then keep input order in the merged import
+                    batches = []
+                    for future in futures:
+                        batch, filtered = future.result()
+                        self._add_filter_counts(filtered)
+                        batches.append(batch)
+                    if any(batch is None for batch in batches):
+                        return False
+                    if not any(batches):
+                        print("⚠️  No findings found in XML reports")
+                        if not self.delta_upload:
+                            return True
+                    engagement_id = self._ensure_engagement()
+                    if not engagement_id:
+                        return False
+                    uploaded, _ = self._upload_retrying_stale_ids(
+                        chain.from_iterable(batches), engagement_id, xml_file_paths, chunk_findings, chunk_bytes,
+                        reparse=lambda: chain.from_iterable(batches))
+                    return uploaded
+
+                for future in as_completed(futures):
+                    xml_file_path = futures[future]
+                    batch, filtered = future.result()
+                    self._add_filter_counts(filtered)
+                    if batch is None:
+                        success = False
+                        continue
+                    if not batch:
+                        print(f"⚠️  No findings found in {os.path.basename(xml_file_path)}")
+                        if not self.delta_upload:
+                            continue
+                    if engagement_id is None:
+                        engagement_id = self._ensure_engagement()
+                        if not engagement_id:
+                            return False
+                    # A retry with fresh IDs hands back the engagement the remaining reports use
+                    uploaded, engagement_id = self._upload_retrying_stale_ids(
+                        batch, engagement_id, xml_file_path, chunk_findings, chunk_bytes,
+                        test_title=f"ZAP XML - {os.path.basename(xml_file_path)}"
+                    )
+                    success = uploaded and success
+
+            return success
 
         except Exception as e:
             print(f"❌ Fatal error in ZAP XML upload workflow: {str(e)}")
             return False
 
-    def _generate_upload_summary(self, findings, xml_file_path, engagement_id):
-        """Generate upload summary with detailed statistics"""
-        try:
-            # Analyze findings by severity
-            severity_counts = {'Critical': 0, 'High': 0, 'Medium': 0, 'Low': 0, 'Info': 0}
-            owasp_counts = {}
+    def _ensure_engagement(self):
+        """Create or get the product and engagement; returns the engagement ID or None
+
+        When a cached ID turns out to be gone the cache entry is dropped and
+        both are looked up once more.
+        """
+        for attempt in (1, 2):
+            self.stale_id_seen = False
+            product_id = self.create_product_if_not_exists()
+            engagement_id = self.create_engagement_if_not_exists(product_id) if product_id else None
+            if engagement_id or attempt == 2 or not self.stale_id_seen:
+                break
+            print("🔄 A cached DefectDojo ID no longer exists; looking product and engagement up again")
+
+        if not product_id:
+            print("❌ Failed to create/get product. Aborting upload.")
+            return None
+        if not engagement_id:
+            print("❌ Failed to create/get engagement. Aborting upload.")
+            return None
 
-            for finding in findings:
-                severity = finding.get('severity', 'Low')
-                severity_counts[severity] = severity_counts.get(severity, 0) + 1
+        print(f"📋 Using Product ID: {product_id}, Engagement ID: {engagement_id}")
+        return engagement_id
+
+    def _upload_retrying_stale_ids(self, findings, engagement_id, xml_file_path, chunk_findings, chunk_bytes,
+                                   test_title=None, reparse=None):
+        """_upload_parsed_findings, retried once with fresh IDs when a cached one was gone
+
+        ``findings`` is consumed by the first attempt, so a retry uses
+        ``reparse()`` when given and ``findings`` again otherwise (a list).
+        Returns (success, engagement ID to use from now on, None if unknown).
+        """
+        self.stale_id_seen = False
+        if self._upload_parsed_findings(findings, engagement_id, xml_file_path, chunk_findings, chunk_bytes,
+                                        test_title):
+            return True, engagement_id
+        if not self.stale_id_seen:
+            return False, engagement_id
+
+        print("🔄 The upload referenced a DefectDojo ID that no longer exists; retrying with fresh IDs")
+        engagement_id = self._ensure_engagement()
+        if not engagement_id:
+            return False, None
+        findings = reparse() if reparse is not None else findings
+        return self._upload_parsed_findings(findings, engagement_id, xml_file_path, chunk_findings, chunk_bytes,
+                                            test_title), engagement_id
+
+    def _upload_parsed_findings(self, findings, engagement_id, xml_file_path, chunk_findings, chunk_bytes,
+                                test_title=None):
+        """Upload a finding stream, tallying statistics, and write the summary
+
+        Findings whose fingerprint already went out in this upload are
+        merged away first, so the statistics count what was sent. In delta
+        mode findings sent by the last successful upload of the same
+        report(s) are skipped too, and nothing is imported when none is new.
+        """
+        stats = UploadStats()
+        report = ', '.join(os.path.basename(path) for path in as_paths(xml_file_path))
+        ledger_key = self.ledger.key(self.base_url, self.product_name, self.engagement_name, ZAP_XML_SCAN_TYPE,
+                                     report)
+        deduplicator = None
+        if self.deduplicate or self.delta_upload:
+            known = self.ledger.get(ledger_key) if self.delta_upload else None
+            deduplicator = FindingDeduplicator(ZAP_XML_SCAN_TYPE, known)
+            findings = deduplicator.iter_unique(findings)
+        stream = stats.track(findings)
+
+        first_finding = next(stream, None) if self.delta_upload else None
+        if self.delta_upload and first_finding is None:
+            print(f"⏭️  No new findings in {report} since the last upload")
+            upload_success = True
+        else:
+            if first_finding is not None:
+                stream = chain([first_finding], stream)
+            if chunk_findings or chunk_bytes:
+                upload_success = self.upload_zap_xml_findings_chunked(
+                    stream, engagement_id, xml_file_path,
+                    max_findings=chunk_findings, max_bytes=chunk_bytes, test_title=test_title
+                )
+            else:
+                upload_success = self.upload_zap_xml_findings(stream, engagement_id, xml_file_path, test_title)
+
+        if upload_success and self.delta_upload:
+            upload_success = self._record_delta(engagement_id, report, ledger_key, deduplicator)
+
+        if upload_success:
+            # Generate summary report
+            self._generate_upload_summary(stats, xml_file_path, engagement_id, deduplicator)
+
+        return upload_success
+
+    def _record_delta(self, engagement_id, report, ledger_key, deduplicator):
+        """Note the fingerprints gone since the last upload on the engagement, then update the ledger"""
+        disappeared = deduplicator.disappeared()
+        if disappeared:
+            pipeline = os.getenv('CI_PIPELINE_ID', 'unknown')
+            entry = (f"Delta upload of {report} ({ZAP_XML_SCAN_TYPE}, pipeline {pipeline}): "
+                     f"{len(disappeared)} finding(s) uploaded previously are no longer reported. Fingerprints:\n"
+                     + '\n'.join(disappeared))
+            response = self.session.post(f"{self.base_url}/api/v2/engagements/{engagement_id}/notes/",
+                                         headers=self.headers, json={'entry': entry, 'private': False})
+            if response.status_code != 201:
+                print(f"❌ Failed to record disappeared findings of {report}: "
+                      f"{response.status_code} - {response.text}")
+                return False
+            print(f"🔕 {len(disappeared)} finding(s) of {report} no longer reported; listed in an engagement note")
+        self.ledger.set(ledger_key, deduplicator.fingerprints())
+        return True
 
-                owasp_cat = finding.get('owasp_top_10')
-                if owasp_cat:
-                    owasp_counts[owasp_cat] = owasp_counts.get(owasp_cat, 0) + 1
+    def _generate_upload_summary(self, stats, xml_file_path, engagement_id, deduplicator=None):
+        """Generate upload summary with detailed statistics"""
+        try:
+            severity_counts = stats.severity_counts
+            owasp_counts = stats.owasp_counts
 
             print(f"\n📊 ZAP XML Upload Summary:")
-            print(f"   📄 Source File: {os.path.basename(xml_file_path)}")
-            print(f"   🔍 Total Findings: {len(findings)}")
+            source_files = ', '.join(os.path.basename(path) for path in as_paths(xml_file_path))
+            print(f"   📄 Source File: {source_files}")
+            print(f"   🔍 Total Findings: {stats.total_findings}")
             print(f"   📈 Severity Distribution:")
             for severity, count in severity_counts.items():
                 if count > 0:
@@ -467,19 +1109,34 @@ class ZAPXMLDefectDojoUploader:
                 print(f"   🎯 OWASP Top 10 Distribution:")
                 for owasp_cat, count in owasp_counts.items():
                     print(f"      {owasp_cat}: {count}")
+            # Parsing in pool workers classifies there, so only report counts made here
+            classified_here = self.classifier.version is not None
+            if classified_here:
+                print(f"   🏷️  {self.classifier.format_stats()}")
+            if self.finding_filter is not None:
+                print(f"   🧹 {self.finding_filter.format_stats()}")
+            if deduplicator is not None:
+                print(f"   🧬 {deduplicator.format_stats()}")
 
             print(f"   🔗 Engagement ID: {engagement_id}")
+            self.session.print_connection_stats()
+            self.session.print_compression_stats()
             print(f"   ⏰ Upload Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
             # Save summary to file
             summary_data = {
                 'upload_timestamp': datetime.now().isoformat(),
-                'source_file': os.path.basename(xml_file_path),
-                'total_findings': len(findings),
+                'source_file': source_files,
+                'total_findings': stats.total_findings,
                 'severity_distribution': severity_counts,
                 'owasp_top_10_distribution': owasp_counts,
+                'owasp_classification': self.classifier.stats() if classified_here else None,
+                'source_filter': self.finding_filter.stats() if self.finding_filter is not None else None,
+                'deduplication': deduplicator.stats() if deduplicator is not None else None,
                 'engagement_id': engagement_id,
                 'product_name': self.product_name,
+                'http_connections': self.session.stats.as_dict(),
+                'request_compression': self.session.compression_stats.as_dict(),
                 'metadata': {
                     'ci_pipeline_id': os.getenv('CI_PIPELINE_ID'),
                     'ci_commit_sha': os.getenv('CI_COMMIT_SHORT_SHA'),
@@ -488,7 +1145,7 @@ class ZAPXMLDefectDojoUploader:
                 }
             }
 
-            summary_file = f"zap-xml-upload-summary-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+            summary_file = f"zap-xml-upload-summary-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.json"
             with open(summary_file, 'w') as f:
                 json.dump(summary_data, f, indent=2)
 
@@ -498,30 +1155,120 @@ class ZAPXMLDefectDojoUploader:
             print(f"⚠️  Error generating upload summary: {str(e)}")
 
 
-def main():
-    if len(sys.argv) != 5:
-        print("Usage: python3 zap-xml-defectdojo-uploader.py <base_url> <api_key> <product_name> <xml_report_file>")
-        print("\nExample:")
-        print("  python3 zap-xml-defectdojo-uploader.py https://defectdojo.example.com YOUR_TOKEN nodejs-poc gl-dast-report.xml")
-        print("\nEnvironment variables available:")
-        print("   CI_PROJECT_URL, CI_COMMIT_REF_NAME, CI_PIPELINE_ID")
-        print("   CI_COMMIT_SHORT_SHA, CI_COMMIT_SHA, CI_ENVIRONMENT_NAME")
-        sys.exit(1)
+# Per-process parser used by the process pool in process_zap_xml_uploads
+_parse_worker = None
+
 
-    base_url = sys.argv[1]
-    api_key = sys.argv[2]
-    product_name = sys.argv[3]
-    xml_file_path = sys.argv[4]
+def _init_parse_worker(per_instance, finding_filter=None):
+    global _parse_worker
+    with contextlib.redirect_stdout(io.StringIO()):
+        _parse_worker = ZAPXMLDefectDojoUploader('http://localhost', '', '', per_instance=per_instance)
+    _parse_worker.finding_filter = finding_filter
+
+
+def _filter_counts():
+    """Source filter counts of this worker since the last task, for the parent to merge"""
+    finding_filter = _parse_worker.finding_filter
+    return finding_filter.take_counts() if finding_filter is not None else None
+
+
+def _parse_report(xml_file_path):
+    """Parse one report in a worker; findings pickle back as one compact batch
+
+    Returns (findings or None on a parse error, source filter counts).
+    """
+    try:
+        return list(_parse_worker.iter_zap_xml_findings(xml_file_path)), _filter_counts()
+    except ET.ParseError as e:
+        print(f"❌ XML Parse Error in {os.path.basename(xml_file_path)}: {str(e)}")
+        return None, _filter_counts()
+
+
+def _parse_report_slice(task):
+    """Parse one byte range of a report in a worker (see scan_report_slices)"""
+    xml_file_path, head, start, end, tail = task
+    with open(xml_file_path, 'rb') as f:
+        f.seek(start)
+        body = f.read(end - start)
+    # Per-slice site/count lines would be misleading; the parent reports sites
+    with contextlib.redirect_stdout(io.StringIO()):
+        return list(_parse_worker.iter_zap_xml_findings(io.BytesIO(head + body + tail))), _filter_counts()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Parse OWASP ZAP XML reports and upload them to DefectDojo",
+        epilog="Example:\n"
+               "  python3 zap-xml-defectdojo-uploader.py https://defectdojo.example.com YOUR_TOKEN nodejs-poc gl-dast-report.xml\n"
+               "  python3 zap-xml-defectdojo-uploader.py --test-per-report https://defectdojo.example.com YOUR_TOKEN "
+               "nodejs-poc zap-*.xml\n"
+               "\nEnvironment variables available:\n"
+               "   CI_PROJECT_URL, CI_COMMIT_REF_NAME, CI_PIPELINE_ID\n"
+               "   CI_COMMIT_SHORT_SHA, CI_COMMIT_SHA, CI_ENVIRONMENT_NAME\n"
+               "   DEFECTDOJO_CHUNK_FINDINGS, DEFECTDOJO_CHUNK_BYTES, DEFECTDOJO_PER_INSTANCE\n"
+               "   DEFECTDOJO_PARSE_WORKERS, DEFECTDOJO_SPLIT_PARSE\n"
+               "   DEFECTDOJO_COMPRESSION, DEFECTDOJO_COMPRESSION_MIN_BYTES\n"
+               "   DEFECTDOJO_FILTER_CONFIG, DEFECTDOJO_DEDUPLICATE\n"
+               "   DEFECTDOJO_DELTA_UPLOAD, DEFECTDOJO_LEDGER_FILE, DEFECTDOJO_LEDGER_TTL",
+        formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument('base_url')
+    parser.add_argument('api_key')
+    parser.add_argument('product_name')
+    parser.add_argument('xml_report_files', nargs='+', metavar='xml_report_file')
+    parser.add_argument('--chunk-findings', type=int, default=DEFAULT_CHUNK_FINDINGS,
+                        help="Max findings per import request; enables chunked import (default: off)")
+    parser.add_argument('--chunk-bytes', type=int, default=DEFAULT_CHUNK_BYTES,
+                        help="Max JSON body bytes per import request; enables chunked import (default: off)")
+    parser.add_argument('--per-instance', action='store_true', default=DEFAULT_PER_INSTANCE,
+                        help="Emit one finding per alert instance instead of per alert")
+    parser.add_argument('--workers', type=int, default=DEFAULT_PARSE_WORKERS,
+                        help="Parser processes for several reports or --split (default: CPU count)")
+    parser.add_argument('--split', action='store_true', default=DEFAULT_SPLIT_PARSE,
+                        help="Parse a single large report as byte ranges across --workers processes")
+    parser.add_argument('--test-per-report', action='store_true',
+                        help="Upload each report as its own DefectDojo test instead of one merged import")
+    parser.add_argument('--filter-config', default=None,
+                        help="Per-scanner source filter rules applied before upload "
+                             "(default: $DEFECTDOJO_FILTER_CONFIG or scripts/upload-filters.json)")
+    parser.add_argument('--no-dedupe', dest='deduplicate', action='store_false', default=DEFAULT_DEDUPLICATE,
+                        help="Upload every finding instead of one per fingerprint")
+    parser.add_argument('--delta', dest='delta_upload', action='store_true', default=DEFAULT_DELTA_UPLOAD,
+                        help="Send only findings new since the last successful upload of the report(s) and "
+                             "note the ones that disappeared (fingerprints kept in $DEFECTDOJO_LEDGER_FILE)")
+    args = parser.parse_args()
+
+    base_url = args.base_url
+    api_key = args.api_key
+    product_name = args.product_name
 
     # Initialize uploader
     uploader = ZAPXMLDefectDojoUploader(
         base_url=base_url,
         api_key=api_key,
-        product_name=product_name
+        product_name=product_name,
+        per_instance=args.per_instance,
+        filter_config=FilterConfig(args.filter_config),
+        deduplicate=args.deduplicate,
+        delta_upload=args.delta_upload
     )
 
     # Process XML upload
-    success = uploader.process_zap_xml_upload(xml_file_path)
+    if len(args.xml_report_files) == 1:
+        success = uploader.process_zap_xml_upload(
+            args.xml_report_files[0],
+            chunk_findings=args.chunk_findings,
+            chunk_bytes=args.chunk_bytes,
+            split_workers=args.workers if args.split else 0
+        )
+    else:
+        success = uploader.process_zap_xml_uploads(
+            args.xml_report_files,
+            workers=args.workers,
+            merge=not args.test_per_report,
+            chunk_findings=args.chunk_findings,
+            chunk_bytes=args.chunk_bytes
+        )
 
     if success:
         print("🎉 ZAP XML to DefectDojo upload completed successfully!")